@@ -10,7 +10,15 @@ import json
 
 from mflowgen.components import Graph, Step
 
-def construct():
+#-------------------------------------------------------------------------
+# construct
+#-------------------------------------------------------------------------
+# mflowgen calls construct() with no arguments, which gives the default
+# flow. The sweep-block-flow script calls construct with different
+# values for the keyword arguments to build each point of a sweep.
+
+def construct( clock_period=0.6, nbits=8, gate_clock=False,
+               topographical=False, input_delay=0.05, output_delay=0.05 ):
 
   g = Graph()
 
@@ -23,12 +31,14 @@ def construct():
   adk_name = 'freepdk-45nm'
   adk_view = 'stdview'
 
+  design_name = 'SortUnitStructRTL__nbits_{}'.format( nbits )
+
   parameters = {
     'construct_path'  : __file__,
     'sim_path'        : "{}/../sim".format(this_dir),
     'design_path'     : "{}/../sim/tut3_pymtl/sort".format(this_dir),
-    'design_name'     : 'SortUnitStructRTL__nbits_8', 
-    'clock_period'    : 0.6,
+    'design_name'     : design_name,
+    'clock_period'    : clock_period,
     'clk_port'        : 'clk',
     'reset_port'      : 'reset',
     'adk'             : adk_name,
@@ -36,20 +46,20 @@ def construct():
     'pad_ring'        : False,
 
     # VCS-sim
-    'test_design_name': 'SortUnitStructRTL__nbits_8',
-    'input_delay'     : 0.05,
-    'output_delay'    : 0.05,
+    'test_design_name': design_name,
+    'input_delay'     : input_delay,
+    'output_delay'    : output_delay,
 
     # Synthesis 
-    'gate_clock'      : False,
-    'topographical'   : False,
+    'gate_clock'      : gate_clock,
+    'topographical'   : topographical,
 
     # # Hold Fixing 
     # 'hold_slack'      : 0.070,
     # 'setup_slack'     : 0.035,
 
     # PT Power
-    'saif_instance'   : 'SortUnitStructRTL__nbits_8_tb/DUT',
+    'saif_instance'   : '{}_tb/DUT'.format( design_name ),
   } 
 
   #-----------------------------------------------------------------------
@@ -0,0 +1,372 @@
+#=========================================================================
+# flow_cache
+#=========================================================================
+# Incremental execution of an mflowgen block flow. mflowgen (through
+# make) only skips a step if the step directory in the current build
+# directory is up to date, so wiping or moving the build directory means
+# re-running synthesis and place-and-route even if only a parameter of
+# the power analysis changed.
+#
+# Instead, we walk the steps of the flow in build order and fingerprint
+# each step by:
+#
+#  - the step name and its parameters after update_params
+#  - the contents of the step template directory (scripts, configure.yml)
+#  - the fingerprints of the upstream steps feeding each of its inputs
+#  - for steps without inputs, the source files under sim_path (which
+#    is what ece5745-block-gather runs the tests on)
+#
+# If the step store already holds an output bundle with the same
+# fingerprint we restore the step directory from the store instead of
+# running the step, otherwise we run the step with make and add its step
+# directory to the store. The store records how long each step took to
+# run so we can report how much time restoring it saved.
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+
+from collections import namedtuple
+
+from flow_sweep import step_fingerprint, find_step_dir
+
+#-------------------------------------------------------------------------
+# Defaults
+#-------------------------------------------------------------------------
+# The store directory and size can be set with the MFLOWGEN_STEP_STORE
+# and MFLOWGEN_STEP_STORE_SIZE (in MB) environment variables.
+
+default_store_dir = os.path.join( os.path.expanduser("~"), ".cache", "mflowgen-steps" )
+default_max_size  = 20 * 1024**3
+
+# Name of the file in each step directory holding its fingerprint
+
+fingerprint_file = ".flow-fingerprint"
+
+#-------------------------------------------------------------------------
+# hash_tree
+#-------------------------------------------------------------------------
+# Returns a hash of the relative paths and contents of all files under
+# the given directory for which keep( relpath ) is true.
+
+def hash_tree( path, keep=lambda relpath: True ):
+  h = hashlib.blake2b( digest_size=20 )
+  for dirpath, dirnames, filenames in os.walk( path ):
+    dirnames[:] = sorted( d for d in dirnames
+                          if not d.startswith( ( ".", "build", "__pycache__" ) ) )
+    for name in sorted( filenames ):
+      full    = os.path.join( dirpath, name )
+      relpath = os.path.relpath( full, path )
+      if not keep( relpath ) or not os.path.isfile( full ):
+        continue
+      h.update( relpath.encode('utf-8') + b"\0" )
+      with open( full, "rb" ) as f:
+        for chunk in iter( lambda: f.read( 1 << 20 ), b"" ):
+          h.update( chunk )
+  return h.hexdigest()
+
+def is_sim_source( relpath ):
+  return relpath.endswith( ( ".py", ".v", ".ini" ) )
+
+#-------------------------------------------------------------------------
+# StepStore
+#-------------------------------------------------------------------------
+# A directory of step output bundles keyed by step fingerprint. Each
+# entry holds a copy of the step directory (without the inputs, which
+# are links to other steps) and a meta.json with the step name and how
+# long the step took to run. Entries are evicted in least recently used
+# order once the total size exceeds max_size bytes.
+
+class StepStore:
+
+  def __init__( s, store_dir=None, max_size=None ):
+    s.store_dir = store_dir or default_store_dir
+    s.max_size  = max_size  or default_max_size
+    os.makedirs( s.store_dir, exist_ok=True )
+
+  def entry_path( s, key ):
+    return os.path.join( s.store_dir, key )
+
+  def contains( s, key ):
+    return os.path.isdir( s.entry_path( key ) )
+
+  def get_meta( s, key ):
+    with open( os.path.join( s.entry_path( key ), "meta.json" ) ) as f:
+      return json.load( f )
+
+  # Replaces step_dir with the stored step directory for key and marks
+  # the entry as recently used. Returns the meta dict of the entry, or
+  # None if the key is not in the store.
+
+  def restore( s, key, step_dir ):
+    entry = s.entry_path( key )
+    if not os.path.isdir( entry ):
+      return None
+
+    shutil.rmtree( step_dir, ignore_errors=True )
+    shutil.copytree( os.path.join( entry, "step" ), step_dir, symlinks=True )
+
+    os.utime( entry )
+    return s.get_meta( key )
+
+  # Adds a copy of step_dir to the store under key. As in VlCache we copy
+  # into a temporary directory first and then rename it, so concurrent
+  # flows never see a partial entry.
+
+  def store( s, key, step_dir, meta ):
+    entry = s.entry_path( key )
+    if os.path.isdir( entry ):
+      return
+
+    tmp = f"{entry}.tmp-{os.getpid()}"
+    shutil.rmtree( tmp, ignore_errors=True )
+    shutil.copytree( step_dir, os.path.join( tmp, "step" ), symlinks=True,
+                     ignore=lambda d, names: [ "inputs" ] if d == step_dir else [] )
+
+    with open( os.path.join( tmp, "meta.json" ), "w" ) as f:
+      json.dump( meta, f, indent=2 )
+
+    try:
+      os.rename( tmp, entry )
+    except OSError:
+      shutil.rmtree( tmp, ignore_errors=True )
+
+    s.evict()
+
+  # Returns a list of ( last_used, size, key ) for every entry
+
+  def entries( s ):
+    ret = []
+    for key in os.listdir( s.store_dir ):
+      entry = s.entry_path( key )
+      if ".tmp-" in key or not os.path.isdir( entry ):
+        continue
+      size = 0
+      for dirpath, _, filenames in os.walk( entry ):
+        size += sum( os.lstat( os.path.join( dirpath, f ) ).st_size
+                     for f in filenames )
+      ret.append( ( os.path.getmtime( entry ), size, key ) )
+    return ret
+
+  def size( s ):
+    return sum( size for _, size, _ in s.entries() )
+
+  def evict( s ):
+    entries = sorted( s.entries() )
+    total   = sum( size for _, size, _ in entries )
+    for _, size, key in entries:
+      if total <= s.max_size:
+        break
+      shutil.rmtree( s.entry_path( key ), ignore_errors=True )
+      total -= size
+
+def mk_step_store( store_dir=None, max_size=None ):
+  if store_dir is None:
+    store_dir = os.environ.get( "MFLOWGEN_STEP_STORE" )
+  if max_size is None and "MFLOWGEN_STEP_STORE_SIZE" in os.environ:
+    max_size = int( os.environ["MFLOWGEN_STEP_STORE_SIZE"] ) * 1024**2
+  return StepStore( store_dir, max_size )
+
+#-------------------------------------------------------------------------
+# load_graph
+#-------------------------------------------------------------------------
+# Returns the graph for a design directory the same way mflowgen does,
+# by calling construct() in the file named by .mflowgen.yml.
+
+def load_graph( design_dir ):
+  construct_path = None
+  with open( os.path.join( design_dir, ".mflowgen.yml" ) ) as f:
+    for line in f:
+      if line.startswith( "construct:" ):
+        construct_path = line.split( ":", 1 )[1].strip()
+
+  if construct_path is None:
+    raise RuntimeError( f"no construct in {design_dir}/.mflowgen.yml" )
+
+  construct_path = os.path.join( design_dir, construct_path )
+  spec   = importlib.util.spec_from_file_location( "construct", construct_path )
+  module = importlib.util.module_from_spec( spec )
+  spec.loader.exec_module( module )
+  return module.construct()
+
+#-------------------------------------------------------------------------
+# list_steps
+#-------------------------------------------------------------------------
+# Returns a list of ( number, name ) for the steps of the flow in the
+# given build directory in build order, by parsing make list.
+
+list_line = re.compile( r"^\s*-\s+(\d+)\s*:\s*(\S+)\s*$" )
+
+def parse_step_list( lines ):
+  steps = []
+  for line in lines:
+    m = list_line.match( line )
+    if m:
+      steps.append( ( int( m.group(1) ), m.group(2) ) )
+  return sorted( steps )
+
+def list_steps( build_dir ):
+  output = subprocess.check_output( [ "make", "list" ], cwd=build_dir,
+                                    universal_newlines=True )
+  return parse_step_list( output.splitlines() )
+
+#-------------------------------------------------------------------------
+# fingerprint_steps
+#-------------------------------------------------------------------------
+# Returns a dict mapping each step name to its fingerprint. steps must
+# be in build order so upstream fingerprints are known.
+
+def fingerprint_steps( g, steps ):
+  fingerprints = {}
+
+  for _, name in steps:
+    step   = g.get_step( name )
+    params = dict( step.params() )
+
+    upstream = []
+    for edge in g.get_edges_i( name ):
+      src_step, src_file = edge.get_src()
+      _,        dst_file = edge.get_dst()
+      upstream.append( ( dst_file, fingerprints.get( src_step ), src_file ) )
+
+    sources = { 'step_dir' : hash_tree( step.get_dir() ) }
+    if not upstream and 'sim_path' in params:
+      sources['sim_path'] = hash_tree( params['sim_path'], is_sim_source )
+
+    fingerprints[name] = step_fingerprint( name, [ params, sources ],
+                                           sorted( upstream ) )
+
+  return fingerprints
+
+#-------------------------------------------------------------------------
+# touch_tree
+#-------------------------------------------------------------------------
+# Sets the timestamps of everything under path to now without following
+# symlinks, so make considers a restored step newer than its inputs.
+
+def touch_tree( path ):
+  now = time.time()
+  for dirpath, dirnames, filenames in os.walk( path ):
+    for name in dirnames + filenames:
+      os.utime( os.path.join( dirpath, name ), ( now, now ),
+                follow_symlinks=False )
+  os.utime( path, ( now, now ) )
+
+#-------------------------------------------------------------------------
+# link_inputs
+#-------------------------------------------------------------------------
+# Recreates the inputs of a restored step as links to the outputs of the
+# upstream steps in this build directory, the same way mflowgen does.
+
+def link_inputs( g, build_dir, name, step_dir ):
+  inputs_dir = os.path.join( step_dir, "inputs" )
+  shutil.rmtree( inputs_dir, ignore_errors=True )
+  os.makedirs( inputs_dir )
+
+  for edge in g.get_edges_i( name ):
+    src_step, src_file = edge.get_src()
+    _,        dst_file = edge.get_dst()
+    src_dir = os.path.basename( find_step_dir( build_dir, src_step ) )
+    os.symlink( os.path.join( "..", "..", src_dir, "outputs", src_file ),
+                os.path.join( inputs_dir, dst_file ) )
+
+#-------------------------------------------------------------------------
+# run_flow
+#-------------------------------------------------------------------------
+# Runs the flow in build_dir (which must have been configured with
+# mflowgen run) one step at a time, restoring steps from the store when
+# their fingerprint matches. If targets is given only those steps (and
+# the steps they depend on) are run. Returns the exit code of the first
+# failing step (or 0) and a list of StepResults in build order.
+#
+# action is "up-to-date" if the step in the build directory already has
+# the right fingerprint, "restored" if it was restored from the store,
+# "ran" if we had to run it, and "failed" if running it failed. time is
+# how long it took to run or restore the step, and saved is how long
+# running the step took originally minus the time to restore it.
+#
+# run_step is called with the step number to run a step and returns the
+# exit code. By default it runs make in the build directory.
+
+StepResult = namedtuple( "StepResult", "number name action time saved" )
+
+def get_ancestors( g, targets ):
+  needed = set()
+  todo   = list( targets )
+  while todo:
+    name = todo.pop()
+    if name not in needed:
+      needed.add( name )
+      todo.extend( edge.get_src()[0] for edge in g.get_edges_i( name ) )
+  return needed
+
+def run_flow( build_dir, design_dir, store, targets=(), log=print,
+              run_step=None ):
+
+  if run_step is None:
+    run_step = lambda number: \
+      subprocess.run( [ "make", str(number) ], cwd=build_dir ).returncode
+
+  g     = load_graph( design_dir )
+  steps = list_steps( build_dir )
+  fps   = fingerprint_steps( g, steps )
+
+  if targets:
+    names  = { str(n) : name for n, name in steps }
+    needed = get_ancestors( g, [ names.get( t, t ) for t in targets ] )
+    steps  = [ ( n, name ) for n, name in steps if name in needed ]
+
+  results = []
+
+  for number, name in steps:
+    fp       = fps[name]
+    step_dir = os.path.join( build_dir, f"{number}-{name}" )
+    fp_path  = os.path.join( step_dir, fingerprint_file )
+
+    # Already built with the same fingerprint
+
+    if os.path.exists( fp_path ):
+      with open( fp_path ) as f:
+        if f.read().strip() == fp:
+          results.append( StepResult( number, name, "up-to-date", 0.0, 0.0 ) )
+          continue
+
+    # Restore from the store
+
+    start = time.perf_counter()
+    meta  = store.restore( fp, step_dir ) if store is not None else None
+
+    if meta is not None:
+      link_inputs( g, build_dir, name, step_dir )
+      touch_tree( step_dir )
+      restore_time = time.perf_counter() - start
+      results.append( StepResult( number, name, "restored", restore_time,
+                                  max( 0.0, meta['runtime'] - restore_time ) ) )
+      log( f" {number:>3}-{name}: restored from the store"
+           f" (saved {meta['runtime'] - restore_time:.1f}s)" )
+      continue
+
+    # Run the step
+
+    log( f" {number:>3}-{name}: running" )
+    ret     = run_step( number )
+    runtime = time.perf_counter() - start
+
+    if ret != 0:
+      results.append( StepResult( number, name, "failed", runtime, 0.0 ) )
+      return ret, results
+
+    with open( fp_path, "w" ) as f:
+      f.write( fp + "\n" )
+
+    if store is not None:
+      store.store( fp, step_dir, { 'step' : name, 'runtime' : runtime } )
+
+    results.append( StepResult( number, name, "ran", runtime, 0.0 ) )
+
+  return 0, results
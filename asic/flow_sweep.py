@@ -0,0 +1,365 @@
+#=========================================================================
+# flow_sweep
+#=========================================================================
+# Helper functions for sweeping the parameters of the block flow in
+# SortUnitStructRTL_BlockFlow.py. Each point of the sweep gets its own
+# sweep directory with a generated design directory (a .mflowgen.yml
+# and a construct.py which calls the block flow construct with the
+# parameters for that point) and an mflowgen build directory:
+#
+#   <sweep_dir>/<point>/design/.mflowgen.yml
+#   <sweep_dir>/<point>/design/construct.py
+#   <sweep_dir>/<point>/build
+#
+# Upstream steps such as ece5745-block-gather and the RTL simulation
+# only depend on a few of the parameters (e.g., nbits but not the clock
+# period), so many points of a sweep would run exactly the same step.
+# We fingerprint these steps by their parameters (and the fingerprints
+# of the shared steps they depend on), run each distinct step once in
+# the build directory of one point, and copy the resulting step
+# directory into the build directories of all other points with the
+# same fingerprint before running the rest of the flow.
+#
+# If a step store (see flow_cache) is given, each flow runs one step at
+# a time through flow_cache.run_flow, so steps already in the store from
+# earlier sweeps are restored instead of run.
+
+import csv
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+from collections        import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+asic_dir = os.path.dirname( os.path.abspath( __file__ ) )
+
+#-------------------------------------------------------------------------
+# Defaults
+#-------------------------------------------------------------------------
+
+# Shared steps in the order they need to run, along with the shared
+# steps each one depends on
+
+shared_steps = [
+  ( 'ece5745-block-gather',   [] ),
+  ( 'brg-rtl-4-state-vcssim', [ 'ece5745-block-gather' ] ),
+]
+
+# Columns of the summary table
+
+default_columns = [
+  'design_area', 'core_area', 'constraint', 'slack', 'actual_clk',
+]
+
+#-------------------------------------------------------------------------
+# expand_grid
+#-------------------------------------------------------------------------
+# Returns one dict of construct keyword arguments for every point in the
+# cross product of the lists in grid, in the order of the grid keys.
+
+def expand_grid( grid ):
+  keys = list( grid.keys() )
+  return [ dict( zip( keys, values ) )
+           for values in itertools.product( *[ grid[k] for k in keys ] ) ]
+
+#-------------------------------------------------------------------------
+# point_name
+#-------------------------------------------------------------------------
+# Returns a directory name for one point of the sweep. Booleans are
+# written as 0/1 so names stay short.
+
+def point_name( params ):
+  def fmt( v ):
+    return str( int(v) ) if isinstance( v, bool ) else str( v )
+  return "-".join( f"{k}_{fmt(v)}" for k, v in params.items() )
+
+#-------------------------------------------------------------------------
+# step_fingerprint
+#-------------------------------------------------------------------------
+# Returns a fingerprint for a step given its parameters and the
+# fingerprints of the steps it depends on.
+
+def step_fingerprint( name, params, upstream=() ):
+  string = json.dumps( [ name, params, list(upstream) ], sort_keys=True,
+                       default=str )
+  return hashlib.blake2b( string.encode('utf-8'), digest_size=16 ).hexdigest()
+
+#-------------------------------------------------------------------------
+# get_step_params
+#-------------------------------------------------------------------------
+# Builds the block flow graph for the given point and returns a dict
+# mapping the name of each shared step to its parameters.
+
+def get_step_params( params ):
+  if asic_dir not in sys.path:
+    sys.path.insert( 0, asic_dir )
+  from SortUnitStructRTL_BlockFlow import construct
+
+  g = construct( **params )
+  return { name : dict( g.get_step( name ).params() )
+           for name, _ in shared_steps }
+
+#-------------------------------------------------------------------------
+# group_points
+#-------------------------------------------------------------------------
+# Given a list of dicts mapping shared step names to step parameters
+# (one per point), returns a dict mapping each shared step name to a
+# list of groups. Each group is a list of point indices which can share
+# that step, the first of which is the leader that runs the step.
+
+def group_points( step_params ):
+  groups = {}
+  fingerprints = [ {} for _ in step_params ]
+
+  for name, deps in shared_steps:
+    by_fp = {}
+    for i, point in enumerate( step_params ):
+      upstream = [ fingerprints[i][dep] for dep in deps ]
+      fp = step_fingerprint( name, point[name], upstream )
+      fingerprints[i][name] = fp
+      by_fp.setdefault( fp, [] ).append( i )
+    groups[name] = list( by_fp.values() )
+
+  return groups
+
+#-------------------------------------------------------------------------
+# FlowBuild
+#-------------------------------------------------------------------------
+# One point of the sweep
+
+FlowBuild = namedtuple( "FlowBuild", "name params design_dir build_dir" )
+
+construct_template = '''\
+#=========================================================================
+# construct.py
+#=========================================================================
+# Generated by sweep-block-flow for {name}
+
+import sys
+sys.path.insert( 0, {asic_dir!r} )
+
+from SortUnitStructRTL_BlockFlow import construct as construct_block_flow
+
+def construct():
+  return construct_block_flow( **{params!r} )
+'''
+
+def mk_build( sweep_dir, params ):
+  name       = point_name( params )
+  design_dir = os.path.join( sweep_dir, name, "design" )
+  build_dir  = os.path.join( sweep_dir, name, "build" )
+
+  os.makedirs( design_dir, exist_ok=True )
+  os.makedirs( build_dir,  exist_ok=True )
+
+  with open( os.path.join( design_dir, "construct.py" ), "w" ) as f:
+    f.write( construct_template.format( name=name, asic_dir=asic_dir,
+                                        params=params ) )
+
+  with open( os.path.join( design_dir, ".mflowgen.yml" ), "w" ) as f:
+    f.write( "construct: construct.py\n" )
+
+  return FlowBuild( name, params, design_dir, build_dir )
+
+#-------------------------------------------------------------------------
+# run_cmd
+#-------------------------------------------------------------------------
+# Runs a command in a build directory and appends its output to the
+# sweep.log in that build directory. Returns the exit code.
+
+def run_cmd( build, cmd ):
+  with open( os.path.join( build.build_dir, "sweep.log" ), "a" ) as log:
+    log.write( f"\n% {' '.join(cmd)}\n" )
+    log.flush()
+    result = subprocess.run( cmd, cwd=build.build_dir, stdout=log,
+                             stderr=subprocess.STDOUT )
+  return result.returncode
+
+def mflowgen_run( build ):
+  return run_cmd( build, [ "mflowgen", "run", "--design", build.design_dir ] )
+
+def make( build, *targets ):
+  return run_cmd( build, [ "make" ] + list(targets) )
+
+def make_cached( build, store, *targets ):
+  from flow_cache import run_flow
+
+  def log( msg ):
+    with open( os.path.join( build.build_dir, "sweep.log" ), "a" ) as f:
+      f.write( msg + "\n" )
+
+  ret, _ = run_flow( build.build_dir, build.design_dir, store, targets, log,
+                     lambda number: make( build, str(number) ) )
+  return ret
+
+#-------------------------------------------------------------------------
+# find_step_dir
+#-------------------------------------------------------------------------
+# mflowgen names step directories <N>-<step name>. Returns None if the
+# step is not in the build directory.
+
+def find_step_dir( build_dir, step ):
+  pattern = re.compile( r"^\d+-" + re.escape( step ) + "$" )
+  for name in sorted( os.listdir( build_dir ) ):
+    if pattern.match( name ):
+      return os.path.join( build_dir, name )
+  return None
+
+#-------------------------------------------------------------------------
+# copy_step
+#-------------------------------------------------------------------------
+# Copies a finished step directory from one build directory to another.
+# We keep symlinks as symlinks (step inputs are relative links to the
+# outputs of earlier steps) and preserve timestamps so make considers
+# the copied step up to date.
+
+def copy_step( src_build_dir, dest_build_dir, step ):
+  src = find_step_dir( src_build_dir, step )
+  if src is None:
+    raise RuntimeError( f"step {step} is missing from {src_build_dir}" )
+
+  dest = os.path.join( dest_build_dir, os.path.basename( src ) )
+  shutil.rmtree( dest, ignore_errors=True )
+  shutil.copytree( src, dest, symlinks=True )
+
+#-------------------------------------------------------------------------
+# parse_summary
+#-------------------------------------------------------------------------
+# The brg-flow-summary step writes "key = value unit" lines. Returns a
+# dict mapping each key to its value (without the unit). Later
+# occurrences of a key do not override earlier ones.
+
+summary_line = re.compile( r"^\s*(\w+)\s*=\s*(\S+)" )
+
+def parse_summary( lines ):
+  summary = {}
+  for line in lines:
+    m = summary_line.match( line )
+    if m:
+      summary.setdefault( m.group(1), m.group(2) )
+  return summary
+
+def read_summary( build_dir ):
+  step_dir = find_step_dir( build_dir, "brg-flow-summary" )
+  if step_dir is None:
+    return {}
+
+  summary = {}
+  for subdir in [ "outputs", "" ]:
+    path = os.path.join( step_dir, subdir )
+    if not os.path.isdir( path ):
+      continue
+    for name in sorted( os.listdir( path ) ):
+      if name.endswith( ".txt" ):
+        with open( os.path.join( path, name ) ) as f:
+          for k, v in parse_summary( f ).items():
+            summary.setdefault( k, v )
+    if summary:
+      break
+
+  return summary
+
+#-------------------------------------------------------------------------
+# format_table
+#-------------------------------------------------------------------------
+# Returns the rows (a list of dicts) as a text table with the given
+# columns. Missing values are shown as "-".
+
+def format_table( rows, columns ):
+  cells  = [ [ str( row.get( c, "-" ) ) for c in columns ] for row in rows ]
+  widths = [ max( [ len(c) ] + [ len( r[i] ) for r in cells ] )
+             for i, c in enumerate( columns ) ]
+
+  lines = [ " ".join( f"{c:>{w}}" for c, w in zip( columns, widths ) ) ]
+  lines.append( " ".join( "-"*w for w in widths ) )
+  for r in cells:
+    lines.append( " ".join( f"{v:>{w}}" for v, w in zip( r, widths ) ) )
+  return "\n".join( lines )
+
+def write_csv( rows, path ):
+  columns = []
+  for row in rows:
+    columns.extend( k for k in row if k not in columns )
+  with open( path, "w", newline="" ) as f:
+    writer = csv.DictWriter( f, fieldnames=columns )
+    writer.writeheader()
+    writer.writerows( rows )
+
+#-------------------------------------------------------------------------
+# run_sweep
+#-------------------------------------------------------------------------
+# Runs the block flow for every point in points (a list of dicts of
+# construct keyword arguments) with at most nworkers concurrent flows.
+# Returns a list of dicts, one per point, with the parameters, the exit
+# code of the flow, and the contents of the flow summary.
+
+def run_sweep( points, sweep_dir, nworkers=None, targets=(), share=True,
+               store=None, log=print ):
+
+  nworkers = nworkers or len(points)
+  builds   = [ mk_build( sweep_dir, params ) for params in points ]
+  status   = [ 0 ] * len(builds)
+
+  def run_targets( build, *targets ):
+    if store is None:
+      return make( build, *targets )
+    return make_cached( build, store, *targets )
+
+  with ThreadPoolExecutor( max_workers=nworkers ) as executor:
+
+    def run_all( func, indices ):
+      futures = { i : executor.submit( func, builds[i] ) for i in indices }
+      for i, f in futures.items():
+        status[i] = status[i] or f.result()
+
+    # Set up every build directory
+
+    log( f" configuring {len(builds)} flows in {sweep_dir}" )
+    run_all( mflowgen_run, range(len(builds)) )
+
+    # Run each distinct shared step once and copy it to the other builds
+
+    if share:
+      groups = group_points( [ get_step_params( b.params ) for b in builds ] )
+      for step, _ in shared_steps:
+        leaders = [ g[0] for g in groups[step] if status[g[0]] == 0 ]
+        log( f" running {step} for {len(leaders)} of {len(builds)} flows" )
+        run_all( lambda b: run_targets( b, step ), leaders )
+
+        for group in groups[step]:
+          for i in group[1:]:
+            if status[group[0]] != 0:
+              status[i] = status[group[0]]
+            elif status[i] == 0:
+              copy_step( builds[group[0]].build_dir, builds[i].build_dir, step )
+
+    # Run the rest of the flow
+
+    log( f" running the rest of the flow for {len(builds)} flows" )
+
+    def run_flow( build ):
+      i = builds.index( build )
+      if status[i] != 0:
+        return status[i]
+      start = time.perf_counter()
+      ret   = run_targets( build, *targets )
+      log( f"  {build.name}: exit code {ret},"
+           f" {time.perf_counter() - start:.1f}s" )
+      return ret
+
+    run_all( run_flow, range(len(builds)) )
+
+  rows = []
+  for i, build in enumerate( builds ):
+    row = dict( name=build.name, **build.params, returncode=status[i] )
+    row.update( read_summary( build.build_dir ) )
+    rows.append( row )
+
+  return rows
@@ -2,9 +2,13 @@
 # conftest
 #=========================================================================
 
+import os
 import pytest
 import random
 
+from sim_utils.randseed import env_var, parse_seed, session_seed, \
+                               set_session_seed, derive_seed
+
 #-------------------------------------------------------------------------
 # pytest_addoption
 #-------------------------------------------------------------------------
@@ -17,6 +21,17 @@ def pytest_addoption(parser):
   parser.addoption( "--vrtl", action="store_true",
                     help="use VRTL implementations" )
 
+  parser.addoption( "--vl-cache-dir", default=None,
+                    help="reuse verilated models from this shared cache "
+                         "directory (default $PYMTL_VL_CACHE_DIR)" )
+
+  parser.addoption( "--vl-cache-size", default=None, type=int,
+                    help="max size of the verilated model cache in MB" )
+
+  parser.addoption( "--randseed", default=None,
+                    help="session seed for the random test vectors, or "
+                         "'random' (default $PYMTL_RANDSEED or 0xdeadbeef)" )
+
 #-------------------------------------------------------------------------
 # Handle other command line options
 #-------------------------------------------------------------------------
@@ -30,28 +45,61 @@ def pytest_configure(config):
   elif config.option.vrtl:
     sys._pymtl_rtl_override = 'verilog'
 
+  if config.option.vl_cache_dir or os.environ.get( "PYMTL_VL_CACHE_DIR" ):
+    from sim_utils.vl_cache import enable_vl_cache
+    max_size = config.option.vl_cache_size
+    enable_vl_cache( config.option.vl_cache_dir,
+                     max_size * 1024**2 if max_size else None )
+
+  # Resolve the session seed once and put it in the environment, where
+  # the test modules and any subprocesses pick it up
+
+  config._saved_randseed = os.environ.get( env_var )
+  set_session_seed( parse_seed( config.option.randseed
+                                or config._saved_randseed ) )
+
 def pytest_unconfigure(config):
   import sys
   del sys._called_from_test
   del sys._pymtl_rtl_override
 
+  if config._saved_randseed is None:
+    os.environ.pop( env_var, None )
+  else:
+    os.environ[ env_var ] = config._saved_randseed
+
 #-------------------------------------------------------------------------
-# fix_randseed
+# pytest_report_header
 #-------------------------------------------------------------------------
 
 def pytest_report_header(config):
+  lines = [ f"random seed {session_seed():#x}" ]
   if config.option.prtl:
-    return "forcing RTL language to be pymtl"
+    lines.append( "forcing RTL language to be pymtl" )
   elif config.option.vrtl:
-    return "forcing RTL language to be verilog"
+    lines.append( "forcing RTL language to be verilog" )
+  return lines
+
+#-------------------------------------------------------------------------
+# pytest_terminal_summary
+#-------------------------------------------------------------------------
+# Tell the user how to reproduce the random values of a failing test.
+
+def pytest_terminal_summary(terminalreporter):
+  if terminalreporter.stats.get( "failed" ) or terminalreporter.stats.get( "error" ):
+    terminalreporter.write_line(
+      f"random seed {session_seed():#x}, rerun failing tests with "
+      f"--randseed {session_seed():#x} to reproduce their random values" )
 
 #-------------------------------------------------------------------------
 # fix_randseed
 #-------------------------------------------------------------------------
-# fix random seed to make tests reproducable
+# fix random seed to make tests reproducable. Each test case gets its
+# own seed derived from the session seed and its node id, so the random
+# values it sees do not depend on what ran before it or where it runs.
 
 @pytest.fixture(autouse=True)
-def fix_randseed():
+def fix_randseed(request):
   """Set the random seed prior to each test case."""
-  random.seed(0xdeadbeef)
+  random.seed( derive_seed( request.node.nodeid ) )
 
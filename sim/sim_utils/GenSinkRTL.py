@@ -0,0 +1,126 @@
+#=========================================================================
+# GenSinkRTL
+#=========================================================================
+# Test sink with an RTL stream interface which draws the expected
+# messages from a generator instead of from a list. Each received message
+# is checked as soon as it arrives and then discarded, so the memory
+# usage is constant no matter how many messages we receive. The msgs
+# parameter is a function which returns a new iterator over the expected
+# messages; we call it on every reset. Random delays and checkpointing
+# work as in GenSourceRTL.
+
+import itertools
+import random
+
+from pymtl3 import *
+from pymtl3.stdlib.stream.ifcs import RecvIfcRTL
+from pymtl3.stdlib.stream.SinkRTL import PyMTLTestSinkError
+
+class GenSinkRTL( Component ):
+
+  # Constructor
+
+  def construct( s, Type, msgs, initial_delay=0, interval_delay=0,
+                 cmp_fn=lambda a, b : a == b, max_random_delay=0,
+                 seed=0xdeadbeef ):
+
+    # Interface
+
+    s.recv = RecvIfcRTL( Type )
+
+    # Data
+
+    s.msgs      = msgs
+    s.iter      = None
+    s.msg       = None
+    s.nmsgs     = 0
+    s.count     = 0
+    s.rng       = None
+    s.error_msg = ''
+
+    s.all_msg_recved = False
+    s.done_flag      = False
+
+    @update_ff
+    def up_sink():
+
+      # Raise exception at the start of next cycle so that the errored
+      # line trace gets printed out
+
+      if s.error_msg:
+        raise PyMTLTestSinkError( s.error_msg )
+
+      # Tick one more cycle after all message is received so that the
+      # exception gets thrown
+
+      if s.all_msg_recved:
+        s.done_flag = True
+
+      if s.iter is not None and s.msg is None:
+        s.all_msg_recved = True
+
+      if s.reset:
+        s.iter  = iter( s.msgs() )
+        s.msg   = next( s.iter, None )
+        s.nmsgs = 0
+        s.count = initial_delay
+        s.rng   = random.Random( seed )
+        s.all_msg_recved = False
+        s.done_flag      = False
+        s.recv.rdy <<= (s.msg is not None) & (s.count == 0)
+
+      else:
+
+        if s.recv.val & s.recv.rdy:
+          msg = s.recv.msg
+
+          if s.msg is None:
+            s.error_msg = ( 'Test Sink received more msgs than expected!\n'
+                           f'Received : {msg}' )
+
+          elif not cmp_fn( msg, s.msg ):
+            s.error_msg = (
+              f'Test sink {s} received WRONG message!\n'
+              f'Message  : {s.nmsgs}\n'
+              f'Expected : {s.msg}\n'
+              f'Received : {msg}'
+            )
+
+          s.msg    = next( s.iter, None )
+          s.nmsgs += 1
+          s.count  = interval_delay
+          if max_random_delay:
+            s.count += s.rng.randint( 0, max_random_delay )
+
+        if s.count > 0:
+          s.count -= 1
+          s.recv.rdy <<= 0
+        else: # s.count == 0
+          s.recv.rdy <<= (s.msg is not None)
+
+  def done( s ):
+    return s.done_flag
+
+  # Checkpointing
+
+  def checkpoint_state( s ):
+    return { 'started': s.iter is not None, 'msg': s.msg, 'nmsgs': s.nmsgs,
+             'count': s.count, 'rng': s.rng, 'error_msg': s.error_msg,
+             'all_msg_recved': s.all_msg_recved, 'done_flag': s.done_flag }
+
+  def restore_state( s, state ):
+    s.iter           = None
+    s.msg            = state['msg']
+    s.nmsgs          = state['nmsgs']
+    s.count          = state['count']
+    s.rng            = state['rng']
+    s.error_msg      = state['error_msg']
+    s.all_msg_recved = state['all_msg_recved']
+    s.done_flag      = state['done_flag']
+    if state['started']:
+      s.iter = itertools.islice( s.msgs(), s.nmsgs + 1, None )
+
+  # Line tracing
+
+  def line_trace( s ):
+    return f"{s.recv}"
@@ -0,0 +1,96 @@
+#=========================================================================
+# GenSourceRTL
+#=========================================================================
+# Test source with an RTL stream interface which draws its messages from
+# a generator instead of from a list. Unlike stream.SourceRTL, the
+# messages are never all materialized at once, so the memory usage is
+# constant no matter how many messages we send. The msgs parameter is a
+# function which returns a new iterator over the messages; we call it on
+# every reset so the source always starts again from the first message.
+#
+# With max_random_delay, every message is followed by an extra random
+# delay of up to max_random_delay cycles on top of interval_delay. The
+# delays come from a private random number generator which is seeded
+# with seed on every reset, so a run can be repeated exactly.
+#
+# The iterator cannot be checkpointed (see sim_utils/checkpoint.py), so
+# we save the number of messages sent instead, and restoring skips over
+# that many messages of a new iterator.
+
+import itertools
+import random
+
+from pymtl3 import *
+from pymtl3.stdlib.stream.ifcs import SendIfcRTL
+
+class GenSourceRTL( Component ):
+
+  # Constructor
+
+  def construct( s, Type, msgs, initial_delay=0, interval_delay=0,
+                 max_random_delay=0, seed=0xdeadbeef ):
+
+    # Interface
+
+    s.send = SendIfcRTL( Type )
+
+    # Data
+
+    s.msgs  = msgs
+    s.iter  = None
+    s.msg   = None
+    s.nmsgs = 0
+    s.count = 0
+    s.rng   = None
+
+    @update_ff
+    def up_src():
+      if s.reset:
+        s.iter  = iter( s.msgs() )
+        s.msg   = next( s.iter, None )
+        s.nmsgs = 0
+        s.count = initial_delay
+        s.rng   = random.Random( seed )
+        s.send.val <<= 0
+
+      else:
+        if s.send.val & s.send.rdy:
+          s.msg    = next( s.iter, None )
+          s.nmsgs += 1
+          s.count  = interval_delay
+          if max_random_delay:
+            s.count += s.rng.randint( 0, max_random_delay )
+
+        if s.count > 0:
+          s.count -= 1
+          s.send.val <<= 0
+
+        else: # s.count == 0
+          if s.msg is not None:
+            s.send.val <<= 1
+            s.send.msg <<= s.msg
+          else:
+            s.send.val <<= 0
+
+  def done( s ):
+    return s.iter is not None and s.msg is None
+
+  # Checkpointing
+
+  def checkpoint_state( s ):
+    return { 'started': s.iter is not None, 'msg': s.msg, 'nmsgs': s.nmsgs,
+             'count': s.count, 'rng': s.rng }
+
+  def restore_state( s, state ):
+    s.iter  = None
+    s.msg   = state['msg']
+    s.nmsgs = state['nmsgs']
+    s.count = state['count']
+    s.rng   = state['rng']
+    if state['started']:
+      s.iter = itertools.islice( s.msgs(), s.nmsgs + 1, None )
+
+  # Line tracing
+
+  def line_trace( s ):
+    return f"{s.send}"
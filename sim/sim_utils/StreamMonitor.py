@@ -0,0 +1,102 @@
+#=========================================================================
+# StreamMonitor
+#=========================================================================
+# Watches the val/rdy handshakes on the input (recv) and output (send)
+# stream interfaces of a unit which answers its requests in order, and
+# records for every request
+#
+#  - wait: cycles from when the request is first offered (recv.val) to
+#    when the unit accepts it (recv.val & recv.rdy),
+#
+#  - latency: cycles from when the unit accepts the request to when the
+#    response leaves the unit (send.val & send.rdy),
+#
+# in a LatencyHistogram each. It also attributes every cycle to exactly
+# one of
+#
+#  - send: a response leaves the unit,
+#  - sink: a response is waiting for the sink (sink backpressure),
+#  - busy: the unit is working on a request, or is not ready for one
+#    which is waiting for it (unit busy),
+#  - src:  the unit is idle and the source has no request (src empty).
+#
+# The monitor only has input ports, so the test harness connects them to
+# the same signals as the source, unit, and sink, and it only reads four
+# bits per cycle, so it can stay on for long runs. Like the test sources
+# and sinks, it starts over on reset.
+
+from collections import deque
+
+from pymtl3 import *
+
+from .latency import LatencyHistogram
+
+class StreamMonitor( Component ):
+
+  # Constructor
+
+  def construct( s ):
+
+    # Interface
+
+    s.recv_val = InPort()
+    s.recv_rdy = InPort()
+    s.send_val = InPort()
+    s.send_rdy = InPort()
+
+    # Data
+
+    s.clear()
+
+    @update_ff
+    def up_monitor():
+
+      if s.reset:
+        s.clear()
+
+      else:
+        cycle = s.ncycles
+
+        if s.recv_val:
+          if s.offered is None:
+            s.offered = cycle
+          if s.recv_rdy:
+            s.wait.add( cycle - s.offered )
+            s.offered = None
+            s.accepted.append( cycle )
+
+        if s.send_val & s.send_rdy:
+          if s.accepted:
+            s.latency.add( cycle - s.accepted.popleft() )
+          s.cycles['send'] += 1
+        elif s.send_val:
+          s.cycles['sink'] += 1
+        elif s.accepted or s.recv_val:
+          s.cycles['busy'] += 1
+        else:
+          s.cycles['src'] += 1
+
+        s.ncycles += 1
+
+  def clear( s ):
+    s.ncycles  = 0
+    s.offered  = None
+    s.accepted = deque()
+    s.wait     = LatencyHistogram()
+    s.latency  = LatencyHistogram()
+    s.cycles   = { 'send': 0, 'sink': 0, 'busy': 0, 'src': 0 }
+
+  # Returns the statistics as a dict
+
+  def stats( s ):
+    return {
+      'ncycles' : s.ncycles,
+      'latency' : s.latency.summary(),
+      'wait'    : s.wait.summary(),
+      'cycles'  : dict( s.cycles ),
+    }
+
+  # Line tracing
+
+  def line_trace( s ):
+    return f"{len(s.accepted)}"
@@ -0,0 +1,21 @@
+#=========================================================================
+# sim_utils
+#=========================================================================
+# Simulation and testing utilities shared across the tutorials.
+#
+# The utilities are imported the first time they are used, so that
+# importing a module which does not need PyMTL (e.g., sim_utils.server)
+# stays fast.
+
+from .lazy import lazy_exports
+
+lazy_exports( __name__, {
+  'GenSourceRTL'   : '.GenSourceRTL',
+  'GenSinkRTL'     : '.GenSinkRTL',
+  'SimProfiler'    : '.profiling',
+  'BulkDriver'     : '.bulk',
+  'BinTraceWriter' : '.bintrace',
+  'BinTraceReader' : '.bintrace',
+  'VcdWriter'      : '.vcd',
+  'SaifWriter'     : '.saif',
+})
@@ -0,0 +1,366 @@
+#=========================================================================
+# bintrace
+#=========================================================================
+# A compact binary alternative to text line tracing. BinTraceWriter
+# records the values of selected signals every cycle, and the
+# render-trace script turns the recorded trace into text after the run:
+#
+#   model.apply( DefaultPassGroup() )
+#   model.sim_reset()
+#
+#   trace = BinTraceWriter( model, [ "in_val", "in_[*]", "out[*]" ],
+#                           "sort.trace" )
+#   trace.attach()
+#   ... tick loop ...
+#   trace.close()
+#
+# Signal names follow BulkDriver (dotted paths, list indices, and [*]
+# for every element of a list). attach() wraps model.sim_tick so that we
+# sample the signals right before every clock edge, which is when the
+# text line trace is printed, so the cycle numbers and values match what
+# --trace would show. The reset cycles are not recorded.
+#
+# The writer keeps one column per signal in memory and every
+# block_cycles cycles hands the full columns to a background thread,
+# which packs them (little-endian, using the narrowest of 1, 2, 4, or 8
+# bytes per value, or as many bytes as needed for wider signals),
+# compresses them with zlib, and appends them to the file. The file
+# format is:
+#
+#   magic        8 bytes, "PMTLBTR\x01"
+#   header_len   u32
+#   header       JSON with the signal names, bitwidths and itemsizes
+#   blocks       one per block_cycles cycles:
+#     start      u64, cycle number of the first cycle in the block
+#     ncycles    u32
+#     columns    one per signal: u32 length followed by the packed data
+#
+# BinTraceReader reads the blocks back one at a time, so rendering a
+# long trace also only needs one block in memory at once.
+
+import array
+import json
+import queue
+import re
+import struct
+import sys
+import threading
+import zlib
+
+from .bulk import _lookup_signals, _typecodes
+
+MAGIC = b"PMTLBTR\x01"
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+def _signal_nbits( sig ):
+  if hasattr( sig, 'to_bits' ):
+    return sig.to_bits().nbits
+  return sig.nbits
+
+def _signal_itemsize( nbits ):
+  for itemsize in sorted( _typecodes ):
+    if nbits <= 8*itemsize:
+      return itemsize
+  return ( nbits + 7 ) // 8
+
+def _mk_column( itemsize ):
+  if itemsize in _typecodes:
+    return array.array( _typecodes[ itemsize ] )
+  return []
+
+def _pack_column( col, itemsize ):
+  if isinstance( col, array.array ):
+    if sys.byteorder == "big":
+      col = array.array( col.typecode, col )
+      col.byteswap()
+    return col.tobytes()
+  return b"".join( v.to_bytes( itemsize, "little" ) for v in col )
+
+def _unpack_column( data, itemsize ):
+  if itemsize in _typecodes:
+    col = array.array( _typecodes[ itemsize ] )
+    col.frombytes( data )
+    if sys.byteorder == "big":
+      col.byteswap()
+    return col
+  return [ int.from_bytes( data[i:i+itemsize], "little" )
+           for i in range( 0, len(data), itemsize ) ]
+
+#-------------------------------------------------------------------------
+# BinTraceWriter
+#-------------------------------------------------------------------------
+
+class BinTraceWriter:
+
+  def __init__( s, model, signals, path, block_cycles=4096, compress=True ):
+
+    s.model        = model
+    s.block_cycles = block_cycles
+    s.compress     = compress
+
+    # Look up the signals once. Bitstruct signals are converted to Bits
+    # when sampled, so we keep them separate.
+
+    s.names    = []
+    s.signals  = []
+    s.nbits    = []
+    s.itemsize = []
+    for name in signals:
+      for full_name, sig in _lookup_signals( model, name ):
+        s.names.append( full_name )
+        s.signals.append( sig )
+        s.nbits.append( _signal_nbits( sig ) )
+        s.itemsize.append( _signal_itemsize( s.nbits[-1] ) )
+
+    s._new_block()
+
+    # Write the header and start the background writer
+
+    s.file = open( path, "wb" )
+
+    header = json.dumps({
+      'signals'  : [ { 'name': n, 'nbits': b, 'itemsize': i }
+                     for n, b, i in zip( s.names, s.nbits, s.itemsize ) ],
+      'compress' : "zlib" if compress else "none",
+    }).encode()
+
+    s.file.write( MAGIC + struct.pack( "<I", len(header) ) + header )
+
+    s.queue  = queue.Queue( maxsize=4 )
+    s.error  = None
+    s.thread = threading.Thread( target=s._writer, daemon=True )
+    s.thread.start()
+
+  def _new_block( s ):
+    s.columns = [ _mk_column( itemsize ) for itemsize in s.itemsize ]
+    s.start   = None
+    s.ncycles = 0
+
+    s.bits_appends   = []
+    s.struct_appends = []
+    for col, sig in zip( s.columns, s.signals ):
+      if hasattr( sig, 'to_bits' ):
+        s.struct_appends.append( ( col.append, sig ) )
+      else:
+        s.bits_appends.append( ( col.append, sig ) )
+
+  #-----------------------------------------------------------------------
+  # sample
+  #-----------------------------------------------------------------------
+  # Records the current value of every signal as the next cycle.
+
+  def sample( s ):
+    if s.start is None:
+      s.start = s.model.sim_cycle_count()
+
+    for append, sig in s.bits_appends:
+      append( int(sig) )
+    for append, sig in s.struct_appends:
+      append( int( sig.to_bits() ) )
+
+    s.ncycles += 1
+    if s.ncycles == s.block_cycles:
+      s.flush()
+
+  #-----------------------------------------------------------------------
+  # attach
+  #-----------------------------------------------------------------------
+  # Makes model.sim_tick sample the signals before every clock edge.
+
+  def attach( s ):
+    sample = s.sample
+    tick   = s.model.sim_tick
+
+    def sim_tick():
+      sample()
+      tick()
+
+    s.model.sim_tick = sim_tick
+
+  #-----------------------------------------------------------------------
+  # flush/close
+  #-----------------------------------------------------------------------
+
+  def flush( s ):
+    if s.error is not None:
+      raise s.error
+    if s.ncycles:
+      s.queue.put( ( s.start, s.ncycles, s.columns ) )
+      s._new_block()
+
+  def close( s ):
+    s.flush()
+    s.queue.put( None )
+    s.thread.join()
+    s.file.close()
+    if s.error is not None:
+      raise s.error
+
+  def __enter__( s ):
+    return s
+
+  def __exit__( s, *args ):
+    s.close()
+
+  # Runs in the background thread, packs and writes each block
+
+  def _writer( s ):
+    try:
+      while True:
+        block = s.queue.get()
+        if block is None:
+          return
+
+        start, ncycles, columns = block
+        data = [ struct.pack( "<QI", start, ncycles ) ]
+        for col, itemsize in zip( columns, s.itemsize ):
+          packed = _pack_column( col, itemsize )
+          if s.compress:
+            packed = zlib.compress( packed, 1 )
+          data.append( struct.pack( "<I", len(packed) ) )
+          data.append( packed )
+
+        s.file.write( b"".join( data ) )
+
+    except Exception as e:
+      s.error = e
+
+      # Keep draining the queue so that the simulation does not block
+
+      while s.queue.get() is not None:
+        pass
+
+#-------------------------------------------------------------------------
+# BinTraceReader
+#-------------------------------------------------------------------------
+
+class BinTraceReader:
+
+  def __init__( s, path ):
+    s.path = path
+    with open( path, "rb" ) as file:
+      if file.read( len(MAGIC) ) != MAGIC:
+        raise ValueError( f"{path} is not a binary trace" )
+      header_len = struct.unpack( "<I", file.read(4) )[0]
+      header     = json.loads( file.read( header_len ) )
+      s.offset   = file.tell()
+
+    s.signals  = header['signals']
+    s.names    = [ sig['name'] for sig in s.signals ]
+    s.compress = header['compress'] == "zlib"
+
+  #-----------------------------------------------------------------------
+  # blocks
+  #-----------------------------------------------------------------------
+  # Yields (start, ncycles, columns) for every block, where columns is a
+  # list with the values of each signal in the block.
+
+  def blocks( s ):
+    with open( s.path, "rb" ) as file:
+      file.seek( s.offset )
+      while True:
+        head = file.read( 12 )
+        if len(head) < 12:
+          return
+        start, ncycles = struct.unpack( "<QI", head )
+
+        columns = []
+        for sig in s.signals:
+          nbytes = struct.unpack( "<I", file.read(4) )[0]
+          data   = file.read( nbytes )
+          if s.compress:
+            data = zlib.decompress( data )
+          columns.append( _unpack_column( data, sig['itemsize'] ) )
+
+        yield start, ncycles, columns
+
+  #-----------------------------------------------------------------------
+  # rows
+  #-----------------------------------------------------------------------
+  # Yields (cycle, values) for every recorded cycle.
+
+  def rows( s ):
+    for start, ncycles, columns in s.blocks():
+      for i in range( ncycles ):
+        yield start + i, [ col[i] for col in columns ]
+
+#-------------------------------------------------------------------------
+# render_trace
+#-------------------------------------------------------------------------
+# Yields one line of text per recorded cycle. With a format string, the
+# line is fmt.format(...) where every recorded signal is available under
+# its own name, so a trace of in_val, in_[*], and dpath.a_reg.out can use
+# "{in_val} {in_[0]:02x} {dpath.a_reg.out:04x}". Without one, we show
+# every signal in hex and group the elements of a list into {a,b,...}.
+# names restricts the output to the given signals (or lists of signals),
+# and start/stop to a range of cycles.
+
+class _Scope( dict ):
+  def __getattr__( s, name ):
+    try:
+      return s[name]
+    except KeyError:
+      raise AttributeError( name )
+
+_path_re = re.compile( r"(\w+)|\[(\d+)\]" )
+
+def _mk_scope( names, values ):
+  scope = _Scope()
+  for name, value in zip( names, values ):
+    keys = [ attr if attr else int(index)
+             for attr, index in _path_re.findall( name ) ]
+    node = scope
+    for key in keys[:-1]:
+      node = node.setdefault( key, _Scope() )
+    node[ keys[-1] ] = value
+  return scope
+
+def _mk_default_format( signals ):
+
+  # Group consecutive elements of the same list
+
+  groups = []
+  for i, sig in enumerate( signals ):
+    ndigits = ( sig['nbits'] + 3 ) // 4
+    field   = f"{{0[{i}]:0{ndigits}x}}"
+    m = re.match( r"^(.*)\[\d+\]$", sig['name'] )
+    if m and groups and groups[-1][0] == m.group(1) and groups[-1][2]:
+      groups[-1][1].append( field )
+    elif m:
+      groups.append( ( m.group(1), [ field ], True ) )
+    else:
+      groups.append( ( sig['name'], [ field ], False ) )
+
+  return " ".join( f"{name}={{{{{','.join(fields)}}}}}" if is_list
+                   else f"{name}={fields[0]}"
+                   for name, fields, is_list in groups )
+
+def render_trace( reader, fmt=None, names=None, start=None, stop=None ):
+
+  selected = list( range( len(reader.names) ) )
+  if names:
+    selected = [ i for i, name in enumerate( reader.names )
+                 if any( name == n or re.match( re.escape(n) + r"\[\d+\]$", name )
+                         for n in names ) ]
+
+  signals = [ reader.signals[i] for i in selected ]
+  sel_names = [ sig['name'] for sig in signals ]
+
+  default_fmt = None if fmt else _mk_default_format( signals )
+
+  for cycle, values in reader.rows():
+    if start is not None and cycle < start:
+      continue
+    if stop is not None and cycle >= stop:
+      return
+
+    values = [ values[i] for i in selected ]
+    if fmt:
+      line = fmt.format( **_mk_scope( sel_names, values ) )
+    else:
+      line = default_fmt.format( values )
+
+    yield f"{cycle:3}: {line}"
@@ -0,0 +1,207 @@
+#=========================================================================
+# bulk
+#=========================================================================
+# BulkDriver steps a model through many cycles in one call. Instead of
+# writing every input port and reading every output port through the
+# model's attributes each cycle, the simulator script hands the driver a
+# whole array of inputs (one row per cycle, one column per port) and a
+# preallocated array for the outputs:
+#
+#   model.apply( DefaultPassGroup() )
+#   model.sim_reset()
+#
+#   driver = BulkDriver( model, [ "in_val", "in_" ], [ "out_val", "out" ] )
+#   out    = driver.run( inputs )
+#
+# A port name which refers to a list of ports (e.g., in_ or in_[*])
+# stands for one column per element of the list, and names can be
+# dotted paths (e.g., recv.msg or units[0].recv.val). The input rows are
+# applied in order, one per cycle, and every input is driven with zero
+# once we run out of rows. Row c of the outputs holds the value of the
+# output ports right after the c-th clock edge, which is what a script
+# would see if it read the outputs right after calling sim_tick.
+#
+# The inputs can be a 2D NumPy array, a list of rows, or a packed bytes
+# buffer with the rows stored one after the other using itemsize bytes
+# per value in machine byte order. The outputs are written into any
+# contiguous writable buffer (a NumPy array, an array.array, or a
+# bytearray); if none is given we allocate a NumPy array (or an
+# array.array if NumPy is not installed) with the narrowest unsigned
+# integer type that fits the widest output port.
+#
+# The driver looks up the ports once, converts the whole batch of inputs
+# to Python integers at once, and then only calls sim_tick every cycle.
+# The model is still evaluated cycle by cycle (this works the same for
+# PyMTL and Verilator-backed models), but none of the per-cycle
+# attribute lookups and conversions are left in the loop. Unlike the
+# usual loop we also do not call sim_eval_combinational before sim_tick,
+# since sim_tick already evaluates the combinational logic with the new
+# inputs before the clock edge.
+
+import array
+import re
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+_typecodes = { 1: 'B', 2: 'H', 4: 'I', 8: 'Q' }
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+def _itemsize( nbits ):
+  for itemsize in sorted( _typecodes ):
+    if nbits <= 8*itemsize:
+      return itemsize
+  raise ValueError( f"ports wider than 64 bits are not supported ({nbits} bits)" )
+
+# Signal names are dotted paths which can index into lists of signals or
+# subcomponents (e.g., units[0].recv.val). The last field can also use
+# [*] for every element of a list, which is what a name without an index
+# means for a list anyway. Returns a list of (name,signal) pairs with one
+# pair per element of any expanded list.
+
+_field_re = re.compile( r"^(\w+)(?:\[(\*|\d+)\])?$" )
+
+def _lookup_signals( model, name ):
+
+  obj    = model
+  prefix = []
+  fields = name.split( "." )
+
+  for i, field in enumerate( fields ):
+    m = _field_re.match( field )
+    if not m:
+      raise ValueError( f"bad signal name {name!r}" )
+
+    attr, index = m.groups()
+    obj = getattr( obj, attr )
+
+    if index is not None and index != "*":
+      obj   = obj[ int(index) ]
+      field = f"{attr}[{index}]"
+    elif index == "*" and i != len( fields ) - 1:
+      raise ValueError( f"[*] is only allowed at the end of {name!r}" )
+    else:
+      field = attr
+
+    prefix.append( field )
+
+  prefix = ".".join( prefix )
+  if isinstance( obj, list ):
+    return [ ( f"{prefix}[{i}]", x ) for i, x in enumerate( obj ) ]
+  return [ ( prefix, obj ) ]
+
+def _lookup_ports( model, names ):
+  ports = []
+  for name in names:
+    if isinstance( name, str ):
+      ports.extend( port for _, port in _lookup_signals( model, name ) )
+    elif isinstance( name, list ):
+      ports.extend( name )
+    else:
+      ports.append( name )
+  return ports
+
+def _flatten_inputs( inputs, ncols, itemsize ):
+
+  if isinstance( inputs, ( bytes, bytearray, memoryview ) ):
+    return memoryview( inputs ).cast( 'B' ).cast( _typecodes[itemsize] ).tolist()
+
+  if np is not None and isinstance( inputs, np.ndarray ):
+    return inputs.reshape( -1 ).tolist()
+
+  if isinstance( inputs, array.array ):
+    return inputs.tolist()
+
+  flat = []
+  for row in inputs:
+    if ncols == 1 and not hasattr( row, '__len__' ):
+      flat.append( int(row) )
+    else:
+      flat.extend( int(v) for v in row )
+  return flat
+
+#-------------------------------------------------------------------------
+# BulkDriver
+#-------------------------------------------------------------------------
+
+class BulkDriver:
+
+  def __init__( s, model, inputs, outputs ):
+    s.model     = model
+    s.in_ports  = _lookup_ports( model, inputs  )
+    s.out_ports = _lookup_ports( model, outputs )
+
+    s.in_itemsize  = _itemsize( max( [ p.nbits for p in s.in_ports  ], default=1 ) )
+    s.out_itemsize = _itemsize( max( [ p.nbits for p in s.out_ports ], default=1 ) )
+
+  #-----------------------------------------------------------------------
+  # alloc_outputs
+  #-----------------------------------------------------------------------
+  # Returns a zeroed array with room for ncycles rows of outputs.
+
+  def alloc_outputs( s, ncycles ):
+    nouts = len( s.out_ports )
+    if np is not None:
+      return np.zeros( ( ncycles, nouts ), dtype=f"u{s.out_itemsize}" )
+    typecode = _typecodes[ s.out_itemsize ]
+    return array.array( typecode, bytes( s.out_itemsize*ncycles*nouts ) )
+
+  #-----------------------------------------------------------------------
+  # run
+  #-----------------------------------------------------------------------
+  # Runs ncycles cycles (by default one per row of inputs) and returns
+  # the outputs. itemsize only matters for packed bytes inputs and
+  # defaults to the narrowest type which fits the widest input port.
+
+  def run( s, inputs=(), ncycles=None, out=None, itemsize=None ):
+
+    nin  = len( s.in_ports  )
+    nout = len( s.out_ports )
+
+    flat  = _flatten_inputs( inputs, nin, itemsize or s.in_itemsize ) if nin else []
+    nrows = len( flat ) // nin if nin else 0
+
+    if nin and len( flat ) != nrows*nin:
+      raise ValueError( f"number of input values ({len(flat)}) is not a "
+                        f"multiple of the number of input ports ({nin})" )
+
+    if ncycles is None:
+      ncycles = nrows
+
+    if out is None:
+      out = s.alloc_outputs( ncycles )
+
+    mv = memoryview( out ).cast( 'B' )
+    mv = mv.cast( _typecodes[ memoryview( out ).itemsize ] )
+    if len( mv ) < ncycles*nout:
+      raise ValueError( f"output array has room for {len(mv)} values but "
+                        f"{ncycles} cycles produce {ncycles*nout}" )
+
+    # Main loop, keep everything in local variables
+
+    tick      = s.model.sim_tick
+    in_ports  = s.in_ports
+    out_ports = s.out_ports
+
+    k = 0
+    for c in range( ncycles ):
+
+      if c < nrows:
+        for p, v in zip( in_ports, flat[c*nin:(c+1)*nin] ):
+          p @= v
+      elif c == nrows:
+        for p in in_ports:
+          p @= 0
+
+      tick()
+
+      for p in out_ports:
+        mv[k] = int(p)
+        k += 1
+
+    return out
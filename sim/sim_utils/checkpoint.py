@@ -0,0 +1,200 @@
+#=========================================================================
+# checkpoint
+#=========================================================================
+# Saves the complete state of a simulation and restores it into a newly
+# elaborated copy of the same model, possibly in another process. This
+# way many experiments can start from one warmed-up point instead of
+# simulating the reset and warm-up cycles over and over again:
+#
+#   th.apply( DefaultPassGroup() )
+#   th.sim_reset()
+#   ...                                   # tick through the warm-up
+#   save_checkpoint( th, "warm.ckpt" )
+#
+#   th.apply( DefaultPassGroup() )        # same model, new process
+#   load_checkpoint( th, "warm.ckpt" )
+#   ...                                   # tick on, without a reset
+#
+# The state of a simulation is
+#
+#  - the value of every signal (ports, wires, and registers),
+#
+#  - the python state of every component, i.e., every public attribute
+#    which is not a signal, an interface, a subcomponent, or a method
+#    (e.g., pipe and head in SortUnitCL, result and counter in
+#    GcdUnitCL, or the message index of stream.SourceRTL),
+#
+#  - and the number of simulated cycles.
+#
+# A component whose state does not fit this scheme defines
+# checkpoint_state(), which returns its state, and restore_state(state).
+# GenSourceRTL and GenSinkRTL, for example, draw their messages from an
+# iterator which cannot be saved, so they save how many messages they
+# have consumed and skip that many when they are restored.
+#
+# Verilated models keep their state in C++, so they (and so models
+# simulated with --translate) cannot be checkpointed.
+
+import copy
+import os
+import pickle
+
+from collections.abc import Iterator
+
+from pymtl3 import *
+from pymtl3.datatypes import is_bitstruct_inst
+from pymtl3.dsl.NamedObject import NamedObject
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+# Returns a dict mapping the name of every signal value to the value.
+# Signals in the same net share a single value, which we name after the
+# first signal of the net.
+
+def _signal_values( model ):
+
+  try:
+    mapping = model._sim.signal_object_mapping
+  except AttributeError:
+    raise ValueError( "apply DefaultPassGroup to the model before "
+                      "checkpointing it" )
+
+  nets = {}
+  for signal, ( _, _, _, value ) in mapping.items():
+    nets.setdefault( id( value ), ( value, [] ) )[1].append( repr( signal ) )
+
+  return { min( names ) : value for value, names in nets.values() }
+
+def _holds_signals( obj, signal_ids ):
+  if id( obj ) in signal_ids or isinstance( obj, NamedObject ):
+    return True
+  if isinstance( obj, list ):
+    return any( _holds_signals( x, signal_ids ) for x in obj )
+  return False
+
+def _components( model ):
+  components = model.get_all_object_filter( lambda x: isinstance( x, Component ) )
+  return sorted( components, key=repr )
+
+def _to_uint( value ):
+  return int( value.to_bits() if is_bitstruct_inst( value ) else value )
+
+def _set_value( value, uint ):
+  new_value = mk_bits( value.nbits )( uint )
+  if is_bitstruct_inst( value ):
+    new_value = type( value ).from_bits( new_value )
+
+  # Set the pending value of registers too
+
+  value @= new_value
+  value <<= new_value
+
+#-------------------------------------------------------------------------
+# save_state
+#-------------------------------------------------------------------------
+# Returns the state of the simulation as a dict. The dict is a deep copy
+# which does not change as the simulation goes on.
+
+def save_state( model ):
+
+  signals    = _signal_values( model )
+  signal_ids = { id( value ) for value in signals.values() }
+
+  state = {
+    'cycle'      : model.sim_cycle_count(),
+    'signals'    : { name : _to_uint( value ) for name, value in signals.items() },
+    'components' : {},
+  }
+
+  for component in _components( model ):
+
+    if hasattr( component, '_ffi_m' ):
+      raise ValueError( f"cannot checkpoint the verilated model {component!r}" )
+
+    if hasattr( component, 'checkpoint_state' ):
+      cstate = component.checkpoint_state()
+
+    else:
+      cstate = {}
+      for name, obj in vars( component ).items():
+        if name.startswith( '_' ) or callable( obj ) or _holds_signals( obj, signal_ids ):
+          continue
+        if isinstance( obj, Iterator ):
+          raise ValueError( f"cannot checkpoint {component!r}.{name}, which is an "
+                            f"iterator (define checkpoint_state/restore_state "
+                            f"in {type(component).__name__})" )
+        cstate[ name ] = obj
+
+    state['components'][ repr( component ) ] = copy.deepcopy( cstate )
+
+  return state
+
+#-------------------------------------------------------------------------
+# restore_state
+#-------------------------------------------------------------------------
+# Restores a state from save_state. The model has to be elaborated with
+# the same parameters as the model we saved the state of, and have
+# DefaultPassGroup applied, but it does not need to be reset.
+
+def restore_state( model, state ):
+
+  signals    = _signal_values( model )
+  components = _components( model )
+
+  if set( signals ) != set( state['signals'] ) or \
+     { repr( c ) for c in components } != set( state['components'] ):
+    raise ValueError( "the saved state belongs to a different model" )
+
+  for name, value in signals.items():
+    _set_value( value, state['signals'][ name ] )
+
+  for component in components:
+    cstate = copy.deepcopy( state['components'][ repr( component ) ] )
+
+    if hasattr( component, 'restore_state' ):
+      component.restore_state( cstate )
+    else:
+      for name, obj in cstate.items():
+        setattr( component, name, obj )
+
+  model._sim.simulated_cycles = state['cycle']
+
+#-------------------------------------------------------------------------
+# save_checkpoint
+#-------------------------------------------------------------------------
+# Saves the state of the simulation to a file. The key (e.g., the
+# command line options of a simulator) has to match when loading the
+# checkpoint, and extra is any additional (picklable) state of the
+# testbench which load_checkpoint returns.
+
+def save_checkpoint( model, path, key=None, extra=None ):
+
+  checkpoint = {
+    'key'   : key,
+    'state' : save_state( model ),
+    'extra' : extra,
+  }
+
+  with open( path + ".tmp", "wb" ) as f:
+    pickle.dump( checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL )
+  os.replace( path + ".tmp", path )
+
+#-------------------------------------------------------------------------
+# load_checkpoint
+#-------------------------------------------------------------------------
+# Restores the state of the simulation from a file written by
+# save_checkpoint and returns the extra state.
+
+def load_checkpoint( model, path, key=None ):
+
+  with open( path, "rb" ) as f:
+    checkpoint = pickle.load( f )
+
+  if checkpoint['key'] != key:
+    raise ValueError( f"checkpoint {path} was saved for {checkpoint['key']!r}, "
+                      f"not {key!r}" )
+
+  restore_state( model, checkpoint['state'] )
+  return checkpoint['extra']
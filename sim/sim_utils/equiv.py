@@ -0,0 +1,183 @@
+#=========================================================================
+# equiv
+#=========================================================================
+# Engine for checking an implementation against a reference model over
+# a whole input space (or every stride-th point of it). The simulator
+# script maps an index in [0,total) to an input (e.g., four packed 8-bit
+# values for the sort unit) and provides a function which checks every
+# index of a range and returns None if the implementation matches the
+# reference, or a dict describing the first mismatch with at least an
+# 'index' key:
+#
+#   result = run_equiv( check, 2**32, stride=7919, nworkers=8,
+#                       checkpoint="sort-equiv.json" )
+#   if result['counterexample']:
+#     ...
+#
+# The points are split into chunks of chunk_size points which run on a
+# pool of worker processes. The workers are forked, so they inherit any
+# model the script elaborated (or translated and verilated) before
+# calling run_equiv, and check should reset the model at the start of
+# every chunk.
+#
+# We report the counterexample with the lowest index. Once a chunk finds
+# one, we stop handing out later chunks and wait for the earlier chunks
+# which are still running, since they might find an earlier one.
+#
+# With a checkpoint file, the finished chunks (and any counterexample)
+# are saved every save_interval seconds and when we stop (including on
+# Ctrl-C), and a later run with the same parameters picks up where the
+# last one left off.
+
+import json
+import multiprocessing
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+#-------------------------------------------------------------------------
+# Checkpoints
+#-------------------------------------------------------------------------
+# The finished chunks are stored as a list of [start,stop) intervals of
+# chunk numbers, which stays short since chunks finish roughly in order.
+
+def _to_intervals( chunks ):
+  intervals = []
+  for k in sorted( chunks ):
+    if intervals and intervals[-1][1] == k:
+      intervals[-1][1] = k+1
+    else:
+      intervals.append( [ k, k+1 ] )
+  return intervals
+
+def _from_intervals( intervals ):
+  return { k for start, stop in intervals for k in range( start, stop ) }
+
+def _load_checkpoint( path, params ):
+
+  if not os.path.exists( path ):
+    return set(), None
+
+  with open( path ) as f:
+    state = json.load( f )
+
+  if state['params'] != params:
+    raise ValueError( f"checkpoint {path} was written with different parameters "
+                      f"({state['params']}), remove it to start over" )
+
+  return _from_intervals( state['done'] ), state['counterexample']
+
+def _save_checkpoint( path, params, done, counterexample ):
+  state = {
+    'params'         : params,
+    'done'           : _to_intervals( done ),
+    'counterexample' : counterexample,
+  }
+  with open( path + ".tmp", "w" ) as f:
+    json.dump( state, f )
+  os.replace( path + ".tmp", path )
+
+#-------------------------------------------------------------------------
+# run_equiv
+#-------------------------------------------------------------------------
+# Calls check(indices) for every chunk of the points 0, stride, 2*stride,
+# ... below total, where indices is a range. progress(nchecked,npoints)
+# is called after every chunk. key is stored in the checkpoint so that
+# we do not resume a run of a different implementation. Returns a dict
+# with the number of points, the number of points checked, and the first
+# counterexample (or None).
+
+def run_equiv( check, total, stride=1, chunk_size=4096, nworkers=None,
+               checkpoint=None, key=None, progress=None, save_interval=10.0 ):
+
+  npoints = ( total + stride - 1 ) // stride
+  nchunks = ( npoints + chunk_size - 1 ) // chunk_size
+
+  def chunk_range( k ):
+    start = k*chunk_size
+    stop  = min( start + chunk_size, npoints )
+    return range( start*stride, stop*stride, stride )
+
+  def chunk_of( index ):
+    return index // stride // chunk_size
+
+  params = { 'total': total, 'stride': stride, 'chunk_size': chunk_size, 'key': key }
+
+  done, counterexample = set(), None
+  if checkpoint:
+    done, counterexample = _load_checkpoint( checkpoint, params )
+
+  nchecked  = sum( len( chunk_range(k) ) for k in done )
+  last_save = time.perf_counter()
+
+  # Chunks after the chunk with the counterexample do not matter
+
+  def limit():
+    return chunk_of( counterexample['index'] ) if counterexample else nchunks
+
+  def finish( k, result ):
+    nonlocal nchecked, counterexample, last_save
+
+    done.add( k )
+    nchecked += len( chunk_range(k) )
+
+    if result is not None:
+      if counterexample is None or result['index'] < counterexample['index']:
+        counterexample = result
+
+    if progress:
+      progress( nchecked, npoints )
+
+    if checkpoint and time.perf_counter() - last_save > save_interval:
+      _save_checkpoint( checkpoint, params, done, counterexample )
+      last_save = time.perf_counter()
+
+  todo     = ( k for k in range( nchunks ) if k not in done )
+  nworkers = min( nworkers or os.cpu_count() or 1, max( nchunks - len(done), 1 ) )
+
+  try:
+
+    if nworkers <= 1:
+      for k in todo:
+        if k >= limit():
+          break
+        finish( k, check( chunk_range(k) ) )
+
+    else:
+      context = multiprocessing.get_context( "fork" )
+      with ProcessPoolExecutor( max_workers=nworkers, mp_context=context ) as executor:
+
+        # Keep a couple of chunks queued for every worker
+
+        running = {}
+        while True:
+          for k in todo:
+            if k >= limit():
+              break
+            running[ executor.submit( check, chunk_range(k) ) ] = k
+            if len( running ) >= 2*nworkers:
+              break
+
+          if not running:
+            break
+
+          finished, _ = wait( running, return_when=FIRST_COMPLETED )
+          for future in finished:
+            finish( running.pop( future ), future.result() )
+
+          # Drop queued chunks after a new counterexample
+
+          for future, k in list( running.items() ):
+            if k >= limit() and future.cancel():
+              del running[ future ]
+
+  finally:
+    if checkpoint:
+      _save_checkpoint( checkpoint, params, done, counterexample )
+
+  return {
+    'npoints'        : npoints,
+    'nchecked'       : nchecked,
+    'counterexample' : counterexample,
+  }
@@ -0,0 +1,133 @@
+#=========================================================================
+# latency
+#=========================================================================
+# LatencyHistogram records the distribution of a non-negative integer
+# value, e.g., the latency of every request in cycles, in constant
+# memory. Values below 2**(sub_bits+1) get a bucket each, and above that
+# every power of two is split into 2**sub_bits buckets, so percentiles
+# are exact for short latencies and within 1/2**sub_bits (6% for the
+# default) of the true value for long ones:
+#
+#   hist = LatencyHistogram()
+#   for latency in latencies:
+#     hist.add( latency )
+#   hist.percentile( 99 )
+#
+# StreamMonitor (see sim_utils/StreamMonitor.py) fills these in from the
+# val/rdy signals of a stream interface, and format_histogram prints one
+# as a bar chart with one row per power of two.
+
+import math
+
+#-------------------------------------------------------------------------
+# LatencyHistogram
+#-------------------------------------------------------------------------
+
+class LatencyHistogram:
+
+  def __init__( s, sub_bits=4 ):
+    s.sub_bits = sub_bits
+    s.counts   = []
+    s.count    = 0
+    s.total    = 0
+    s.min      = None
+    s.max      = None
+
+  def _bounds( s, index ):
+    shift = ( index >> s.sub_bits ) - 1
+    if shift <= 0:
+      return index, index
+    mant = index - ( shift << s.sub_bits )
+    return mant << shift, ( ( mant + 1 ) << shift ) - 1
+
+  def add( s, value ):
+    shift = value.bit_length() - s.sub_bits - 1
+    index = ( shift << s.sub_bits ) + ( value >> shift ) if shift > 0 else value
+
+    if index >= len( s.counts ):
+      s.counts.extend( [0] * ( index + 1 - len( s.counts ) ) )
+    s.counts[ index ] += 1
+
+    s.count += 1
+    s.total += value
+    if s.max is None or value > s.max:
+      s.max = value
+    if s.min is None or value < s.min:
+      s.min = value
+
+  def merge( s, other ):
+    assert s.sub_bits == other.sub_bits
+    if len( other.counts ) > len( s.counts ):
+      s.counts.extend( [0] * ( len( other.counts ) - len( s.counts ) ) )
+    for index, count in enumerate( other.counts ):
+      s.counts[ index ] += count
+
+    s.count += other.count
+    s.total += other.total
+    if other.count:
+      s.max = other.max if s.max is None else max( s.max, other.max )
+      s.min = other.min if s.min is None else min( s.min, other.min )
+
+  def mean( s ):
+    return s.total / s.count if s.count else None
+
+  # Returns the nearest-rank p-th percentile, rounded up to the top of
+  # its bucket (but never above the maximum), or None if empty.
+
+  def percentile( s, p ):
+    if not s.count:
+      return None
+
+    rank = max( 1, math.ceil( p / 100 * s.count ) )
+    seen = 0
+    for index, count in enumerate( s.counts ):
+      seen += count
+      if seen >= rank:
+        return min( s._bounds( index )[1], s.max )
+
+  def summary( s ):
+    return {
+      'count' : s.count,
+      'mean'  : s.mean(),
+      'min'   : s.min,
+      'p50'   : s.percentile( 50 ),
+      'p90'   : s.percentile( 90 ),
+      'p99'   : s.percentile( 99 ),
+      'max'   : s.max,
+    }
+
+  # Returns a list of (lo,hi,count) with one entry per power of two,
+  # i.e., [0,0], [1,1], [2,3], [4,7], ..., up to the maximum.
+
+  def pow2_buckets( s ):
+    rows = {}
+    for index, count in enumerate( s.counts ):
+      if count:
+        lo = s._bounds( index )[0]
+        rows[ lo.bit_length() ] = rows.get( lo.bit_length(), 0 ) + count
+
+    if not rows:
+      return []
+
+    return [ ( ( 1 << k ) >> 1, ( 1 << k ) - 1, rows.get( k, 0 ) )
+             for k in range( min( rows ), max( rows ) + 1 ) ]
+
+#-------------------------------------------------------------------------
+# format_histogram
+#-------------------------------------------------------------------------
+# Returns the histogram as lines of text, one bar per power of two.
+
+def format_histogram( hist, width=40 ):
+  rows = hist.pow2_buckets()
+  if not rows:
+    return []
+
+  peak   = max( count for _, _, count in rows )
+  digits = len( str( rows[-1][1] ) )
+
+  lines = []
+  for lo, hi, count in rows:
+    bar = "#" * round( width * count / peak )
+    lines.append( f"{lo:>{digits}} - {hi:>{digits}} |{bar:<{width}}| "
+                  f"{count} ({100*count/hist.count:.1f}%)" )
+  return lines
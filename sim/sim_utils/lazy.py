@@ -0,0 +1,46 @@
+#=========================================================================
+# lazy
+#=========================================================================
+# Lazy exports for package __init__ files. A package calls
+#
+#   lazy_exports( __name__, {
+#     'GcdUnitCL'  : '.GcdUnitCL',
+#     'GcdUnitRTL' : '.GcdUnitRTL',
+#   })
+#
+# and each name is imported from its module the first time it is used,
+# so importing one module of a package does not import all of the
+# others along with PyMTL or NumPy.
+#
+# Most exports have the same name as the module they live in. Importing
+# such a module (e.g., from tut3_pymtl.gcd.GcdUnitCL import gcd_cl, or
+# importing the export itself) binds the module on the package under
+# that name, which would hide the export from then on. So the package
+# replaces such a binding with the export, just like the eager
+# "from .GcdUnitCL import GcdUnitCL" in an __init__ file does.
+
+import importlib
+import importlib.util
+import sys
+import types
+
+class _LazyPackage( types.ModuleType ):
+
+  def __getattr__( s, name ):
+    if name in s._lazy_exports:
+      value = getattr( importlib.import_module( s._lazy_exports[name], s.__name__ ), name )
+      setattr( s, name, value )
+      return value
+    raise AttributeError( f"module {s.__name__!r} has no attribute {name!r}" )
+
+  def __setattr__( s, name, value ):
+    if isinstance( value, types.ModuleType ) and name in s._lazy_exports and \
+       value.__name__ == importlib.util.resolve_name( s._lazy_exports[name], s.__name__ ):
+      value = getattr( value, name )
+    super().__setattr__( name, value )
+
+def lazy_exports( name, exports ):
+  package = sys.modules[ name ]
+  package._lazy_exports = exports
+  package.__all__       = list( exports )
+  package.__class__     = _LazyPackage
@@ -0,0 +1,128 @@
+#=========================================================================
+# profiling
+#=========================================================================
+# SimProfiler measures how fast a simulator script runs. The script wraps each phase
+# of the simulation in a phase context manager:
+#
+#   prof = SimProfiler( nblocks=10 )
+#
+#   with prof.phase( "elaborate" ):
+#     model = config_model_with_cmdline_opts( Model(), cmdline_opts, [] )
+#   with prof.phase( "passes" ):
+#     model.apply( DefaultPassGroup() )
+#   with prof.phase( "reset" ):
+#     model.sim_reset()
+#   with prof.phase( "tick", ncycles=lambda: model.sim_cycle_count() ):
+#     ... tick loop ...
+#
+#   print( prof.to_json( model ) )
+#
+# The report includes the wall-clock time of each phase, the total
+# wall-clock time since the profiler was created, and the simulated
+# cycles per second of the tick loop. If nblocks is nonzero we also run
+# cProfile during the tick phase and report the nblocks update blocks
+# with the largest cumulative time. Update blocks of different instances
+# of the same component share their code, so we report them per
+# component type (e.g., MinMaxUnit.comb_logic) along with the number of
+# instances. cProfile itself slows down the tick loop, so the reported
+# cycles per second are only comparable between runs with the same
+# setting of nblocks.
+
+import cProfile
+import json
+import pstats
+import time
+
+from contextlib import contextmanager
+
+class SimProfiler:
+
+  def __init__( s, nblocks=0 ):
+    s.nblocks  = nblocks
+    s.phases   = {}
+    s.ncycles  = 0
+    s.profiler = None
+    s.start    = time.perf_counter()
+
+  #-----------------------------------------------------------------------
+  # phase
+  #-----------------------------------------------------------------------
+  # Times the body of the with statement. If ncycles is given it is
+  # called before and after the body to count the simulated cycles.
+
+  @contextmanager
+  def phase( s, name, ncycles=None ):
+    start_cycles = ncycles() if ncycles else 0
+
+    if ncycles and s.nblocks:
+      s.profiler = cProfile.Profile()
+      s.profiler.enable()
+
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      s.phases[name] = s.phases.get( name, 0.0 ) + time.perf_counter() - start
+      if ncycles:
+        if s.profiler is not None:
+          s.profiler.disable()
+        s.ncycles += ncycles() - start_cycles
+
+  #-----------------------------------------------------------------------
+  # update_block_stats
+  #-----------------------------------------------------------------------
+  # Returns a list of dicts with the cProfile numbers of the top nblocks
+  # update blocks in model, sorted by cumulative time.
+
+  def update_block_stats( s, model ):
+    if s.profiler is None:
+      return []
+
+    blocks = {}
+    for blk in model.get_all_update_blocks():
+      code = blk.__code__
+      key  = ( code.co_filename, code.co_firstlineno, code.co_name )
+      host = model.get_update_block_host_component( blk )
+      name = f"{type(host).__name__}.{blk.__name__}"
+      blocks.setdefault( key, [ name, 0 ] )[1] += 1
+
+    stats = pstats.Stats( s.profiler ).stats
+
+    ret = []
+    for key, ( name, ninstances ) in blocks.items():
+      if key in stats:
+        _, ncalls, tottime, cumtime, _ = stats[key]
+        ret.append({
+          'name'       : name,
+          'ninstances' : ninstances,
+          'ncalls'     : ncalls,
+          'tottime'    : tottime,
+          'cumtime'    : cumtime,
+        })
+
+    ret.sort( key=lambda b: b['cumtime'], reverse=True )
+    return ret[:s.nblocks]
+
+  #-----------------------------------------------------------------------
+  # report
+  #-----------------------------------------------------------------------
+  # Returns the profile as a dict. Any keyword arguments (e.g., the impl
+  # and input pattern) are included as is so runs can be told apart.
+
+  def report( s, model=None, **info ):
+    tick_time = s.phases.get( "tick", 0.0 )
+
+    ret = dict( info )
+    ret['wall_time']      = time.perf_counter() - s.start
+    ret['phases']         = dict( s.phases )
+    ret['ncycles']        = s.ncycles
+    ret['cycles_per_sec'] = s.ncycles / tick_time if tick_time > 0 else 0.0
+    ret['cprofile']       = s.profiler is not None
+
+    if model is not None and s.profiler is not None:
+      ret['update_blocks'] = s.update_block_stats( model )
+
+    return ret
+
+  def to_json( s, model=None, **info ):
+    return json.dumps( s.report( model, **info ), indent=2 )
@@ -0,0 +1,79 @@
+#=========================================================================
+# randseed
+#=========================================================================
+# Deterministic random seeds for the tests. Every random stream is
+# seeded by hashing a session seed together with the name of the
+# stream, so the values a stream produces only depend on the session
+# seed and the name, and not on which other test cases ran before it, in
+# which order, or in which process. The fix_randseed fixture in
+# conftest.py seeds the random module with the seed derived from the
+# node id of each test case, and test modules which build random test
+# vectors at import time use their own stream named after the module:
+#
+#   rng         = mk_rng( __name__ )
+#   tvec_random = [ [ rng.randint(0,0xff) for _ in range(4) ] for _ in range(20) ]
+#
+# The session seed is 0xdeadbeef unless py.test is given --randseed (or
+# PYMTL_RANDSEED is set), and --randseed random picks a new one. py.test
+# prints the session seed in its header, and running a single test case
+# again with the same session seed gives it exactly the same random
+# values:
+#
+#   % pytest --randseed 0x1234 ../sim/tut3_pymtl/gcd/block_test/GcdUnitCL_test.py
+#
+
+import hashlib
+import os
+import random
+
+default_seed = 0xdeadbeef
+
+# The session seed is passed on in the environment, so that subprocesses
+# (e.g., the shards of run-tests) use the same session seed
+
+env_var = "PYMTL_RANDSEED"
+
+#-------------------------------------------------------------------------
+# parse_seed
+#-------------------------------------------------------------------------
+# Parses a seed in any base python understands (e.g., 0xdeadbeef or
+# 1234). None and the empty string mean the default seed and "random"
+# means a new random seed.
+
+def parse_seed( value ):
+  if value is None or value == "":
+    return default_seed
+  if value == "random":
+    return random.SystemRandom().getrandbits( 32 )
+  return int( value, 0 )
+
+#-------------------------------------------------------------------------
+# session_seed
+#-------------------------------------------------------------------------
+
+def session_seed():
+  return parse_seed( os.environ.get( env_var ) )
+
+def set_session_seed( seed ):
+  os.environ[ env_var ] = f"{seed:#x}"
+
+#-------------------------------------------------------------------------
+# derive_seed
+#-------------------------------------------------------------------------
+# Returns the 64-bit seed for the stream with the given name (e.g., a
+# test node id or a module name) under the given session seed (default
+# is the current session seed).
+
+def derive_seed( name, seed=None ):
+  if seed is None:
+    seed = session_seed()
+  digest = hashlib.sha256( f"{seed:#x}/{name}".encode() ).digest()
+  return int.from_bytes( digest[:8], "little" )
+
+#-------------------------------------------------------------------------
+# mk_rng
+#-------------------------------------------------------------------------
+# Returns a new random.Random for the stream with the given name.
+
+def mk_rng( name, seed=None ):
+  return random.Random( derive_seed( name, seed ) )
@@ -0,0 +1,178 @@
+#=========================================================================
+# regress
+#=========================================================================
+# Helper functions for running the block tests as a set of parallel
+# shards. We first ask py.test to collect the test cases, then split the
+# test cases into shards, and run each shard as a separate py.test
+# process in its own build directory so that Verilator builds from
+# different shards never clobber each other. Each shard writes a JUnit
+# XML report which we merge into a single report at the end.
+#
+# The random values a test case sees only depend on the session seed and
+# its node id (see sim_utils/randseed.py), not on which shard it runs in
+# or what ran before it. The shards inherit the session seed from the
+# environment, so make sure PYMTL_RANDSEED is set before collecting.
+
+import os
+import subprocess
+import sys
+import time
+
+import xml.etree.ElementTree as ET
+
+from collections          import namedtuple
+from concurrent.futures   import ThreadPoolExecutor
+
+#-------------------------------------------------------------------------
+# collect
+#-------------------------------------------------------------------------
+# Returns the list of test node ids py.test would run for the given
+# paths and extra arguments (e.g., --prtl or --test-verilog).
+
+def collect( rootdir, paths, pytest_args=() ):
+
+  cmd = [ sys.executable, "-m", "pytest", "--collect-only", "-q",
+          "--rootdir", rootdir ] + list(pytest_args) + list(paths)
+
+  result = subprocess.run( cmd, cwd=rootdir, stdout=subprocess.PIPE,
+                           stderr=subprocess.STDOUT, universal_newlines=True )
+
+  # py.test returns 5 if no tests were collected
+
+  if result.returncode not in [ 0, 5 ]:
+    raise RuntimeError( f"test collection failed:\n{result.stdout}" )
+
+  return [ line.strip() for line in result.stdout.splitlines()
+           if "::" in line and not line.startswith(" ") ]
+
+#-------------------------------------------------------------------------
+# shard
+#-------------------------------------------------------------------------
+# Splits the node ids into nshards lists. When by is "file" we keep all
+# of the test cases from the same test file in the same shard, since
+# they usually share the same translated and verilated models. When by
+# is "test" we spread individual test cases round robin. In both cases
+# the order of the test cases within a shard is the collection order.
+
+def shard( nodeids, nshards, by="file" ):
+
+  if by == "test":
+    return [ nodeids[i::nshards] for i in range(nshards) ]
+
+  groups = {}
+  for nodeid in nodeids:
+    groups.setdefault( nodeid.split("::")[0], [] ).append( nodeid )
+
+  # Greedily assign the largest groups to the smallest shards
+
+  shards = [ [] for _ in range(nshards) ]
+  for group in sorted( groups.values(), key=len, reverse=True ):
+    min( shards, key=len ).extend( group )
+
+  order = { nodeid : i for i, nodeid in enumerate(nodeids) }
+  return [ sorted( s, key=order.get ) for s in shards ]
+
+#-------------------------------------------------------------------------
+# run_shard
+#-------------------------------------------------------------------------
+# Runs one shard as a separate py.test process with the given build
+# directory as its working directory. Returns a ShardResult.
+
+ShardResult = namedtuple( "ShardResult",
+                          "idx returncode report_path wall_time output" )
+
+def run_shard( idx, nodeids, rootdir, build_dir, pytest_args=() ):
+
+  shard_dir = os.path.join( build_dir, f"shard-{idx}" )
+  os.makedirs( shard_dir, exist_ok=True )
+
+  report_path = os.path.join( shard_dir, "report.xml" )
+  if os.path.exists( report_path ):
+    os.remove( report_path )
+
+  if not nodeids:
+    return ShardResult( idx, 0, None, 0.0, "" )
+
+  cmd = [ sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+          "--rootdir", rootdir, "-c", os.path.join( rootdir, "pytest.ini" ),
+          f"--junitxml={report_path}" ] + list(pytest_args) \
+        + [ os.path.join( rootdir, nodeid ) for nodeid in nodeids ]
+
+  # Keep the workers deterministic as well
+
+  env = dict( os.environ, PYTHONHASHSEED="0" )
+
+  start  = time.perf_counter()
+  result = subprocess.run( cmd, cwd=shard_dir, env=env,
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                           universal_newlines=True )
+
+  return ShardResult( idx, result.returncode,
+                      report_path if os.path.exists( report_path ) else None,
+                      time.perf_counter() - start, result.stdout )
+
+#-------------------------------------------------------------------------
+# run_shards
+#-------------------------------------------------------------------------
+# Runs the shards concurrently with at most nworkers py.test processes
+# at a time. Returns the list of ShardResults in shard order.
+
+def run_shards( shards, rootdir, build_dir, pytest_args=(), nworkers=None ):
+
+  nworkers = nworkers or len(shards)
+  with ThreadPoolExecutor( max_workers=nworkers ) as executor:
+    futures = [ executor.submit( run_shard, i, nodeids, rootdir, build_dir,
+                                 pytest_args )
+                for i, nodeids in enumerate(shards) ]
+    return [ f.result() for f in futures ]
+
+#-------------------------------------------------------------------------
+# merge_reports
+#-------------------------------------------------------------------------
+# Merges the JUnit XML reports from each shard into a single report and
+# returns a list of TestResults, one per test case, in report order.
+
+TestResult = namedtuple( "TestResult", "shard name outcome time" )
+
+def merge_reports( shard_results, out_path=None ):
+
+  merged  = ET.Element( "testsuite", name="pytest" )
+  results = []
+  totals  = { "tests" : 0, "failures" : 0, "errors" : 0, "skipped" : 0 }
+  total_time = 0.0
+
+  for shard_result in shard_results:
+    if shard_result.report_path is None:
+      continue
+
+    for testcase in ET.parse( shard_result.report_path ).iter( "testcase" ):
+
+      outcome = "passed"
+      for tag, name in [ ( "failure", "failed" ), ( "error", "error" ),
+                         ( "skipped", "skipped" ) ]:
+        if testcase.find( tag ) is not None:
+          outcome = name
+
+      name = testcase.get( "classname", "" ).replace( ".", "/" ) + ".py::" \
+           + testcase.get( "name", "" )
+      test_time = float( testcase.get( "time", 0.0 ) )
+
+      testcase.set( "shard", str(shard_result.idx) )
+      merged.append( testcase )
+      results.append( TestResult( shard_result.idx, name, outcome, test_time ) )
+
+      totals["tests"] += 1
+      total_time      += test_time
+      if   outcome == "failed"  : totals["failures"] += 1
+      elif outcome == "error"   : totals["errors"]   += 1
+      elif outcome == "skipped" : totals["skipped"]  += 1
+
+  for key, value in totals.items():
+    merged.set( key, str(value) )
+  merged.set( "time", f"{total_time:.3f}" )
+
+  if out_path:
+    ET.ElementTree( merged ).write( out_path, encoding="utf-8",
+                                    xml_declaration=True )
+
+  return results
@@ -0,0 +1,250 @@
+#=========================================================================
+# saif
+#=========================================================================
+# SaifWriter accumulates switching activity while the model simulates
+# and writes it as a SAIF file, which is what the power analysis in the
+# ASIC flow reads. This avoids dumping a VCD and converting it to SAIF
+# afterwards, which for long power workloads means writing and then
+# parsing gigabytes of text. It is set up exactly like VcdWriter and
+# takes the same cycle window, scope, and signal globs:
+#
+#   model = config_model_with_cmdline_opts( model, cmdline_opts, [] )
+#   saif  = SaifWriter( model, "sort.saif", cycles=(1000,2000),
+#                       root=[ "SortUnitStructRTL__nbits_8_tb", "DUT" ] )
+#   model.apply( DefaultPassGroup() )
+#   ... simulate ...
+#   saif.close()
+#
+# For every bit of every selected signal we keep the number of toggles
+# (TC) and how long the bit was one (T1). The values only change at the
+# clock edge, so every cycle we compare each signal with its previous
+# value and, only if it changed, add the time since the last change to
+# T1 of the bits which were one and count a toggle for the bits which
+# changed. To avoid looping over the bits in Python, the counters of all
+# the bits of a signal are packed into one integer with _FIELD bits per
+# counter. Spreading the bits of a value out to one per field turns the
+# update into one multiply-add for T1 and one add for TC. T0 is the rest
+# of the window. Signals named clk toggle twice per cycle and are one
+# for half of it. Time is in the same units as the VCD (10ps, 100 per
+# cycle). The model has no X values, so TX is always zero.
+#
+# Instances and nets are named like in the Verilog PyMTL generates, with
+# one net per bit of multi-bit signals (e.g., out\[0\]\[7\]). Signals
+# which are connected share their value and their counts.
+
+import time
+
+from .vcd import _select_signals, _resolve_signals, _add_dump_func
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+# Our scope and signal names use parentheses for list indices like the
+# VCD, SAIF uses escaped square brackets
+
+def _saif_name( name ):
+  return name.replace( '(', r'\[' ).replace( ')', r'\]' )
+
+def _saif_net( name, t0, t1, tc ):
+  return f"({name} (T0 {t0}) (T1 {t1}) (TX 0) (TC {tc}) (IG 0))"
+
+# Moves bit i of a value to bit _FIELD*i, one byte at a time
+
+_FIELD = 48
+_MASK  = ( 1 << _FIELD ) - 1
+
+_spread_byte = [ sum( ( ( x >> i ) & 1 ) << ( _FIELD*i ) for i in range(8) )
+                 for x in range(256) ]
+
+def _spread( x ):
+  r     = 0
+  shift = 0
+  while x:
+    r |= _spread_byte[ x & 0xff ] << shift
+    x >>= 8
+    shift += 8*_FIELD
+  return r
+
+def _unpack( r, nbits ):
+  return [ ( r >> ( _FIELD*i ) ) & _MASK for i in range( nbits ) ]
+
+#-------------------------------------------------------------------------
+# SaifWriter
+#-------------------------------------------------------------------------
+
+class SaifWriter:
+
+  def __init__( s, top, path, cycles=None, scope=None, signals=None,
+                root=( "top", ), rename=None ):
+
+    s.top   = top
+    s.path  = path
+    s.start, s.stop = cycles if cycles else ( None, None )
+
+    s.selected = _select_signals( top, scope, signals, root, rename )
+
+    s.ncycles = 0
+    s.first   = None
+    s.last    = None
+    _add_dump_func( top, s.dump )
+
+  #-----------------------------------------------------------------------
+  # _setup
+  #-----------------------------------------------------------------------
+  # Looks up the simulated values and creates the counters on the first
+  # cycle of the window.
+
+  def _setup( s, cycle ):
+    values, s.where = _resolve_signals( s.top, s.selected )
+
+    s.values  = [ v for v, _ in values ]
+    s.nbits   = [ nbits for _, nbits in values ]
+    s.structs = [ hasattr( v, 'to_bits' ) for v in s.values ]
+
+    # Signals up to 8 bits wide spread with a single table lookup
+
+    s.spread  = [ _spread_byte.__getitem__ if nbits <= 8 else _spread
+                  for nbits in s.nbits ]
+
+    s.prev  = [ int( v.to_bits() ) if struct else int(v)
+                for v, struct in zip( s.values, s.structs ) ]
+    s.since = [ cycle ] * len( s.values )
+    s.t1    = [ 0 ] * len( s.values )
+    s.tc    = [ 0 ] * len( s.values )
+
+    s.first = cycle
+
+  #-----------------------------------------------------------------------
+  # dump
+  #-----------------------------------------------------------------------
+  # Called by the simulator right before every clock edge.
+
+  def dump( s ):
+
+    cycle = s.ncycles
+    s.ncycles += 1
+
+    if s.start is not None and cycle < s.start:
+      return
+    if s.stop is not None and cycle >= s.stop:
+      return
+
+    if s.first is None:
+      s._setup( cycle )
+
+    s.last = cycle
+
+    # This loop is the cost of SAIF dumping, so we inline _count and
+    # keep everything in local variables
+
+    prev    = s.prev
+    since   = s.since
+    t1      = s.t1
+    tc      = s.tc
+    spread  = s.spread
+    structs = s.structs
+
+    for i, value in enumerate( s.values ):
+      v = int( value.to_bits() ) if structs[i] else int( value )
+      p = prev[i]
+      if v != p:
+        t1[i]   += spread[i]( p ) * ( cycle - since[i] )
+        tc[i]   += spread[i]( p ^ v )
+        prev[i]  = v
+        since[i] = cycle
+
+  # Accounts for signal i changing to v in the given cycle
+
+  def _count( s, i, v, cycle ):
+    p = s.prev[i]
+    s.t1[i]   += s.spread[i]( p ) * ( cycle - s.since[i] )
+    s.tc[i]   += s.spread[i]( p ^ v )
+    s.prev[i]  = v
+    s.since[i] = cycle
+
+  #-----------------------------------------------------------------------
+  # activity
+  #-----------------------------------------------------------------------
+  # Returns a dictionary from (scope path,name,bit) to (T0,T1,TC) for
+  # every bit of every selected signal, where bit is None for single-bit
+  # signals. The counts cover the window up to the last simulated cycle.
+
+  def activity( s ):
+    if s.first is None:
+      return {}
+
+    # Account for the time since the last change of every signal
+
+    end = s.last + 1
+    for i, v in enumerate( s.prev ):
+      s._count( i, v, end )
+
+    duration = 100*( end - s.first )
+
+    activity = {}
+    for ( sig, hpath, name ), i in zip( s.selected, s.where ):
+      if name == "clk":
+        counts = [ ( duration//2, duration - duration//2, 2*( end - s.first ) ) ]
+      else:
+        counts = [ ( duration - 100*t1, 100*t1, tc )
+                   for t1, tc in zip( _unpack( s.t1[i], s.nbits[i] ),
+                                      _unpack( s.tc[i], s.nbits[i] ) ) ]
+
+      if s.nbits[i] == 1:
+        activity[ ( hpath, name, None ) ] = counts[0]
+      else:
+        for bit, c in enumerate( counts ):
+          activity[ ( hpath, name, bit ) ] = c
+
+    return activity
+
+  #-----------------------------------------------------------------------
+  # close
+  #-----------------------------------------------------------------------
+  # Writes the SAIF file.
+
+  def close( s ):
+
+    activity = s.activity()
+    duration = 0 if s.first is None else 100*( s.last + 1 - s.first )
+
+    # Group the nets by instance
+
+    tree = {}
+    for ( hpath, name, bit ), counts in activity.items():
+      node = tree
+      for field in hpath.split( "/" ):
+        node = node.setdefault( field, {} )
+      net = _saif_name( name ) + ( "" if bit is None else rf"\[{bit}\]" )
+      node.setdefault( None, [] ).append( _saif_net( net, *counts ) )
+
+    out = [ "(SAIFILE\n",
+            "(SAIFVERSION \"2.0\")\n",
+            "(DIRECTION \"backward\")\n",
+            "(DESIGN )\n",
+            f"(DATE \"{time.asctime()}\")\n",
+            "(VENDOR \"PyMTL\")\n",
+            "(PROGRAM_NAME \"sim_utils.saif\")\n",
+            "(VERSION \"1.0\")\n",
+            "(DIVIDER / )\n",
+            "(TIMESCALE 10 ps)\n",
+            f"(DURATION {duration})\n" ]
+
+    def write_instance( name, node, indent ):
+      out.append( f"{indent}(INSTANCE {_saif_name(name)}\n" )
+      if None in node:
+        out.append( f"{indent}  (NET\n" )
+        out.extend( f"{indent}    {net}\n" for net in node[None] )
+        out.append( f"{indent}  )\n" )
+      for child in sorted( k for k in node if k is not None ):
+        write_instance( child, node[child], indent + "  " )
+      out.append( f"{indent})\n" )
+
+    for name in sorted( tree ):
+      write_instance( name, tree[name], "" )
+
+    out.append( ")\n" )
+
+    with open( s.path, "w" ) as file:
+      file.write( "".join( out ) )
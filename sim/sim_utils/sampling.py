@@ -0,0 +1,166 @@
+#=========================================================================
+# sampling
+#=========================================================================
+# Helpers for sampled simulation. Instead of simulating every
+# transaction of a long stream with the detailed (e.g., RTL) model, we
+# only simulate a few measurement windows of consecutive transactions in
+# detail and fast-forward through the rest of the stream with a cheap
+# (FL or CL) model. Each window is preceded by a few warm-up
+# transactions which are not measured. They bring the detailed model
+# into the state it would be in at the start of the window, which is
+# easy for models like the sort pipeline and the GCD FSM whose state
+# only depends on the last few transactions.
+#
+# plan_windows spreads the windows evenly over the stream, starting at a
+# random offset (systematic sampling). From the number of cycles the
+# detailed model takes for each window we then extrapolate the number of
+# cycles for the whole stream, with a confidence interval:
+#
+#  - estimate_mean scales the mean number of cycles per transaction
+#    in the windows up to the whole stream.
+#
+#  - estimate_diff corrects the cheap model's estimate of the whole
+#    stream (e.g., the sum of gcd_cl over all requests) by the mean
+#    difference per transaction between the detailed model's cycles and
+#    the cheap model's estimate in the windows. The interval is much
+#    tighter when the cheap model is only off by a few cycles per
+#    transaction (e.g., for the handshakes).
+#
+# Both treat the windows as independent samples and use Student's
+# t-distribution for the intervals. Each returns a dict with the
+# estimated cycles per transaction and total cycles and the half-width
+# of their confidence intervals.
+
+import math
+import random
+import statistics
+
+#-------------------------------------------------------------------------
+# plan_windows
+#-------------------------------------------------------------------------
+# Returns nwindows (start,stop) pairs of transaction indices, each
+# covering window transactions, spread evenly over ntotal transactions.
+
+def plan_windows( ntotal, nwindows, window, seed=0xdeadbeef ):
+
+  if nwindows < 1 or window < 1:
+    raise ValueError( "need at least one window of at least one transaction" )
+
+  period = ntotal // nwindows
+  if period < window:
+    raise ValueError( f"{nwindows} windows of {window} transactions do not fit "
+                      f"in {ntotal} transactions" )
+
+  offset = random.Random( seed ).randrange( period - window + 1 )
+  return [ ( i*period + offset, i*period + offset + window )
+           for i in range( nwindows ) ]
+
+#-------------------------------------------------------------------------
+# norm_quantile
+#-------------------------------------------------------------------------
+# Returns the p-quantile of the standard normal distribution, using
+# Acklam's rational approximation (relative error below 1.2e-9). We do
+# not use statistics.NormalDist since it needs Python 3.8.
+
+_norm_a = [ -3.969683028665376e+01,  2.209460984245205e+02,
+            -2.759285104469687e+02,  1.383577518672690e+02,
+            -3.066479806614716e+01,  2.506628277459239e+00 ]
+_norm_b = [ -5.447609879822406e+01,  1.615858368580409e+02,
+            -1.556989798598866e+02,  6.680131188771972e+01,
+            -1.328068155288572e+01 ]
+_norm_c = [ -7.784894002430293e-03, -3.223964580411365e-01,
+            -2.400758277161838e+00, -2.549732539343734e+00,
+             4.374664141464968e+00,  2.938163982698783e+00 ]
+_norm_d = [  7.784695709041462e-03,  3.224671290700398e-01,
+             2.445134137142996e+00,  3.754408661907416e+00 ]
+
+def _poly( coeffs, x ):
+  y = 0.0
+  for c in coeffs:
+    y = y*x + c
+  return y
+
+def norm_quantile( p ):
+
+  if not 0.0 < p < 1.0:
+    raise ValueError( "p must be between 0 and 1" )
+
+  if p < 0.02425:
+    q = math.sqrt( -2 * math.log( p ) )
+    return _poly( _norm_c, q ) / ( _poly( _norm_d, q )*q + 1 )
+  if p > 1 - 0.02425:
+    return -norm_quantile( 1 - p )
+
+  q = p - 0.5
+  r = q*q
+  return _poly( _norm_a, r )*q / ( _poly( _norm_b, r )*r + 1 )
+
+#-------------------------------------------------------------------------
+# t_quantile
+#-------------------------------------------------------------------------
+# Returns the p-quantile of Student's t-distribution with df degrees of
+# freedom. Exact for one and two degrees of freedom, otherwise the
+# Cornish-Fisher expansion from Abramowitz and Stegun 26.7.5, which is
+# within 0.2% for the usual confidence levels.
+
+def t_quantile( p, df ):
+
+  if df == 1:
+    return math.tan( math.pi * ( p - 0.5 ) )
+  if df == 2:
+    return ( 2*p - 1 ) / math.sqrt( 2*p*( 1 - p ) )
+
+  z = norm_quantile( p )
+  g = [
+    ( z**3 + z ) / 4,
+    ( 5*z**5 + 16*z**3 + 3*z ) / 96,
+    ( 3*z**7 + 19*z**5 + 17*z**3 - 15*z ) / 384,
+    ( 79*z**9 + 776*z**7 + 1482*z**5 - 1920*z**3 - 945*z ) / 92160,
+  ]
+  return z + sum( gi / df**(i+1) for i, gi in enumerate( g ) )
+
+#-------------------------------------------------------------------------
+# Estimators
+#-------------------------------------------------------------------------
+# cycles is the number of cycles the detailed model takes for each
+# window and sizes is the number of transactions in each window. The
+# finite population correction makes the interval shrink to zero as the
+# windows cover the whole stream.
+
+def _half_width( stderr, nwindows, nsampled, ntotal, confidence ):
+  if nwindows < 2:
+    return math.inf
+  fpc = math.sqrt( max( 0.0, 1.0 - nsampled / ntotal ) )
+  return t_quantile( ( 1 + confidence ) / 2, nwindows - 1 ) * stderr * fpc
+
+def estimate_mean( cycles, sizes, ntotal, confidence=0.95 ):
+
+  k   = len( cycles )
+  cpt = [ c / n for c, n in zip( cycles, sizes ) ]
+
+  mean   = sum( cpt ) / k
+  stderr = statistics.stdev( cpt ) / math.sqrt( k ) if k > 1 else math.inf
+  hw     = _half_width( stderr, k, sum( sizes ), ntotal, confidence )
+
+  return {
+    'nwindows'   : k,
+    'confidence' : confidence,
+    'per_txn'    : mean,
+    'per_txn_ci' : hw,
+    'total'      : mean * ntotal,
+    'total_ci'   : hw * ntotal,
+  }
+
+# aux is the cheap model's estimate for each window and aux_total its
+# estimate for the whole stream.
+
+def estimate_diff( cycles, aux, sizes, aux_total, ntotal, confidence=0.95 ):
+
+  diff   = [ c - x for c, x in zip( cycles, aux ) ]
+  result = estimate_mean( diff, sizes, ntotal, confidence )
+
+  result['diff']     = result['per_txn']
+  result['per_txn'] += aux_total / ntotal
+  result['total']   += aux_total
+
+  return result
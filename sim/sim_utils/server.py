@@ -0,0 +1,235 @@
+#=========================================================================
+# server
+#=========================================================================
+# A warm simulation server. Most of the time of a short simulator run
+# goes into starting Python and importing PyMTL and the models. The
+# sim-server script starts one interpreter, imports everything once, and
+# then accepts simulation jobs over a Unix domain socket:
+#
+#   % ../sim-server --socket /tmp/sim.sock &
+#   % export PYMTL_SIM_SERVER=/tmp/sim.sock
+#   % ./sort-sim --impl cl --stats
+#
+# When PYMTL_SIM_SERVER is set, the simulator scripts call run_on_server
+# before importing anything else. It sends the script path, the command
+# line arguments, the working directory, and the environment to the
+# server along with the client's stdin, stdout, and stderr file
+# descriptors, then waits for the exit code. The server forks a child
+# for every job, which takes over the client's file descriptors (so the
+# output goes straight to the client's terminal), changes to the
+# client's working directory, and runs the script as __main__ with the
+# already imported modules. Every job runs in its own forked process, so
+# jobs can run concurrently and never see each other's state.
+#
+# If the server cannot be reached or does not take the job, run_on_server
+# prints a warning and returns None, and the script simply runs in its own process.
+#
+# This module only uses the standard library, so importing it does not
+# slow down the client.
+
+import array
+import importlib
+import json
+import os
+import runpy
+import signal
+import socket
+import struct
+import sys
+import traceback
+
+#-------------------------------------------------------------------------
+# Messages
+#-------------------------------------------------------------------------
+# Every message is a little-endian u32 length followed by that many bytes
+# of JSON. The job message also carries the client's file descriptors
+# as SCM_RIGHTS ancillary data (socket.send_fds and socket.recv_fds do
+# the same, but need Python 3.9).
+
+def _send_msg( sock, obj, fds=() ):
+  data = json.dumps( obj ).encode()
+  msg  = struct.pack( "<I", len(data) ) + data
+  if fds:
+    nbytes = sock.sendmsg( [ msg ], [ ( socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                                        array.array( "i", fds ) ) ] )
+    sock.sendall( msg[nbytes:] )
+  else:
+    sock.sendall( msg )
+
+def _recv_msg( sock, maxfds=0 ):
+  if maxfds:
+    fds = array.array( "i" )
+    data, ancdata, _, _ = sock.recvmsg( 65536, socket.CMSG_LEN( maxfds * fds.itemsize ) )
+    for level, type_, cdata in ancdata:
+      if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+        fds.frombytes( cdata[ : len(cdata) - len(cdata) % fds.itemsize ] )
+    fds = list( fds )
+  else:
+    data, fds = sock.recv( 65536 ), []
+
+  while len( data ) < 4 or len( data ) < 4 + struct.unpack( "<I", data[:4] )[0]:
+    chunk = sock.recv( 65536 )
+    if not chunk:
+      raise ConnectionError( "connection closed in the middle of a message" )
+    data += chunk
+
+  length = struct.unpack( "<I", data[:4] )[0]
+  return json.loads( data[4:4+length] ), fds
+
+#-------------------------------------------------------------------------
+# run_on_server
+#-------------------------------------------------------------------------
+# Runs script with the given arguments on the server listening on path.
+# Returns the exit code of the script, or None if there is no server or
+# the job cannot be sent to it.
+
+def run_on_server( path, script, argv ):
+
+  sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+  try:
+    sock.connect( path )
+  except OSError as e:
+    print( f" WARNING: cannot reach simulation server {path} ({e}), "
+           f"running locally", file=sys.stderr )
+    sock.close()
+    return None
+
+  with sock:
+    job = {
+      'script' : os.path.abspath( script ),
+      'argv'   : list( argv ),
+      'cwd'    : os.getcwd(),
+      'env'    : dict( os.environ ),
+    }
+    try:
+      _send_msg( sock, job, fds=[ 0, 1, 2 ] )
+    except OSError as e:
+      print( f" WARNING: cannot send job to simulation server {path} ({e}), "
+             f"running locally", file=sys.stderr )
+      return None
+
+    try:
+      reply, _ = _recv_msg( sock )
+    except ( ConnectionError, ValueError ):
+      print( " ERROR: simulation server closed the connection", file=sys.stderr )
+      return 1
+
+  return reply['returncode']
+
+#-------------------------------------------------------------------------
+# serve
+#-------------------------------------------------------------------------
+# Imports the preload modules and then serves jobs on path until the
+# process is interrupted or terminated.
+
+def _terminate( signum, frame ):
+  raise KeyboardInterrupt()
+
+def serve( path, preload=() ):
+
+  for name in preload:
+    try:
+      importlib.import_module( name )
+    except Exception as e:
+      print( f" WARNING: could not preload {name} ({e})", file=sys.stderr )
+
+  if os.path.exists( path ):
+    os.unlink( path )
+
+  server = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+  server.bind( path )
+  server.listen( 16 )
+
+  signal.signal( signal.SIGTERM, _terminate )
+
+  print( f"sim-server: listening on {path} (pid {os.getpid()})" )
+  sys.stdout.flush()
+
+  try:
+    while True:
+      conn, _ = server.accept()
+
+      # Reap finished jobs
+
+      try:
+        while os.waitpid( -1, os.WNOHANG )[0]:
+          pass
+      except ChildProcessError:
+        pass
+
+      sys.stdout.flush()
+      sys.stderr.flush()
+
+      # The child must never return into this loop (or run the cleanup
+      # below), whatever happens while it runs the job
+
+      if os.fork() == 0:
+        status = 1
+        try:
+          server.close()
+          signal.signal( signal.SIGINT,  signal.SIG_DFL )
+          signal.signal( signal.SIGTERM, signal.SIG_DFL )
+          status = _run_job( conn )
+        finally:
+          os._exit( status )
+
+      conn.close()
+
+  except KeyboardInterrupt:
+    pass
+
+  finally:
+    server.close()
+    if os.path.exists( path ):
+      os.unlink( path )
+
+# Runs in the forked child, returns the exit status of the child
+
+def _run_job( conn ):
+
+  try:
+    job, fds = _recv_msg( conn, maxfds=3 )
+  except Exception:
+    return 1
+
+  # Take over the client's stdin, stdout, and stderr
+
+  for i, fd in enumerate( fds ):
+    os.dup2( fd, i )
+    os.close( fd )
+
+  sys.stdin  = open( 0, "r", closefd=False )
+  sys.stdout = open( 1, "w", closefd=False, buffering=1 if os.isatty(1) else -1 )
+  sys.stderr = open( 2, "w", closefd=False, buffering=1 )
+
+  os.chdir( job['cwd'] )
+  os.environ.clear()
+  os.environ.update( job['env'] )
+  os.environ.pop( "PYMTL_SIM_SERVER", None )
+
+  sys.argv = [ job['script'] ] + job['argv']
+
+  returncode = 0
+  try:
+    runpy.run_path( job['script'], run_name="__main__" )
+  except SystemExit as e:
+    if e.code is None:
+      returncode = 0
+    elif isinstance( e.code, int ):
+      returncode = e.code
+    else:
+      print( e.code, file=sys.stderr )
+      returncode = 1
+  except BaseException:
+    traceback.print_exc()
+    returncode = 1
+
+  sys.stdout.flush()
+  sys.stderr.flush()
+
+  try:
+    _send_msg( conn, { 'returncode': returncode } )
+  except OSError:
+    pass
+
+  return 0
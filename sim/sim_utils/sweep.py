@@ -0,0 +1,133 @@
+#=========================================================================
+# sweep
+#=========================================================================
+# Helpers for simulator scripts which run every combination of a list of
+# implementations and a list of input datasets in one invocation:
+#
+#   groups = plan_sweep( impls, inputs, nworkers )
+#   rows   = run_sweep( partial( sim_group, opts ), groups, nworkers )
+#   print( format_table( rows, columns ) )
+#
+# The script provides a function which takes an implementation and a
+# list of inputs, elaborates (and with --translate, translates and
+# verilates) the model once, simulates each input in turn (resetting the
+# model in between), and returns one dict of statistics per input.
+# plan_sweep decides which inputs each call gets, and run_sweep runs the
+# calls on a pool of worker processes.
+#
+# Elaborating the model usually takes longer than simulating a dataset,
+# so plan_sweep keeps all the inputs of an implementation in one group
+# and only splits groups when there are more workers than groups. The
+# groups of a translated model are never split, since two workers
+# verilating the same model in the same directory would clobber each
+# other's files.
+#
+# The workers are forked from the simulator script, so the script does
+# not need to be importable and the model classes it already imported
+# are not imported again.
+
+import argparse
+import multiprocessing
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+#-------------------------------------------------------------------------
+# parse_list
+#-------------------------------------------------------------------------
+# Returns an argparse type which accepts a comma-separated list of the
+# given choices (or "all" for every choice).
+
+def parse_list( choices ):
+
+  def parse( value ):
+    if value == "all":
+      return list( choices )
+    values = value.split( "," )
+    for v in values:
+      if v not in choices:
+        raise argparse.ArgumentTypeError(
+          f"invalid choice: {v!r} (choose from {', '.join(choices)}, or all)" )
+    return values
+
+  return parse
+
+#-------------------------------------------------------------------------
+# plan_sweep
+#-------------------------------------------------------------------------
+# Returns a list of (impl,inputs) groups covering every combination of
+# impls and inputs, with at least nworkers groups if possible.
+
+def plan_sweep( impls, inputs, nworkers, split=True ):
+
+  groups = [ ( impl, list( inputs ) ) for impl in impls ]
+
+  while split and len( groups ) < nworkers:
+    i = max( range( len(groups) ), key=lambda i: len( groups[i][1] ) )
+    impl, group_inputs = groups[i]
+    if len( group_inputs ) < 2:
+      break
+    half = len( group_inputs ) // 2
+    groups[i:i+1] = [ ( impl, group_inputs[:half] ), ( impl, group_inputs[half:] ) ]
+
+  return groups
+
+#-------------------------------------------------------------------------
+# run_sweep
+#-------------------------------------------------------------------------
+# Calls func(impl,inputs) for every group with at most nworkers calls at
+# once and returns the concatenated lists of rows in group order. With
+# one worker we simulate in this process. If a call raises an exception
+# (e.g., the model does not elaborate), every input of its group gets a
+# row with just the impl, the input, and the error message, so one
+# broken model does not stop the rest of the sweep.
+
+def _run_group( func, impl, inputs ):
+  try:
+    return func( impl, inputs )
+  except Exception as e:
+    error = f"{type(e).__name__}: {e}".splitlines()[0]
+    return [ { 'impl': impl, 'input': input_, 'error': error } for input_ in inputs ]
+
+def run_sweep( func, groups, nworkers=None ):
+
+  nworkers = min( nworkers or os.cpu_count() or 1, len( groups ) )
+
+  if nworkers <= 1:
+    results = [ _run_group( func, impl, inputs ) for impl, inputs in groups ]
+
+  else:
+    context = multiprocessing.get_context( "fork" )
+    with ProcessPoolExecutor( max_workers=nworkers, mp_context=context ) as executor:
+      futures = [ executor.submit( _run_group, func, impl, inputs )
+                  for impl, inputs in groups ]
+      results = [ f.result() for f in futures ]
+
+  return [ row for rows in results for row in rows ]
+
+#-------------------------------------------------------------------------
+# format_table
+#-------------------------------------------------------------------------
+# Returns the rows (a list of dicts) as a text table with the given
+# columns, where columns is a list of (key,header,format) tuples. Missing
+# values are shown as "-", and the error of any failed row is listed
+# below the table.
+
+def format_table( rows, columns ):
+  cells  = [ [ format( row[k], fmt ) if k in row else "-" for k, _, fmt in columns ]
+             for row in rows ]
+  widths = [ max( [ len(h) ] + [ len( r[i] ) for r in cells ] )
+             for i, ( _, h, _ ) in enumerate( columns ) ]
+
+  lines = [ " ".join( f"{h:>{w}}" for ( _, h, _ ), w in zip( columns, widths ) ) ]
+  lines.append( " ".join( "-"*w for w in widths ) )
+  for r in cells:
+    lines.append( " ".join( f"{v:>{w}}" for v, w in zip( r, widths ) ) )
+
+  errors = [ row for row in rows if 'error' in row ]
+  if errors:
+    lines.append( "" )
+  for row in errors:
+    lines.append( f"{row['impl']} {row['input']}: {row['error']}" )
+
+  return "\n".join( lines )
@@ -0,0 +1,106 @@
+#=========================================================================
+# GenSrcSink_test
+#=========================================================================
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib import stream
+from pymtl3.stdlib.test_utils import mk_test_case_table, run_sim
+from pymtl3.stdlib.stream.SinkRTL import PyMTLTestSinkError
+
+from ..GenSourceRTL import GenSourceRTL
+from ..GenSinkRTL   import GenSinkRTL
+
+#-------------------------------------------------------------------------
+# TestHarness
+#-------------------------------------------------------------------------
+
+class TestHarness( Component ):
+
+  def construct( s, Type ):
+
+    s.src  = GenSourceRTL( Type )
+    s.q    = stream.NormalQueueRTL( Type, 2 )
+    s.sink = GenSinkRTL( Type )
+
+    s.src.send //= s.q.recv
+    s.q.send   //= s.sink.recv
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+  def line_trace( s ):
+    return s.src.line_trace() + " > " + s.q.line_trace() + " > " + s.sink.line_trace()
+
+def run_gen_sim( src_msgs, sink_msgs, src_delay=0, sink_delay=0 ):
+
+  th = TestHarness( Bits16 )
+
+  th.set_param("top.src.construct",
+    msgs=src_msgs, initial_delay=src_delay, interval_delay=src_delay )
+
+  th.set_param("top.sink.construct",
+    msgs=sink_msgs, initial_delay=sink_delay, interval_delay=sink_delay )
+
+  run_sim( th )
+  return th
+
+#-------------------------------------------------------------------------
+# Test cases
+#-------------------------------------------------------------------------
+
+test_case_table = mk_test_case_table([
+  (               "nmsgs src_delay sink_delay"),
+  [ "empty",      0,    0,        0          ],
+  [ "one",        1,    0,        0          ],
+  [ "many_0x0",   100,  0,        0          ],
+  [ "many_3x0",   100,  3,        0          ],
+  [ "many_0x3",   100,  0,        3          ],
+  [ "many_3x5",   100,  3,        5          ],
+])
+
+@pytest.mark.parametrize( **test_case_table )
+def test_gen( test_params ):
+
+  def msgs():
+    return ( b16(i) for i in range(test_params.nmsgs) )
+
+  th = run_gen_sim( msgs, msgs, test_params.src_delay, test_params.sink_delay )
+
+  assert th.src.nmsgs  == test_params.nmsgs
+  assert th.sink.nmsgs == test_params.nmsgs
+
+def test_wrong_msg():
+  with pytest.raises( PyMTLTestSinkError ):
+    run_gen_sim( lambda: iter([ b16(1), b16(2) ]),
+                 lambda: iter([ b16(1), b16(3) ]) )
+
+#-------------------------------------------------------------------------
+# Random delays
+#-------------------------------------------------------------------------
+
+def run_random_delay_sim( nmsgs, seed ):
+
+  def msgs():
+    return ( b16(i) for i in range(nmsgs) )
+
+  th = TestHarness( Bits16 )
+  th.set_param("top.src.construct",  msgs=msgs, max_random_delay=4, seed=seed )
+  th.set_param("top.sink.construct", msgs=msgs, max_random_delay=4, seed=seed+1 )
+  run_sim( th )
+
+  assert th.sink.nmsgs == nmsgs
+  return th.sim_cycle_count()
+
+def test_random_delay():
+
+  # The delays only depend on the seed
+
+  ncycles = run_random_delay_sim( 100, 0 )
+  assert ncycles == run_random_delay_sim( 100, 0 )
+  assert ncycles != run_random_delay_sim( 100, 7 )
+
+  # Random delays of 0-4 cycles give at least 2 cycles per message
+
+  assert ncycles > 200
@@ -0,0 +1,93 @@
+#=========================================================================
+# bintrace_test
+#=========================================================================
+
+import pytest
+
+from pymtl3 import *
+
+from ..bintrace import BinTraceWriter, BinTraceReader, render_trace
+
+#-------------------------------------------------------------------------
+# TraceModel
+#-------------------------------------------------------------------------
+
+@bitstruct
+class PairMsg:
+  a: Bits8
+  b: Bits8
+
+class Counter( Component ):
+
+  def construct( s ):
+
+    s.count = OutPort( 8 )
+
+    @update_ff
+    def up_count():
+      if s.reset:
+        s.count <<= 0
+      else:
+        s.count <<= s.count + 1
+
+class TraceModel( Component ):
+
+  def construct( s ):
+
+    s.ctr  = Counter()
+    s.vec  = [ OutPort( 8 ) for _ in range(2) ]
+    s.pair = OutPort( PairMsg )
+    s.wide = OutPort( 72 )
+
+    @update
+    def up_outs():
+      s.vec[0] @= s.ctr.count
+      s.vec[1] @= ~s.ctr.count
+      s.pair   @= PairMsg( s.ctr.count, s.ctr.count + 1 )
+      s.wide   @= zext( s.ctr.count, 72 ) << 64
+
+def run_traced( path, ncycles, **kwargs ):
+  model = TraceModel()
+  model.elaborate()
+  model.apply( DefaultPassGroup( linetrace=False ) )
+  model.sim_reset()
+
+  signals = [ "ctr.count", "vec[*]", "pair", "wide" ]
+  with BinTraceWriter( model, signals, path, **kwargs ) as trace:
+    trace.attach()
+    for _ in range( ncycles ):
+      model.sim_tick()
+
+#-------------------------------------------------------------------------
+# Tests
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "compress", [ True, False ] )
+def test_roundtrip( tmp_path, compress ):
+  path = str( tmp_path / "test.trace" )
+  run_traced( path, 10, block_cycles=4, compress=compress )
+
+  reader = BinTraceReader( path )
+  assert reader.names == [ "ctr.count", "vec[0]", "vec[1]", "pair", "wide" ]
+  assert [ sig['nbits'] for sig in reader.signals ] == [ 8, 8, 8, 16, 72 ]
+
+  # Three blocks of 4, 4, and 2 cycles, starting after the reset cycles
+
+  blocks = list( reader.blocks() )
+  assert [ ncycles for _, ncycles, _ in blocks ] == [ 4, 4, 2 ]
+
+  rows = list( reader.rows() )
+  assert [ cycle for cycle, _ in rows ] == list( range( 3, 13 ) )
+  for i, ( _, values ) in enumerate( rows ):
+    assert values == [ i, i, 0xff - i, ( i << 8 ) | ( i + 1 ), i << 64 ]
+
+def test_render( tmp_path ):
+  path = str( tmp_path / "test.trace" )
+  run_traced( path, 3 )
+  reader = BinTraceReader( path )
+
+  lines = list( render_trace( reader, names=[ "vec" ] ) )
+  assert lines == [ "  3: vec={00,ff}", "  4: vec={01,fe}", "  5: vec={02,fd}" ]
+
+  lines = list( render_trace( reader, fmt="{ctr.count}:{vec[1]:02x}", start=4 ) )
+  assert lines == [ "  4: 1:fe", "  5: 2:fd" ]
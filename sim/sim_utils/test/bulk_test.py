@@ -0,0 +1,78 @@
+#=========================================================================
+# bulk_test
+#=========================================================================
+
+import array
+
+import pytest
+
+from pymtl3 import *
+
+from ..bulk import BulkDriver, np
+
+#-------------------------------------------------------------------------
+# AddReg
+#-------------------------------------------------------------------------
+# Registers the sum of two inputs, and also outputs the sum directly.
+
+class AddReg( Component ):
+
+  def construct( s ):
+
+    s.in_ = [ InPort( 8 ) for _ in range(2) ]
+    s.sum = OutPort( 8 )
+    s.out = OutPort( 16 )
+
+    @update
+    def up_sum():
+      s.sum @= s.in_[0] + s.in_[1]
+
+    @update_ff
+    def up_reg():
+      if s.reset:
+        s.out <<= 0
+      else:
+        s.out <<= zext( s.sum, 16 ) + 0x100
+
+def mk_driver():
+  model = AddReg()
+  model.elaborate()
+  model.apply( DefaultPassGroup( linetrace=False ) )
+  model.sim_reset()
+  return BulkDriver( model, [ "in_" ], [ "sum", "out" ] )
+
+rows = [ [ 1, 2 ], [ 3, 4 ], [ 5, 6 ] ]
+ref  = [ [ 3, 0x103 ], [ 7, 0x107 ], [ 11, 0x10b ], [ 0, 0x100 ] ]
+
+#-------------------------------------------------------------------------
+# Tests
+#-------------------------------------------------------------------------
+
+def test_list_rows():
+  out = array.array( 'H', bytes( 2*2*4 ) )
+  mk_driver().run( rows, ncycles=4, out=out )
+  assert list( out ) == sum( ref, [] )
+
+def test_packed_bytes():
+  out = array.array( 'H', bytes( 2*2*4 ) )
+  mk_driver().run( bytes( sum( rows, [] ) ), ncycles=4, out=out )
+  assert list( out ) == sum( ref, [] )
+
+@pytest.mark.skipif( np is None, reason="needs NumPy" )
+def test_numpy():
+  driver = mk_driver()
+  out = driver.alloc_outputs( 4 )
+  assert out.dtype == np.uint16
+  driver.run( np.array( rows, dtype=np.uint8 ), ncycles=4, out=out )
+  assert out.tolist() == ref
+
+  # Later calls continue from where the previous call stopped
+
+  out = driver.run( np.array( [ [ 7, 8 ] ] ) )
+  assert out.tolist() == [ [ 15, 0x10f ] ]
+
+def test_errors():
+  with pytest.raises( ValueError ):
+    mk_driver().run( bytes( [ 1, 2, 3 ] ) )
+  with pytest.raises( ValueError ):
+    mk_driver().run( rows, out=bytearray( 4 ) )
@@ -0,0 +1,154 @@
+#=========================================================================
+# checkpoint_test
+#=========================================================================
+
+import os
+import subprocess
+import sys
+
+from collections import deque
+
+import pytest
+
+from pymtl3 import *
+
+from ..checkpoint import save_state, restore_state, save_checkpoint, \
+                         load_checkpoint
+from .bulk_test import AddReg
+
+sim_dir = os.path.dirname( os.path.dirname( os.path.dirname(
+            os.path.abspath( __file__ ) ) ) )
+
+#-------------------------------------------------------------------------
+# DelayCL
+#-------------------------------------------------------------------------
+# Delays its input by ndelay cycles with a deque, so all of its state is
+# python state.
+
+class DelayCL( Component ):
+
+  def construct( s, ndelay=3 ):
+
+    s.in_ = InPort( 8 )
+    s.out = OutPort( 8 )
+
+    s.queue = deque( [0]*ndelay )
+    s.total = 0
+
+    @update_ff
+    def block():
+      s.queue.append( int(s.in_) )
+      s.total += int(s.in_)
+      s.out <<= s.queue.popleft()
+
+class IterCL( Component ):
+
+  def construct( s ):
+    s.out  = OutPort( 8 )
+    s.iter = iter( range(10) )
+
+def mk_sim( model ):
+  model.elaborate()
+  model.apply( DefaultPassGroup( linetrace=False ) )
+  model.sim_reset()
+  return model
+
+def drive( model, inputs ):
+  outputs = []
+  for v in inputs:
+    for port in ( model.in_ if isinstance( model.in_, list ) else [ model.in_ ] ):
+      port @= v
+    model.sim_eval_combinational()
+    outputs.append( int(model.out) )
+    model.sim_tick()
+  return outputs
+
+#-------------------------------------------------------------------------
+# test_save_restore
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "Model", [ AddReg, DelayCL ] )
+def test_save_restore( Model ):
+
+  model = mk_sim( Model() )
+  drive( model, [ 1, 2, 3, 4, 5 ] )
+
+  state = save_state( model )
+  ref   = drive( model, [ 6, 7, 8, 9 ] )
+
+  # The state is a copy, and it can be restored more than once
+
+  for _ in range(2):
+    model = mk_sim( Model() )
+    restore_state( model, state )
+    assert model.sim_cycle_count() == state['cycle']
+    assert drive( model, [ 6, 7, 8, 9 ] ) == ref
+
+  if Model is DelayCL:
+    assert state['components']['s'] == { 'queue': deque( [ 3, 4, 5 ] ), 'total': 15 }
+
+#-------------------------------------------------------------------------
+# test_checkpoint_file
+#-------------------------------------------------------------------------
+
+def test_checkpoint_file( tmp_path ):
+  path = str( tmp_path / "delay.ckpt" )
+
+  model = mk_sim( DelayCL() )
+  drive( model, [ 1, 2, 3, 4, 5 ] )
+  save_checkpoint( model, path, key="delay", extra={ 'ninputs': 5 } )
+  ref = drive( model, [ 6, 7, 8 ] )
+
+  model = mk_sim( DelayCL() )
+  assert load_checkpoint( model, path, key="delay" ) == { 'ninputs': 5 }
+  assert drive( model, [ 6, 7, 8 ] ) == ref
+
+  with pytest.raises( ValueError ):
+    load_checkpoint( mk_sim( DelayCL() ), path, key="other" )
+
+def test_new_process( tmp_path ):
+  path = str( tmp_path / "addreg.ckpt" )
+
+  model = mk_sim( AddReg() )
+  drive( model, [ 1, 2, 3 ] )
+  save_checkpoint( model, path )
+
+  script = f"""
+from pymtl3 import *
+from sim_utils.checkpoint import load_checkpoint
+from sim_utils.test.bulk_test import AddReg
+model = AddReg()
+model.elaborate()
+model.apply( DefaultPassGroup( linetrace=False ) )
+load_checkpoint( model, {path!r} )
+print( model.sim_cycle_count(), int(model.out) )
+"""
+  env    = dict( os.environ, PYTHONPATH=sim_dir )
+  result = subprocess.run( [ sys.executable, "-c", script ], env=env,
+                           stdout=subprocess.PIPE, universal_newlines=True,
+                           check=True )
+
+  assert result.stdout.split() == [ str( model.sim_cycle_count() ), str( int(model.out) ) ]
+
+#-------------------------------------------------------------------------
+# test_errors
+#-------------------------------------------------------------------------
+
+def test_errors():
+
+  # Different models
+
+  with pytest.raises( ValueError ):
+    restore_state( mk_sim( DelayCL() ), save_state( mk_sim( AddReg() ) ) )
+
+  # No simulator yet
+
+  model = AddReg()
+  model.elaborate()
+  with pytest.raises( ValueError ):
+    save_state( model )
+
+  # Iterators cannot be saved
+
+  with pytest.raises( ValueError ):
+    save_state( mk_sim( IterCL() ) )
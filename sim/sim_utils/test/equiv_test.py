@@ -0,0 +1,100 @@
+#=========================================================================
+# equiv_test
+#=========================================================================
+
+import pytest
+
+from ..equiv import run_equiv, _to_intervals, _from_intervals
+
+# The "implementation" disagrees with the reference at a few indices
+
+bugs = { 5000, 9000, 12345 }
+
+def check( indices ):
+  for i in indices:
+    if i in bugs:
+      return { 'index': i, 'input': i, 'expected': 0, 'actual': 1 }
+  return None
+
+def check_ok( indices ):
+  return None
+
+#-------------------------------------------------------------------------
+# test_intervals
+#-------------------------------------------------------------------------
+
+def test_intervals():
+  chunks = { 0, 1, 2, 5, 7, 8 }
+  assert _to_intervals( chunks ) == [ [0,3], [5,6], [7,9] ]
+  assert _from_intervals( _to_intervals( chunks ) ) == chunks
+
+#-------------------------------------------------------------------------
+# test_run_equiv
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "nworkers", [ 1, 3 ] )
+def test_run_equiv( nworkers ):
+
+  result = run_equiv( check_ok, 20000, chunk_size=1000, nworkers=nworkers )
+  assert result == { 'npoints': 20000, 'nchecked': 20000, 'counterexample': None }
+
+  # Strided, the last chunk is partial
+
+  result = run_equiv( check_ok, 20000, stride=7, chunk_size=1000, nworkers=nworkers )
+  assert result['npoints'] == result['nchecked'] == 2858
+
+@pytest.mark.parametrize( "nworkers", [ 1, 3 ] )
+def test_first_counterexample( nworkers ):
+
+  result = run_equiv( check, 20000, chunk_size=100, nworkers=nworkers )
+  assert result['counterexample']['index'] == 5000
+  assert result['nchecked'] < 20000
+
+  # With a stride we only see the bugs on the stride
+
+  result = run_equiv( check, 20000, stride=3, chunk_size=100, nworkers=nworkers )
+  assert result['counterexample']['index'] == 9000
+
+#-------------------------------------------------------------------------
+# test_checkpoint
+#-------------------------------------------------------------------------
+
+def test_checkpoint( tmp_path ):
+  path    = str( tmp_path / "equiv.json" )
+  checked = []
+
+  def check_until_interrupted( indices ):
+    if indices.start >= 5000:
+      raise KeyboardInterrupt()
+    checked.append( indices )
+
+  with pytest.raises( KeyboardInterrupt ):
+    run_equiv( check_until_interrupted, 20000, chunk_size=1000, nworkers=1,
+               checkpoint=path, key="impl" )
+
+  assert len( checked ) == 5
+
+  # Resuming only checks the remaining chunks and finds the first bug
+
+  def check_and_record( indices ):
+    checked.append( indices )
+    return check( indices )
+
+  result = run_equiv( check_and_record, 20000, chunk_size=1000, nworkers=1,
+                      checkpoint=path, key="impl" )
+
+  assert len( checked ) == 6
+  assert result['counterexample']['index'] == 5000
+  assert result['nchecked'] == 6000
+
+  # The counterexample is saved too
+
+  result = run_equiv( check_and_record, 20000, chunk_size=1000, nworkers=1,
+                      checkpoint=path, key="impl" )
+  assert len( checked ) == 6
+  assert result['counterexample']['index'] == 5000
+
+  # A checkpoint of a different run is rejected
+
+  with pytest.raises( ValueError ):
+    run_equiv( check, 20000, chunk_size=1000, checkpoint=path, key="other" )
@@ -0,0 +1,142 @@
+#=========================================================================
+# latency_test
+#=========================================================================
+
+import math
+import random
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib import stream
+from pymtl3.stdlib.test_utils import run_sim
+
+from ..latency       import LatencyHistogram, format_histogram
+from ..GenSourceRTL  import GenSourceRTL
+from ..GenSinkRTL    import GenSinkRTL
+from ..StreamMonitor import StreamMonitor
+
+#-------------------------------------------------------------------------
+# test_histogram
+#-------------------------------------------------------------------------
+
+def nearest_rank( values, p ):
+  values = sorted( values )
+  return values[ max( 1, math.ceil( p / 100 * len( values ) ) ) - 1 ]
+
+def test_histogram_exact():
+  hist = LatencyHistogram()
+  for v in [ 3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5 ]:
+    hist.add( v )
+
+  assert hist.summary() == {
+    'count': 11, 'mean': 44/11, 'min': 1, 'p50': 4, 'p90': 6, 'p99': 9, 'max': 9
+  }
+
+  assert LatencyHistogram().percentile( 50 ) is None
+
+def test_histogram_random():
+  rng    = random.Random( 0 )
+  values = [ int( rng.paretovariate( 0.8 ) ) for _ in range( 10000 ) ]
+
+  hist = LatencyHistogram()
+  for v in values:
+    hist.add( v )
+
+  # Percentiles are rounded up to the top of their bucket
+
+  for p in [ 10, 50, 90, 99, 99.9, 100 ]:
+    exact = nearest_rank( values, p )
+    assert exact <= hist.percentile( p ) <= max( exact * 17 / 16, exact )
+
+  assert hist.percentile( 100 ) == max( values )
+  assert sum( count for _, _, count in hist.pow2_buckets() ) == len( values )
+
+  # Merging two halves gives the same histogram
+
+  first, second = LatencyHistogram(), LatencyHistogram()
+  for v in values[:5000]:
+    first.add( v )
+  for v in values[5000:]:
+    second.add( v )
+  first.merge( second )
+
+  assert first.summary() == hist.summary()
+  assert first.pow2_buckets() == hist.pow2_buckets()
+
+def test_format_histogram():
+  hist = LatencyHistogram()
+  for v in [ 1, 2, 3, 3, 9 ]:
+    hist.add( v )
+
+  assert format_histogram( hist, width=4 ) == [
+    " 1 -  1 |#   | 1 (20.0%)",
+    " 2 -  3 |####| 3 (60.0%)",
+    " 4 -  7 |    | 0 (0.0%)",
+    " 8 - 15 |#   | 1 (20.0%)",
+  ]
+
+#-------------------------------------------------------------------------
+# test_stream_monitor
+#-------------------------------------------------------------------------
+# A two-entry queue between a source and a sink. The queue takes one
+# cycle, so every message waits in it for one cycle plus however long
+# the sink stalls. With a source delay, each message spends one cycle
+# being accepted and one being sent, and the queue is empty otherwise.
+
+class TestHarness( Component ):
+
+  def construct( s ):
+
+    s.src     = GenSourceRTL( Bits16 )
+    s.q       = stream.NormalQueueRTL( Bits16, 2 )
+    s.sink    = GenSinkRTL( Bits16 )
+    s.monitor = StreamMonitor()
+
+    s.src.send //= s.q.recv
+    s.q.send   //= s.sink.recv
+
+    s.monitor.recv_val //= s.src.send.val
+    s.monitor.recv_rdy //= s.q.recv.rdy
+    s.monitor.send_val //= s.q.send.val
+    s.monitor.send_rdy //= s.sink.recv.rdy
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+  def line_trace( s ):
+    return s.src.line_trace() + " > " + s.q.line_trace() + " > " + s.sink.line_trace()
+
+@pytest.mark.parametrize( "src_delay, sink_delay", [ (0,0), (3,0), (0,3) ] )
+def test_stream_monitor( src_delay, sink_delay ):
+
+  def msgs():
+    return ( b16(i) for i in range(20) )
+
+  th = TestHarness()
+  th.set_param("top.src.construct",
+    msgs=msgs, initial_delay=src_delay, interval_delay=src_delay )
+  th.set_param("top.sink.construct",
+    msgs=msgs, initial_delay=sink_delay, interval_delay=sink_delay )
+
+  run_sim( th )
+
+  stats = th.monitor.stats()
+  assert stats['latency']['count'] == 20
+  assert stats['wait']['count'] == 20
+
+  # Every cycle after the three reset cycles is attributed once
+
+  assert sum( stats['cycles'].values() ) == stats['ncycles'] == th.sim_cycle_count() - 3
+  assert stats['cycles']['send'] == 20
+
+  if sink_delay:
+    assert stats['latency']['max'] > 1
+    assert stats['wait']['max'] > 0
+    assert stats['cycles']['sink'] > 20 * sink_delay // 2
+    assert stats['cycles']['src'] < stats['cycles']['sink']
+  else:
+    assert stats['latency']['min'] == stats['latency']['max'] == 1
+    assert stats['wait']['max'] == 0
+    assert stats['cycles']['sink'] == 0
+    assert stats['cycles']['src'] >= 20 * ( src_delay - 1 )
@@ -0,0 +1,54 @@
+#=========================================================================
+# lazy_test
+#=========================================================================
+# Each case runs in a new interpreter, since whether the lazy exports
+# work depends on what has been imported before.
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+sim_dir = os.path.dirname( os.path.dirname( os.path.dirname(
+            os.path.abspath( __file__ ) ) ) )
+
+def run_python( script ):
+  env    = dict( os.environ, PYTHONPATH=sim_dir )
+  result = subprocess.run( [ sys.executable, "-c", script ], env=env,
+                           stdout=subprocess.PIPE, universal_newlines=True,
+                           check=True )
+  return result.stdout.split()
+
+#-------------------------------------------------------------------------
+# test_lazy_exports
+#-------------------------------------------------------------------------
+# The exports are classes, whether or not their modules (which have the
+# same names) were imported directly before.
+
+@pytest.mark.parametrize( "package, module, name", [
+  ( "sim_utils",       "GenSourceRTL", "GenSourceRTL" ),
+  ( "sim_utils",       "profiling",    "SimProfiler"  ),
+  ( "tut3_pymtl.gcd",  "GcdUnitCL",    "GcdUnitCL"    ),
+  ( "tut3_pymtl.sort", "SortUnitCL",   "SortUnitCL"   ),
+])
+@pytest.mark.parametrize( "module_first", [ False, True ] )
+def test_lazy_exports( package, module, name, module_first ):
+
+  script = ""
+  if module_first:
+    script += f"import {package}.{module}\n"
+  script += f"from {package} import {name}\n"
+  script += f"print( isinstance( {name}, type ) )\n"
+
+  assert run_python( script ) == [ "True" ]
+
+def test_lazy_server():
+
+  # The simulation server does not need PyMTL
+
+  script  = "import sys\n"
+  script += "import sim_utils.server\n"
+  script += "print( 'pymtl3' in sys.modules )\n"
+
+  assert run_python( script ) == [ "False" ]
@@ -0,0 +1,75 @@
+#=========================================================================
+# profiling_test
+#=========================================================================
+
+import json
+
+from pymtl3 import *
+
+from ..profiling import SimProfiler
+
+#-------------------------------------------------------------------------
+# Counter
+#-------------------------------------------------------------------------
+
+class Counter( Component ):
+
+  def construct( s ):
+
+    s.out = OutPort( 8 )
+
+    @update_ff
+    def up_count():
+      if s.reset:
+        s.out <<= 0
+      else:
+        s.out <<= s.out + 1
+
+class Top( Component ):
+
+  def construct( s ):
+    s.counters = [ Counter() for _ in range(3) ]
+
+def run_profiled( nblocks, ncycles=10 ):
+
+  prof = SimProfiler( nblocks )
+
+  with prof.phase( "elaborate" ):
+    model = Top()
+    model.elaborate()
+  with prof.phase( "passes" ):
+    model.apply( DefaultPassGroup() )
+  with prof.phase( "reset" ):
+    model.sim_reset()
+  with prof.phase( "tick", ncycles=model.sim_cycle_count ):
+    for _ in range( ncycles ):
+      model.sim_tick()
+
+  return prof, model
+
+#-------------------------------------------------------------------------
+# Tests
+#-------------------------------------------------------------------------
+
+def test_phases():
+  prof, model = run_profiled( 0 )
+  report = prof.report( model, impl="top" )
+
+  assert report['impl'] == "top"
+  assert list( report['phases'] ) == [ "elaborate", "passes", "reset", "tick" ]
+  assert report['ncycles'] == 10
+  assert report['cycles_per_sec'] > 0
+  assert report['wall_time'] >= sum( report['phases'].values() )
+  assert not report['cprofile']
+  assert 'update_blocks' not in report
+
+def test_update_blocks():
+  prof, model = run_profiled( 5 )
+  report = json.loads( prof.to_json( model ) )
+
+  # All three counters share the code of one update block
+
+  assert report['cprofile']
+  assert report['update_blocks'][0]['name'] == "Counter.up_count"
+  assert report['update_blocks'][0]['ninstances'] == 3
+  assert report['update_blocks'][0]['ncalls'] == 30
@@ -0,0 +1,110 @@
+#=========================================================================
+# randseed_test
+#=========================================================================
+
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from ..randseed import parse_seed, session_seed, derive_seed, mk_rng
+
+sim_dir = os.path.dirname( os.path.dirname( os.path.dirname(
+            os.path.abspath( __file__ ) ) ) )
+
+#-------------------------------------------------------------------------
+# test_parse_seed
+#-------------------------------------------------------------------------
+
+def test_parse_seed():
+  assert parse_seed( None )     == 0xdeadbeef
+  assert parse_seed( "" )       == 0xdeadbeef
+  assert parse_seed( "0x1234" ) == 0x1234
+  assert parse_seed( "42" )     == 42
+  assert 0 <= parse_seed( "random" ) < 2**32
+
+  with pytest.raises( ValueError ):
+    parse_seed( "deadbeef" )
+
+#-------------------------------------------------------------------------
+# test_derive_seed
+#-------------------------------------------------------------------------
+
+def test_derive_seed():
+
+  # Streams only depend on the session seed and the name
+
+  assert derive_seed( "a", 1 ) == derive_seed( "a", 1 )
+  assert derive_seed( "a", 1 ) != derive_seed( "b", 1 )
+  assert derive_seed( "a", 1 ) != derive_seed( "a", 2 )
+  assert derive_seed( "a" )    == derive_seed( "a", session_seed() )
+
+  assert mk_rng( "a", 1 ).random() == mk_rng( "a", 1 ).random()
+
+def test_fix_randseed( request ):
+
+  # conftest.py seeds the random module from our node id
+
+  expected = random.Random( derive_seed( request.node.nodeid ) ).random()
+  assert random.random() == expected
+
+#-------------------------------------------------------------------------
+# test_replay
+#-------------------------------------------------------------------------
+# Running a test case on its own, after other test cases, or in a
+# different order must give it the same random values. The test file
+# lives outside of the project, so we load conftest.py as a plugin.
+
+test_a = '''
+def test_a():
+  print( "VALUE a", module_values[0], random.random() )
+'''
+
+test_b = '''
+def test_b():
+  print( "VALUE b", module_values[0], random.random() )
+'''
+
+header = '''
+import random
+from sim_utils.randseed import mk_rng
+
+module_values = [ mk_rng( __name__ ).random() ]
+'''
+
+def run_values( tmp_path, name, tests, randseed, only=None ):
+  os.makedirs( str( tmp_path / name ) )
+  path = str( tmp_path / name / "replay_test.py" )
+  with open( path, "w" ) as f:
+    f.write( header + "".join( tests ) )
+
+  cmd = [ sys.executable, "-m", "pytest", "-s", "-q", "-p", "no:cacheprovider",
+          "-p", "conftest", "--rootdir", os.path.dirname( path ),
+          "--randseed", randseed, path + ( f"::{only}" if only else "" ) ]
+  # Only our conftest is needed, so skip loading the installed plugins
+  # (PyMTL's included), which takes most of the time of a small run
+
+  env = dict( os.environ, PYTHONPATH=sim_dir, PYTEST_DISABLE_PLUGIN_AUTOLOAD="1" )
+  env.pop( "PYMTL_RANDSEED", None )
+  result = subprocess.run( cmd, cwd=os.path.dirname( path ), env=env,
+                           stdout=subprocess.PIPE, universal_newlines=True )
+  assert result.returncode == 0, result.stdout
+
+  # The progress dots end up in front of the printed values
+
+  return sorted( line[ line.index( "VALUE" ): ]
+                 for line in result.stdout.splitlines() if "VALUE" in line )
+
+# Replaying test_b on its own, from a module with the tests swapped,
+# gives the same values as in the full run, and another seed does not.
+
+def test_replay( tmp_path ):
+  both  = run_values( tmp_path, "both",  [ test_a, test_b ], "0x1234" )
+  alone = run_values( tmp_path, "alone", [ test_b, test_a ], "0x1234", "test_b" )
+  other = run_values( tmp_path, "other", [ test_a, test_b ], "0x5678", "test_b" )
+
+  assert len( both ) == 2 and len( alone ) == 1
+  assert both[1] == alone[0]
+  assert both[1] != other[0]
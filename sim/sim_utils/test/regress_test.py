@@ -0,0 +1,76 @@
+#=========================================================================
+# regress_test
+#=========================================================================
+
+from ..regress import shard, merge_reports, ShardResult
+
+nodeids = [
+  "a_test.py::test_0",
+  "a_test.py::test_1",
+  "a_test.py::test_2",
+  "b_test.py::test_0",
+  "b_test.py::test_1",
+  "c_test.py::test_0",
+]
+
+#-------------------------------------------------------------------------
+# test_shard
+#-------------------------------------------------------------------------
+
+def test_shard_by_test():
+  shards = shard( nodeids, 2, by="test" )
+  assert shards == [ nodeids[0::2], nodeids[1::2] ]
+
+def test_shard_by_file():
+  shards = shard( nodeids, 2, by="file" )
+
+  # Every test case ends up in exactly one shard
+
+  assert sorted( sum( shards, [] ) ) == sorted( nodeids )
+
+  # Test cases from the same file stay together and in order
+
+  assert shards[0] == nodeids[0:3]
+  assert shards[1] == nodeids[3:6]
+
+def test_shard_more_shards_than_tests():
+  shards = shard( nodeids[:2], 4, by="test" )
+  assert len(shards) == 4
+  assert sum( shards, [] ) == nodeids[:2]
+
+#-------------------------------------------------------------------------
+# test_merge_reports
+#-------------------------------------------------------------------------
+
+report0 = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="2">
+<testcase classname="pkg.a_test" name="test_0" time="0.5" />
+<testcase classname="pkg.a_test" name="test_1" time="1.5"><failure message="x"/></testcase>
+</testsuite></testsuites>
+"""
+
+report1 = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="1">
+<testcase classname="pkg.b_test" name="test_0[8]" time="2.0" />
+</testsuite></testsuites>
+"""
+
+def test_merge_reports( tmp_path ):
+  ( tmp_path / "r0.xml" ).write_text( report0 )
+  ( tmp_path / "r1.xml" ).write_text( report1 )
+
+  results = merge_reports([
+    ShardResult( 0, 1, str( tmp_path / "r0.xml" ), 2.0, "" ),
+    ShardResult( 1, 0, str( tmp_path / "r1.xml" ), 2.0, "" ),
+    ShardResult( 2, 0, None,                       0.0, "" ),
+  ], str( tmp_path / "merged.xml" ) )
+
+  assert [ ( r.shard, r.name, r.outcome, r.time ) for r in results ] == [
+    ( 0, "pkg/a_test.py::test_0",    "passed", 0.5 ),
+    ( 0, "pkg/a_test.py::test_1",    "failed", 1.5 ),
+    ( 1, "pkg/b_test.py::test_0[8]", "passed", 2.0 ),
+  ]
+
+  merged = ( tmp_path / "merged.xml" ).read_text()
+  assert 'tests="3"' in merged
+  assert 'failures="1"' in merged
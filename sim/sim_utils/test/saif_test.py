@@ -0,0 +1,102 @@
+#=========================================================================
+# saif_test
+#=========================================================================
+
+import re
+
+import pytest
+
+from pymtl3 import *
+
+from ..saif import SaifWriter
+from ..vcd  import VcdWriter
+from .vcd_test import DumpModel, read_vcd
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+def run_both( tmpdir, ncycles, **kwargs ):
+  model = DumpModel()
+  model.elaborate()
+  saif = SaifWriter( model, str( tmpdir.join( "dump.saif" ) ), **kwargs )
+  vcd  = VcdWriter ( model, str( tmpdir.join( "dump.vcd"  ) ), **kwargs )
+  model.apply( DefaultPassGroup( linetrace=False ) )
+  model.sim_reset()
+  for _ in range( ncycles ):
+    model.sim_tick()
+  vcd.close()
+  return saif
+
+# Computes the activity of every bit from a VCD dumped with VcdWriter,
+# the slow way
+
+def vcd_activity( path ):
+  names, changes = read_vcd( path )
+
+  cycles = [ ( t, v ) for t, v in changes if t % 100 == 0 ]
+  end    = changes[-1][0]
+
+  activity = {}
+  for name in names:
+    scope, _, net = name.rpartition( "/" )
+    if net == "clk":
+      continue
+
+    trace = []
+    for t, values in cycles:
+      if name in values:
+        trace.append( ( t, values[name] ) )
+
+    nbits = 1 if net in ( "odd", "reset" ) else 8
+    for bit in range( nbits ):
+      t1 = tc = 0
+      for ( t, v ), ( t_next, v_next ) in zip( trace, trace[1:] + [ ( end, None ) ] ):
+        if ( v >> bit ) & 1:
+          t1 += t_next - t
+        if v_next is not None and ( ( v ^ v_next ) >> bit ) & 1:
+          tc += 1
+      duration = end - cycles[0][0]
+      activity[ ( scope, net, None if nbits == 1 else bit ) ] = ( duration - t1, t1, tc )
+
+  return activity
+
+#-------------------------------------------------------------------------
+# Tests
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "cycles", [ None, ( 5, 12 ), ( 20, None ) ] )
+def test_activity( tmpdir, cycles ):
+  saif = run_both( tmpdir, 40, cycles=cycles )
+
+  activity = saif.activity()
+  expected = vcd_activity( str( tmpdir.join( "dump.vcd" ) ) )
+
+  assert { k: v for k, v in activity.items() if k[1] != "clk" } == expected
+
+  # The clock toggles twice per cycle
+
+  t0, t1, tc = activity[ ( "top", "clk", None ) ]
+  assert t0 == t1 and tc == 2*( t0 + t1 )//100
+
+def test_scope( tmpdir ):
+  saif = run_both( tmpdir, 10, scope="top/ctr" )
+  assert { k[:2] for k in saif.activity() } == \
+         { ( "top/ctr", "clk" ), ( "top/ctr", "count" ), ( "top/ctr", "reset" ) }
+
+def test_file( tmpdir ):
+  saif = run_both( tmpdir, 10, cycles=( 3, None ), root=[ "Dump_tb", "DUT" ] )
+  saif.close()
+
+  text = open( str( tmpdir.join( "dump.saif" ) ) ).read()
+
+  assert text.count( "(" ) == text.count( ")" )
+  assert re.search( r"\(DURATION 1000\)", text )
+  assert re.search( r"\(INSTANCE Dump_tb\s+\(INSTANCE DUT\s+\(NET", text )
+  assert re.search( r"\(INSTANCE ctr\s+\(NET", text )
+
+  # count goes from 0 to 9, so bit 0 is one for five cycles and toggles
+  # nine times
+
+  assert r"(count\[0\] (T0 500) (T1 500) (TX 0) (TC 9) (IG 0))" in text
+  assert r"(vec\[1\]\[7\] (T0 0) (T1 1000) (TX 0) (TC 0) (IG 0))" in text
@@ -0,0 +1,127 @@
+#=========================================================================
+# sampling_test
+#=========================================================================
+
+import random
+
+import pytest
+
+from ..sampling import plan_windows, norm_quantile, t_quantile, \
+                       estimate_mean, estimate_diff
+
+#-------------------------------------------------------------------------
+# test_plan_windows
+#-------------------------------------------------------------------------
+
+def test_plan_windows():
+  windows = plan_windows( 10000, 20, 100 )
+
+  assert len( windows ) == 20
+  assert all( stop - start == 100 for start, stop in windows )
+  assert all( b[0] - a[0] == 500 for a, b in zip( windows, windows[1:] ) )
+  assert 0 <= windows[0][0] and windows[-1][1] <= 10000
+
+  assert plan_windows( 10000, 20, 100 ) == windows
+  assert plan_windows( 100, 4, 25 ) == [ (0,25), (25,50), (50,75), (75,100) ]
+
+  with pytest.raises( ValueError ):
+    plan_windows( 1000, 20, 100 )
+
+#-------------------------------------------------------------------------
+# test_norm_quantile
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "p, z", [
+  ( 0.5,    0.0                ),
+  ( 0.975,  1.959963984540054  ),
+  ( 0.995,  2.5758293035489004 ),
+  ( 0.01,  -2.3263478740408408 ),
+  ( 1e-6,  -4.753424308822899  ),
+])
+def test_norm_quantile( p, z ):
+  assert norm_quantile( p ) == pytest.approx( z, rel=1e-8, abs=1e-12 )
+
+#-------------------------------------------------------------------------
+# test_t_quantile
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "p, df, t", [
+  ( 0.975, 1,  12.706 ),
+  ( 0.975, 2,  4.303  ),
+  ( 0.975, 3,  3.182  ),
+  ( 0.975, 5,  2.571  ),
+  ( 0.975, 10, 2.228  ),
+  ( 0.975, 30, 2.042  ),
+  ( 0.95,  10, 1.812  ),
+  ( 0.995, 20, 2.845  ),
+])
+def test_t_quantile( p, df, t ):
+  assert t_quantile( p, df ) == pytest.approx( t, rel=2e-3 )
+
+#-------------------------------------------------------------------------
+# test_estimate
+#-------------------------------------------------------------------------
+# A synthetic stream where every transaction takes a random number of
+# cycles, and a cheap model which estimates a bit less than that.
+
+def mk_stream( seed, ntotal=20000 ):
+  rng    = random.Random( seed )
+  aux    = [ rng.randint( 1, 100 ) for _ in range( ntotal ) ]
+  cycles = [ x + 2 + rng.randint( 0, 3 ) for x in aux ]
+  return cycles, aux
+
+def sample( stream, windows ):
+  return [ sum( stream[start:stop] ) for start, stop in windows ]
+
+def test_estimate_exact():
+  cycles, aux = mk_stream( 0, 1000 )
+
+  # Sampling the whole stream is exact
+
+  windows = plan_windows( 1000, 10, 100 )
+  result  = estimate_mean( sample( cycles, windows ), [ 100 ]*10, 1000 )
+  assert result['total'] == pytest.approx( sum( cycles ) )
+  assert result['total_ci'] == 0
+
+  # So is the difference estimate if the cheap model is off by a constant
+
+  windows = plan_windows( 1000, 10, 20 )
+  result  = estimate_diff( sample( cycles, windows ),
+                           [ c - 20*3 for c in sample( cycles, windows ) ],
+                           [ 20 ]*10, sum( cycles ) - 1000*3, 1000 )
+  assert result['diff'] == pytest.approx( 3 )
+  assert result['total'] == pytest.approx( sum( cycles ) )
+  assert result['total_ci'] == pytest.approx( 0 )
+
+def test_estimate_one_window():
+  result = estimate_mean( [ 100 ], [ 10 ], 1000 )
+  assert result['per_txn'] == 10
+  assert result['total_ci'] == float( 'inf' )
+
+def test_estimate_coverage():
+
+  # The 95% confidence intervals should cover the true total in about 95%
+  # of the trials, and the difference estimate should be much tighter
+
+  ntrials = 100
+  covered = { 'mean': 0, 'diff': 0 }
+  width   = { 'mean': 0, 'diff': 0 }
+
+  for trial in range( ntrials ):
+    cycles, aux = mk_stream( trial )
+    windows     = plan_windows( len( cycles ), 20, 20, seed=trial )
+    sizes       = [ 20 ]*20
+
+    results = {
+      'mean' : estimate_mean( sample( cycles, windows ), sizes, len( cycles ) ),
+      'diff' : estimate_diff( sample( cycles, windows ), sample( aux, windows ),
+                              sizes, sum( aux ), len( cycles ) ),
+    }
+
+    for name, result in results.items():
+      covered[name] += abs( result['total'] - sum( cycles ) ) <= result['total_ci']
+      width[name]   += result['total_ci']
+
+  assert covered['mean'] >= 0.85 * ntrials
+  assert covered['diff'] >= 0.85 * ntrials
+  assert width['diff'] < width['mean'] / 5
@@ -0,0 +1,84 @@
+#=========================================================================
+# server_test
+#=========================================================================
+
+import os
+import signal
+import socket
+import sys
+import time
+
+from .. import server
+from ..server import serve, run_on_server
+
+script = """
+import os, sys
+print( "args", sys.argv[1:], os.path.basename( os.getcwd() ),
+       os.environ.get( "SERVER_TEST" ), "PYMTL_SIM_SERVER" in os.environ )
+sys.exit( int( sys.argv[1] ) )
+"""
+
+#-------------------------------------------------------------------------
+# test_run_on_server
+#-------------------------------------------------------------------------
+
+def test_run_on_server( tmp_path, monkeypatch, capfd ):
+  path = str( tmp_path / "sim.sock" )
+  ( tmp_path / "job.py" ).write_text( script )
+
+  # No server yet, so the job would run locally
+
+  assert run_on_server( path, str( tmp_path / "job.py" ), [] ) is None
+  assert "WARNING" in capfd.readouterr().err
+
+  pid = os.fork()
+  if pid == 0:
+    sys.stdout = open( os.devnull, "w" )
+    try:
+      serve( path )
+    finally:
+      os._exit( 0 )
+
+  try:
+    for _ in range( 100 ):
+      if os.path.exists( path ):
+        break
+      time.sleep( 0.05 )
+
+    # The job runs with our working directory, environment, and stdout
+
+    work = tmp_path / "work"
+    work.mkdir()
+    monkeypatch.chdir( work )
+    monkeypatch.setenv( "SERVER_TEST", "hello" )
+    monkeypatch.setenv( "PYMTL_SIM_SERVER", path )
+
+    for code in [ 0, 3 ]:
+      assert run_on_server( path, str( tmp_path / "job.py" ), [ str(code) ] ) == code
+      assert capfd.readouterr().out == f"args ['{code}'] work hello False\n"
+
+  finally:
+    os.kill( pid, signal.SIGTERM )
+    os.waitpid( pid, 0 )
+
+  assert not os.path.exists( path )
+
+#-------------------------------------------------------------------------
+# test_run_on_server_send_fails
+#-------------------------------------------------------------------------
+# If the job cannot be sent, the script also runs locally.
+
+def test_run_on_server_send_fails( tmp_path, monkeypatch, capfd ):
+  path = str( tmp_path / "sim.sock" )
+
+  def send_fails( sock, obj, fds=() ):
+    raise BrokenPipeError( "broken pipe" )
+
+  monkeypatch.setattr( server, "_send_msg", send_fails )
+
+  with socket.socket( socket.AF_UNIX, socket.SOCK_STREAM ) as listener:
+    listener.bind( path )
+    listener.listen( 1 )
+
+    assert run_on_server( path, str( tmp_path / "job.py" ), [] ) is None
+    assert "cannot send job" in capfd.readouterr().err
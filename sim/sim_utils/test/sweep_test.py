@@ -0,0 +1,95 @@
+#=========================================================================
+# sweep_test
+#=========================================================================
+
+import argparse
+import os
+
+import pytest
+
+from ..sweep import parse_list, plan_sweep, run_sweep, format_table
+
+#-------------------------------------------------------------------------
+# parse_list
+#-------------------------------------------------------------------------
+
+def test_parse_list():
+  parse = parse_list( [ "cl", "rtl" ] )
+  assert parse( "rtl" )    == [ "rtl" ]
+  assert parse( "rtl,cl" ) == [ "rtl", "cl" ]
+  assert parse( "all" )    == [ "cl", "rtl" ]
+  with pytest.raises( argparse.ArgumentTypeError ):
+    parse( "cl,fl" )
+
+#-------------------------------------------------------------------------
+# plan_sweep
+#-------------------------------------------------------------------------
+
+def covered( groups ):
+  return sorted( ( impl, input_ ) for impl, inputs in groups for input_ in inputs )
+
+def test_plan_sweep():
+  impls  = [ "a", "b" ]
+  inputs = [ "w", "x", "y", "z" ]
+  everything = sorted( ( i, d ) for i in impls for d in inputs )
+
+  # One group per impl unless there are more workers
+
+  assert plan_sweep( impls, inputs, 1 ) == [ ( "a", inputs ), ( "b", inputs ) ]
+  assert plan_sweep( impls, inputs, 2 ) == [ ( "a", inputs ), ( "b", inputs ) ]
+
+  groups = plan_sweep( impls, inputs, 4 )
+  assert len( groups ) == 4 and covered( groups ) == everything
+
+  groups = plan_sweep( impls, inputs, 100 )
+  assert len( groups ) == 8 and covered( groups ) == everything
+
+  assert len( plan_sweep( impls, inputs, 8, split=False ) ) == 2
+
+#-------------------------------------------------------------------------
+# run_sweep
+#-------------------------------------------------------------------------
+
+def sim_group( impl, inputs ):
+  if impl == "broken":
+    raise RuntimeError( "does not elaborate\nmore details" )
+  return [ { 'impl': impl, 'input': input_, 'pid': os.getpid(),
+             'value': len( impl ) * len( input_ ) } for input_ in inputs ]
+
+@pytest.mark.parametrize( "nworkers", [ 1, 3 ] )
+def test_run_sweep( nworkers ):
+  groups = plan_sweep( [ "a", "bb", "broken" ], [ "x", "yyy" ], nworkers )
+  rows   = run_sweep( sim_group, groups, nworkers )
+
+  assert [ ( r['impl'], r['input'] ) for r in rows ] == \
+    [ ( "a", "x" ), ( "a", "yyy" ), ( "bb", "x" ), ( "bb", "yyy" ),
+      ( "broken", "x" ), ( "broken", "yyy" ) ]
+
+  assert [ r['value'] for r in rows[:4] ] == [ 1, 3, 2, 6 ]
+  assert rows[4]['error'] == "RuntimeError: does not elaborate"
+
+  # Groups run in separate worker processes
+
+  pids = { r['pid'] for r in rows[:4] }
+  assert ( os.getpid() in pids ) == ( nworkers == 1 )
+
+#-------------------------------------------------------------------------
+# format_table
+#-------------------------------------------------------------------------
+
+def test_format_table():
+  rows = [ { 'impl': "cl",  'cycles': 106, 'rate': 1.06 },
+           { 'impl': "rtl", 'input': "zeros", 'error': "NoWriterError" } ]
+
+  table = format_table( rows, [ ( 'impl',   "impl",   ""    ),
+                                ( 'cycles', "cycles", "d"   ),
+                                ( 'rate',   "cyc/x",  ".1f" ) ] )
+
+  assert table.splitlines() == [
+    "impl cycles cyc/x",
+    "---- ------ -----",
+    "  cl    106   1.1",
+    " rtl      -     -",
+    "",
+    "rtl zeros: NoWriterError",
+  ]
@@ -0,0 +1,149 @@
+#=========================================================================
+# vcd_test
+#=========================================================================
+
+import gzip
+
+from pymtl3 import *
+
+from ..vcd import VcdWriter, design_name
+
+#-------------------------------------------------------------------------
+# DumpModel
+#-------------------------------------------------------------------------
+
+class Counter( Component ):
+
+  def construct( s ):
+
+    s.count = OutPort( 8 )
+
+    @update_ff
+    def up_count():
+      if s.reset:
+        s.count <<= 0
+      else:
+        s.count <<= s.count + 1
+
+class DumpModel( Component ):
+
+  def construct( s ):
+
+    s.ctr = Counter()
+    s.vec = [ OutPort( 8 ) for _ in range(2) ]
+    s.odd = OutPort()
+
+    @update
+    def up_outs():
+      s.vec[0] @= s.ctr.count
+      s.vec[1] @= ~s.ctr.count
+      s.odd    @= s.ctr.count[0]
+
+def run_dump( path, ncycles, **kwargs ):
+  model = DumpModel()
+  model.elaborate()
+  vcd = VcdWriter( model, path, **kwargs )
+  model.apply( DefaultPassGroup( linetrace=False ) )
+  model.sim_reset()
+  for _ in range( ncycles ):
+    model.sim_tick()
+  vcd.close()
+
+# Parses a VCD into the full path of every variable and a list of
+# (time,{path:value}) changes
+
+def read_vcd( path ):
+  opener = gzip.open if path.endswith( ".gz" ) else open
+  with opener( path, "rt" ) as file:
+    lines = file.read().splitlines()
+
+  scope   = []
+  symbols = {}
+  changes = []
+  for line in lines:
+    fields = line.split()
+    if not fields:
+      continue
+    if fields[0] == "$scope":
+      scope.append( fields[2] )
+    elif fields[0] == "$upscope":
+      scope.pop()
+    elif fields[0] == "$var":
+      symbols.setdefault( fields[3], [] ).append( "/".join( scope + [ fields[4] ] ) )
+    elif fields[0].startswith( "#" ):
+      changes.append( ( int( fields[0][1:] ), {} ) )
+    elif fields[0].startswith( "b" ):
+      for name in symbols[ fields[1] ]:
+        changes[-1][1][ name ] = int( fields[0][1:], 2 )
+    elif fields[0][0] in "01" and changes:
+      for name in symbols[ fields[0][1:] ]:
+        changes[-1][1][ name ] = int( fields[0][0] )
+
+  return sorted( sum( symbols.values(), [] ) ), changes
+
+#-------------------------------------------------------------------------
+# Tests
+#-------------------------------------------------------------------------
+
+def test_full( tmpdir ):
+  path = str( tmpdir.join( "full.vcd" ) )
+  run_dump( path, 10 )
+
+  names, changes = read_vcd( path )
+  assert "top/ctr/count" in names
+  assert "top/vec(0)" in names and "top/vec(1)" in names
+
+  # Two reset cycles plus ten more, every cycle starts at 100*n
+
+  times = [ t for t, _ in changes if t % 100 == 0 ]
+  assert times[:12] == [ 100*i for i in range(12) ]
+
+  # Connected signals share one value
+
+  for t, values in changes:
+    if "top/vec(0)" in values:
+      assert values[ "top/vec(0)" ] == values[ "top/ctr/count" ]
+
+def test_window( tmpdir ):
+  path = str( tmpdir.join( "window.vcd" ) )
+  run_dump( path, 20, cycles=( 5, 8 ) )
+
+  _, changes = read_vcd( path )
+  times = [ t for t, _ in changes ]
+  assert times == [ 500, 550, 600, 650, 700, 750, 800 ]
+
+  # The first cycle of the window dumps everything, then only changes
+
+  assert changes[0][1][ "top/ctr/count" ] == 2
+  assert changes[0][1][ "top/reset" ] == 0
+  assert changes[2][1] == { "top/clk": 1, "top/ctr/clk": 1, "top/ctr/count": 3,
+                            "top/vec(0)": 3, "top/vec(1)": 0xfc, "top/odd": 1 }
+
+def test_scope_and_signals( tmpdir ):
+  path = str( tmpdir.join( "scope.vcd" ) )
+  run_dump( path, 5, scope="Dump_tb/DUT/ctr", root=[ "Dump_tb", "DUT" ] )
+
+  names, _ = read_vcd( path )
+  assert names == [ "Dump_tb/DUT/ctr/clk", "Dump_tb/DUT/ctr/count",
+                    "Dump_tb/DUT/ctr/reset" ]
+
+  path = str( tmpdir.join( "signals.vcd" ) )
+  run_dump( path, 5, signals=[ "*/vec(*)", "*/odd" ] )
+
+  names, changes = read_vcd( path )
+  assert names == [ "top/odd", "top/vec(0)", "top/vec(1)" ]
+  assert [ v[ "top/odd" ] for _, v in changes if "top/odd" in v ] == [ 0, 1, 0, 1, 0 ]
+
+def test_gzip( tmpdir ):
+  path = str( tmpdir.join( "dump.vcd" ) )
+  run_dump( path, 50, buffer_size=64 )
+
+  gz_path = str( tmpdir.join( "dump.vcd.gz" ) )
+  run_dump( gz_path, 50, buffer_size=64 )
+
+  assert read_vcd( path ) == read_vcd( gz_path )
+
+def test_design_name():
+  model = DumpModel()
+  model.elaborate()
+  assert design_name( model ) == "DumpModel_noparam"
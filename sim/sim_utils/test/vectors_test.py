@@ -0,0 +1,115 @@
+#=========================================================================
+# vectors_test
+#=========================================================================
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib.test_utils import run_test_vector_sim
+from pymtl3.stdlib.test_utils.test_helpers import RunTestVectorSimError
+
+from ..vectors import CompiledVectors, compile_test_vectors, run_test_vectors, np
+from .bulk_test import AddReg
+
+pytestmark = pytest.mark.skipif( np is None, reason="needs NumPy" )
+
+x = '?'
+
+# The sum is combinational, out registers the sum plus 0x100
+
+table = [ ( "in_[0]", "in_[1]", "sum*", "out*" ),
+  [ 1, 2, 3,      x     ],
+  [ 3, 4, 7,      0x103 ],
+  [ 5, 6, b8(11), 0x107 ],
+  [ 0, 0, 0,      0x10b ],
+]
+
+#-------------------------------------------------------------------------
+# compile_test_vectors
+#-------------------------------------------------------------------------
+
+def test_compile():
+  vectors = compile_test_vectors( table )
+
+  assert vectors.in_names  == [ "in_[0]", "in_[1]" ]
+  assert vectors.out_names == [ "sum", "out" ]
+  assert len( vectors ) == 4
+
+  assert vectors.inputs.dtype   == np.uint8
+  assert vectors.expected.dtype == np.uint16
+
+  assert vectors.expected.tolist() == [ [3,0], [7,0x103], [11,0x107], [0,0x10b] ]
+  assert vectors.mask[:,1].tolist() == [ False, True, True, True ]
+
+def test_compile_string_header():
+  vectors = compile_test_vectors( [ "in_[0] in_[1] sum*" ] + [ r[:3] for r in table[1:] ] )
+  assert vectors.out_names == [ "sum" ]
+
+def test_compile_bad_input():
+  with pytest.raises( RunTestVectorSimError ):
+    compile_test_vectors( [ table[0], [ x, 0, 0, 0 ] ] )
+
+#-------------------------------------------------------------------------
+# run_test_vectors
+#-------------------------------------------------------------------------
+
+def test_run():
+  run_test_vector_sim( AddReg(), table )
+  run_test_vectors( AddReg(), table )
+  run_test_vectors( AddReg(), compile_test_vectors( table ), chunk_size=3 )
+
+@pytest.mark.parametrize( "chunk_size", [ 1, 2, 4096 ] )
+def test_mismatch( chunk_size ):
+  bad = table[:3] + [ [ 5, 6, 11, 0x106 ] ] + table[4:]
+
+  with pytest.raises( RunTestVectorSimError ) as e:
+    run_test_vector_sim( AddReg(), bad, print_line_trace=False )
+  assert "row number     : 3" in str( e.value )
+
+  with pytest.raises( RunTestVectorSimError ) as e:
+    run_test_vectors( AddReg(), bad, chunk_size=chunk_size )
+  assert "row number     : 3\n" in str( e.value )
+  assert "port name      : out\n" in str( e.value )
+  assert "expected value : 262\n" in str( e.value )
+  assert "actual value   : 263\n" in str( e.value )
+
+# In bulk only the registered output can be checked, and each chunk
+# starts with the outputs of the last row of the previous one
+
+reg_table = [ ( "in_[0]", "in_[1]", "out*" ) ] + [ [ a, b, out ] for a, b, _, out in table[1:] ]
+
+@pytest.mark.parametrize( "chunk_size", [ 1, 2, 4096 ] )
+def test_bulk( chunk_size ):
+  run_test_vectors( AddReg(), reg_table, chunk_size=chunk_size, bulk=True )
+
+  bad = reg_table[:3] + [ [ 5, 6, 0x106 ] ] + reg_table[4:]
+
+  with pytest.raises( RunTestVectorSimError ) as e:
+    run_test_vectors( AddReg(), bad, chunk_size=chunk_size, bulk=True )
+  assert "row number     : 3\n" in str( e.value )
+  assert "expected value : 262\n" in str( e.value )
+  assert "actual value   : 263\n" in str( e.value )
+
+def test_bad_port():
+  with pytest.raises( RunTestVectorSimError ):
+    run_test_vectors( AddReg(), [ ( "in_", "sum*" ), [ 0, 0 ] ] )
+
+def test_large():
+
+  # Build the arrays directly, the registered output lags by a cycle
+
+  rng    = np.random.default_rng( 0 )
+  inputs = rng.integers( 0, 128, size=(10000,2), dtype=np.uint8 )
+  sums   = inputs.astype( np.uint16 ).sum( axis=1 )
+  outs   = np.concatenate( [ [0], sums[:-1] + 0x100 ] )
+  mask   = np.ones( (10000,2), dtype=bool )
+  mask[0,1] = False
+
+  vectors = CompiledVectors( [ "in_[0]", "in_[1]" ], [ "sum", "out" ], inputs,
+                             np.stack( [ sums, outs ], axis=1 ), mask )
+  run_test_vectors( AddReg(), vectors )
+
+  vectors.expected[7777,0] += 1
+  with pytest.raises( RunTestVectorSimError ) as e:
+    run_test_vectors( AddReg(), vectors )
+  assert "row number     : 7778\n" in str( e.value )
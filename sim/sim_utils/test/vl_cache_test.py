@@ -0,0 +1,80 @@
+#=========================================================================
+# vl_cache_test
+#=========================================================================
+
+import os
+import time
+
+from ..vl_cache import VlCache
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+def mk_artifacts( path, name, nbytes ):
+  os.makedirs( path / f"obj_dir_{name}", exist_ok=True )
+  ( path / f"obj_dir_{name}" / "V.mk" ).write_text( "x"*nbytes )
+  ( path / f"lib{name}_v.so" ).write_bytes( b"\0"*nbytes )
+  return [ f"obj_dir_{name}", f"lib{name}_v.so" ]
+
+#-------------------------------------------------------------------------
+# test_mk_key
+#-------------------------------------------------------------------------
+
+def test_mk_key():
+  key0 = VlCache.mk_key({ 'verilog_hash' : 'abc', 'params' : [('p_nbits','8')] })
+  key1 = VlCache.mk_key({ 'params' : [('p_nbits','8')], 'verilog_hash' : 'abc' })
+  key2 = VlCache.mk_key({ 'verilog_hash' : 'abc', 'params' : [('p_nbits','16')] })
+  assert key0 == key1
+  assert key0 != key2
+
+#-------------------------------------------------------------------------
+# test_store_restore
+#-------------------------------------------------------------------------
+
+def test_store_restore( tmp_path ):
+  cache = VlCache( str( tmp_path / "cache" ) )
+
+  build0 = tmp_path / "build0"
+  build1 = tmp_path / "build1"
+  build1.mkdir()
+  names = mk_artifacts( build0, "Top", 100 )
+
+  assert not cache.contains( "key" )
+  assert not cache.restore( "key", str(build1) )
+
+  cache.store( "key", names, str(build0) )
+  assert cache.contains( "key" )
+
+  assert cache.restore( "key", str(build1) )
+  assert ( build1 / "libTop_v.so" ).read_bytes() == b"\0"*100
+  assert ( build1 / "obj_dir_Top" / "V.mk" ).read_text() == "x"*100
+
+#-------------------------------------------------------------------------
+# test_evict
+#-------------------------------------------------------------------------
+
+def test_evict( tmp_path ):
+
+  # Each entry is 200 bytes, so only two entries fit in the cache
+
+  cache = VlCache( str( tmp_path / "cache" ), max_size=500 )
+
+  for name in [ "A", "B" ]:
+    names = mk_artifacts( tmp_path / name, name, 100 )
+    cache.store( name, names, str( tmp_path / name ) )
+
+  # Make A older than B, then use A so that B is least recently used
+
+  now = time.time()
+  os.utime( cache.entry_path("A"), ( now-20, now-20 ) )
+  os.utime( cache.entry_path("B"), ( now-10, now-10 ) )
+  cache.restore( "A", str(tmp_path) )
+
+  names = mk_artifacts( tmp_path / "C", "C", 100 )
+  cache.store( "C", names, str( tmp_path / "C" ) )
+
+  assert cache.contains( "A" )
+  assert not cache.contains( "B" )
+  assert cache.contains( "C" )
+  assert cache.size() <= 500
@@ -0,0 +1,285 @@
+#=========================================================================
+# vcd
+#=========================================================================
+# VcdWriter is a replacement for the VCD dumping in PyMTL's
+# VcdGenerationPass which can restrict the dump to a window of cycles, a
+# hierarchy scope, and signals matching a set of globs, and which can
+# write gzip compressed output. It hooks into the simulator the same way
+# as VcdGenerationPass, so it must be created after elaboration but
+# before the simulation passes are applied:
+#
+#   model = config_model_with_cmdline_opts( model, cmdline_opts, [] )
+#   vcd   = VcdWriter( model, "sort.vcd.gz", cycles=(1000,2000),
+#                      scope="SortUnitStructRTL__nbits_8_tb/DUT",
+#                      root=[ "SortUnitStructRTL__nbits_8_tb", "DUT" ] )
+#   model.apply( DefaultPassGroup() )
+#   ... simulate ...
+#   vcd.close()
+#
+# Scopes and signals are named with slash-separated paths of VCD scope
+# names. The top component is placed under the scopes in root (by
+# default just "top", like VcdGenerationPass), every other component
+# gets a scope named after its field (or the name given in rename), and
+# list indices are written with parentheses (e.g., in_(0)) since that is
+# what waveform viewers expect. A scope selects every signal below it,
+# and the signal globs are matched with fnmatch against the full path of
+# each signal (e.g., "*/DUT/*" or "*_reg/out"). Only the scopes which
+# contain selected signals appear in the VCD, but they keep their full
+# path so that the instance names still match the saif_instance of the
+# ASIC flow.
+#
+# Cycles are numbered like VcdGenerationPass (the reset cycles count),
+# and the timestamps are the same (cycle n starts at 100*n). Nothing is
+# written before the first cycle of the window except for the header.
+# The first cycle in the window dumps every selected signal, and then we
+# only write the signals which changed, one buffered write per cycle.
+# Paths ending in .gz are compressed as they are written, so the whole
+# VCD never needs to fit on disk uncompressed.
+
+import fnmatch
+import gzip
+import time
+
+from pymtl3.passes.rtlir.rtype.RTLIRType import RTLIRGetter
+from pymtl3.passes.rtlir.util.utility   import get_component_full_name
+from pymtl3.passes.tracing              import VcdGenerationPass
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+def _vcd_mangle( name ):
+  return name.replace( '[', '(' ).replace( ']', ')' ).replace( ':', '__' )
+
+def _gen_vcd_symbols():
+  codechars = ''.join( [ chr(i) for i in range(33, 127) ] )
+  n = 0
+  while True:
+    q, r = divmod( n, len(codechars) )
+    code = codechars[r]
+    while q > 0:
+      q, r = divmod( q, len(codechars) )
+      code = codechars[r] + code
+    yield code
+    n += 1
+
+# Name of the Verilog module PyMTL generates for a model (e.g.,
+# SortUnitFlatRTL__nbits_8), which is also the design name in the ASIC
+# flow. The flow testbench instantiates the design as <design>_tb/DUT.
+
+def design_name( model ):
+  return get_component_full_name(
+           RTLIRGetter( cache=False ).get_component_ifc_rtlir( model ) )
+
+# Returns a (signal,scope path,name) tuple for every top level signal
+# (i.e., not slices or bitstruct fields, like VcdGenerationPass) which is
+# below scope and matches one of the globs.
+
+def _select_signals( top, scope=None, signals=None, root=( "top", ), rename=None ):
+
+  rename = rename or {}
+
+  def scope_path( m ):
+    if m is top:
+      return "/".join( root )
+    parent = m.get_parent_object()
+    while not hasattr( parent, 'get_child_components' ):
+      parent = parent.get_parent_object()
+    name = rename.get( m, _vcd_mangle( repr(m)[ len(repr(parent))+1: ] ) )
+    return scope_path( parent ) + "/" + name
+
+  scope = scope.strip( "/" ) if scope else None
+
+  selected = []
+  for sig in sorted( top._dsl.all_signals, key=repr ):
+    if not sig.is_top_level_signal():
+      continue
+    host  = sig.get_host_component()
+    hpath = scope_path( host )
+    name  = _vcd_mangle( repr(sig)[ len(repr(host))+1: ] )
+    full  = f"{hpath}/{name}"
+
+    if scope and not ( hpath == scope or hpath.startswith( scope + "/" ) ):
+      continue
+    if signals and not any( fnmatch.fnmatchcase( full, g ) for g in signals ):
+      continue
+
+    selected.append( ( sig, hpath, name ) )
+
+  return selected
+
+# Looks up the simulated value of each selected signal. Connected signals
+# share the same value object, so we return the distinct values (as
+# [value,nbits] lists) and, for every selected signal, the index of its
+# value. Must be called after the simulator has been set up.
+
+def _resolve_signals( top, selected ):
+  values = []
+  index  = {}
+  where  = []
+  for sig, hpath, name in selected:
+    value = eval( repr(sig), { 's': top } )
+    if id(value) not in index:
+      index[ id(value) ] = len( values )
+      nbits = value.to_bits().nbits if hasattr( value, 'to_bits' ) else value.nbits
+      values.append( [ value, nbits ] )
+    where.append( index[ id(value) ] )
+  return values, where
+
+# Adds func to the functions the simulator calls right before every
+# clock edge, so several writers can be attached to the same model.
+
+def _add_dump_func( top, func ):
+  if top.has_metadata( VcdGenerationPass.vcd_func ):
+    prev = top.get_metadata( VcdGenerationPass.vcd_func )
+    def dump():
+      prev()
+      func()
+    top.set_metadata( VcdGenerationPass.vcd_func, dump )
+  else:
+    top.set_metadata( VcdGenerationPass.vcd_func, func )
+
+#-------------------------------------------------------------------------
+# VcdWriter
+#-------------------------------------------------------------------------
+
+class VcdWriter:
+
+  def __init__( s, top, path, cycles=None, scope=None, signals=None,
+                root=( "top", ), rename=None, buffer_size=1<<20 ):
+
+    s.top         = top
+    s.path        = path
+    s.start, s.stop = cycles if cycles else ( None, None )
+    s.buffer_size = buffer_size
+
+    s.selected = _select_signals( top, scope, signals, root, rename )
+
+    # Hook into the simulator
+
+    s.file     = None
+    s.ncycles  = 0
+    s.entries  = None
+    _add_dump_func( top, s.dump )
+
+  #-----------------------------------------------------------------------
+  # _open
+  #-----------------------------------------------------------------------
+  # Writes the header once the simulator has been set up and we can look
+  # up the simulated value of each signal.
+
+  def _open( s ):
+
+    if s.path.endswith( ".gz" ):
+      s.file = gzip.open( s.path, "wt", compresslevel=1 )
+    else:
+      s.file = open( s.path, "w" )
+
+    out = [ f"$date\n  {time.asctime()}\n$end\n$version\n  PyMTL 3 (sim_utils)\n$end\n"
+            f"$timescale\n 10ps\n$end\n" ]
+
+    # Group the signals by scope and define each scope once. Signals
+    # which are connected share the same simulated value, so they also
+    # share a symbol.
+
+    values, where = _resolve_signals( s.top, s.selected )
+
+    symbols   = _gen_vcd_symbols()
+    symbols   = [ next( symbols ) for _ in values ]
+    s.entries = []
+    s.clocks  = []
+    by_scope  = {}
+    seen      = set()
+
+    for ( sig, hpath, name ), i in zip( s.selected, where ):
+      if i not in seen:
+        seen.add( i )
+        if name == "clk":
+          s.clocks.append( symbols[i] )
+        else:
+          s.entries.append( [ values[i][0], symbols[i], values[i][1], None ] )
+      by_scope.setdefault( hpath, [] ).append( ( name, symbols[i], values[i][1] ) )
+
+    cur = []
+    for hpath in sorted( by_scope ):
+      path = hpath.split( "/" )
+      while cur and cur != path[:len(cur)]:
+        out.append( "$upscope $end\n" )
+        cur.pop()
+      for field in path[len(cur):]:
+        out.append( f"$scope module {field} $end\n" )
+        cur.append( field )
+      for name, symbol, nbits in by_scope[ hpath ]:
+        out.append( f"$var reg {nbits} {symbol} {name} $end\n" )
+    out.extend( "$upscope $end\n" for _ in cur )
+    out.append( "$enddefinitions $end\n" )
+
+    s.file.write( "".join( out ) )
+    s.buf   = []
+    s.nbuf  = 0
+    s.first = True
+
+  #-----------------------------------------------------------------------
+  # dump
+  #-----------------------------------------------------------------------
+  # Called by the simulator right before every clock edge.
+
+  def dump( s ):
+
+    cycle = s.ncycles
+    s.ncycles += 1
+
+    if s.start is not None and cycle < s.start:
+      return
+    if s.stop is not None and cycle >= s.stop:
+      return
+
+    if s.file is None:
+      s._open()
+
+    out = [ f"#{100*cycle}\n" ]
+    for symbol in s.clocks:
+      out.append( f"1{symbol}\n" )
+
+    first, s.first = s.first, False
+    if first:
+      out.append( "$dumpvars\n" )
+
+    for entry in s.entries:
+      value = entry[0]
+      v = int( value.to_bits() ) if hasattr( value, 'to_bits' ) else int( value )
+      if v != entry[3]:
+        entry[3] = v
+        out.append( f"{v}{entry[1]}\n" if entry[2] == 1 else f"b{v:b} {entry[1]}\n" )
+
+    if first:
+      out.append( "$end\n" )
+
+    if s.clocks:
+      out.append( f"#{100*cycle+50}\n" )
+      for symbol in s.clocks:
+        out.append( f"0{symbol}\n" )
+
+    line = "".join( out )
+    s.buf.append( line )
+    s.nbuf += len( line )
+    if s.nbuf >= s.buffer_size:
+      s.flush()
+
+  #-----------------------------------------------------------------------
+  # flush/close
+  #-----------------------------------------------------------------------
+
+  def flush( s ):
+    if s.file is not None and s.buf:
+      s.file.write( "".join( s.buf ) )
+      s.buf  = []
+      s.nbuf = 0
+
+  def close( s ):
+    if s.file is not None:
+      s.flush()
+      end = s.ncycles if s.stop is None else min( s.ncycles, s.stop )
+      s.file.write( f"#{100*end}\n" )
+      s.file.close()
+      s.file = None
@@ -0,0 +1,231 @@
+#=========================================================================
+# vectors
+#=========================================================================
+# A compiled version of run_test_vector_sim. The usual test vector table
+# (a header naming the ports, with a '*' after every output port, and
+# one row of values per cycle where '?' means don't care) is compiled
+# once into three packed NumPy arrays: the inputs, the expected outputs,
+# and a boolean mask which is False for every don't care:
+#
+#   vectors = compile_test_vectors( mk_test_vector_table( 3, tvec_random ) )
+#   run_test_vectors( SortUnitFlatRTL(), vectors, cmdline_opts )
+#
+# Large tests can skip the table altogether and build the arrays
+# directly (e.g., with a vectorized reference model):
+#
+#   vectors = CompiledVectors( in_names, out_names, inputs, expected, mask )
+#
+# run_test_vectors drives the model exactly like run_test_vector_sim:
+# every cycle it writes the inputs of the row, evaluates the
+# combinational logic, reads the outputs, and ticks the clock. None of
+# the per-cell work of run_test_vector_sim (parsing port names, checking
+# for '?', converting values) is left in the loop, and the outputs are
+# only compared once per chunk of rows with a single masked NumPy
+# comparison. On a mismatch we raise RunTestVectorSimError with the
+# first failing row and port, just like run_test_vector_sim.
+#
+# If no output depends combinationally on the inputs of the same cycle
+# (e.g., every output comes straight from a register, like in the
+# pipelined sort unit or RegIncrNstage), run_test_vectors( ..., bulk=True )
+# drives the model with a BulkDriver instead. The driver reads the
+# outputs right after each clock edge, which for such a model is what
+# run_test_vector_sim reads in the next row, so we compare every row
+# with the outputs read after the previous row (or after reset for the
+# first row) and save evaluating the model once more every cycle. For a
+# model with combinational outputs this reports spurious mismatches.
+#
+# Ports wider than 64 bits are not supported, and compiling test
+# vectors needs NumPy, which is optional everywhere else, so we only
+# complain about it when vectors are compiled.
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+from pymtl3 import *
+from pymtl3.stdlib.test_utils import config_model_with_cmdline_opts
+from pymtl3.stdlib.test_utils.test_helpers import RunTestVectorSimError, \
+                                                  finalize_verilator
+
+from .bulk import BulkDriver, _lookup_signals
+
+#-------------------------------------------------------------------------
+# CompiledVectors
+#-------------------------------------------------------------------------
+# in_names and out_names name one port each (e.g., in_val or out[2]),
+# inputs is an (nrows,nin) array and expected and mask are (nrows,nout)
+# arrays (mask is boolean). The mask defaults to checking every output.
+
+def _check_numpy():
+  if np is None:
+    raise ImportError( "compiled test vectors need NumPy" )
+
+def _dtype_for( arr ):
+  return np.min_scalar_type( int( arr.max() ) if arr.size else 0 )
+
+class CompiledVectors:
+
+  def __init__( s, in_names, out_names, inputs, expected, mask=None ):
+
+    _check_numpy()
+
+    s.in_names  = list( in_names  )
+    s.out_names = list( out_names )
+
+    s.inputs   = np.asarray( inputs   ).reshape( -1, len( s.in_names  ) )
+    s.expected = np.asarray( expected ).reshape( -1, len( s.out_names ) )
+
+    if mask is None:
+      s.mask = np.ones( s.expected.shape, dtype=bool )
+    else:
+      s.mask = np.asarray( mask, dtype=bool ).reshape( s.expected.shape )
+
+    if len( s.inputs ) != len( s.expected ):
+      raise ValueError( f"{len(s.inputs)} rows of inputs but "
+                        f"{len(s.expected)} rows of expected outputs" )
+
+  def __len__( s ):
+    return len( s.inputs )
+
+#-------------------------------------------------------------------------
+# compile_test_vectors
+#-------------------------------------------------------------------------
+# Compiles a run_test_vector_sim table into CompiledVectors.
+
+def _to_int( value ):
+  if hasattr( value, 'to_bits' ):
+    value = value.to_bits()
+  return int( value )
+
+def compile_test_vectors( table ):
+
+  _check_numpy()
+
+  header = table[0].split() if isinstance( table[0], str ) else list( table[0] )
+
+  in_cols  = [ i for i, name in enumerate( header ) if not name.endswith( "*" ) ]
+  out_cols = [ i for i, name in enumerate( header ) if name.endswith( "*" ) ]
+
+  inputs   = []
+  expected = []
+  mask     = []
+
+  for row_num, row in enumerate( table[1:], 1 ):
+
+    if len( row ) != len( header ):
+      raise ValueError( f"row {row_num} has {len(row)} values but the header "
+                        f"names {len(header)} ports" )
+
+    for i in in_cols:
+      if row[i] == '?':
+        raise RunTestVectorSimError( f"Invalid input value in row {row_num} ({row}): "
+                                     f"'?' can only appear in output values" )
+      inputs.append( _to_int( row[i] ) )
+
+    for i in out_cols:
+      if row[i] == '?':
+        expected.append( 0 )
+        mask.append( False )
+      else:
+        expected.append( _to_int( row[i] ) )
+        mask.append( True )
+
+  # Pack the values as tightly as the largest value allows
+
+  inputs   = np.array( inputs,   dtype=np.uint64 )
+  expected = np.array( expected, dtype=np.uint64 )
+
+  return CompiledVectors( [ header[i]      for i in in_cols  ],
+                          [ header[i][:-1] for i in out_cols ],
+                          inputs.astype( _dtype_for( inputs ) ),
+                          expected.astype( _dtype_for( expected ) ),
+                          np.array( mask, dtype=bool ) )
+
+#-------------------------------------------------------------------------
+# run_test_vectors
+#-------------------------------------------------------------------------
+# Runs the test vectors (a CompiledVectors or a table, which we compile
+# first) on the model. chunk_size is the number of rows we simulate
+# between comparisons, and bulk drives the model with a BulkDriver (see
+# above).
+
+def _lookup_port( model, name ):
+  signals = _lookup_signals( model, name )
+  if len( signals ) != 1:
+    raise RunTestVectorSimError( f"Invalid port name: {name} is a list of ports" )
+  return signals[0][1]
+
+def run_test_vectors( model, vectors, cmdline_opts=None, chunk_size=4096,
+                      bulk=False ):
+
+  if not isinstance( vectors, CompiledVectors ):
+    vectors = compile_test_vectors( vectors )
+
+  model = config_model_with_cmdline_opts( model, cmdline_opts or {}, [] )
+
+  try:
+    model.apply( DefaultPassGroup( linetrace=False ) )
+    model.sim_reset()
+
+    try:
+      in_ports  = [ _lookup_port( model, name ) for name in vectors.in_names  ]
+      out_ports = [ _lookup_port( model, name ) for name in vectors.out_names ]
+    except AttributeError as e:
+      raise RunTestVectorSimError( f"Invalid port name: {e}" )
+
+    nout     = len( out_ports )
+    tick     = model.sim_tick
+    eval_    = model.sim_eval_combinational
+    expected = vectors.expected.astype( np.uint64, copy=False )
+    mask     = vectors.mask
+
+    if bulk:
+      driver = BulkDriver( model, in_ports, out_ports )
+      last   = np.array( [ int(p) for p in out_ports ], dtype=np.uint64 )
+
+    for start in range( 0, len( vectors ), chunk_size ):
+      stop = min( start + chunk_size, len( vectors ) )
+
+      if bulk:
+
+        # Row r sees the outputs right after the clock edge of row r-1
+
+        out    = driver.run( vectors.inputs[start:stop] ).astype( np.uint64 )
+        actual = np.concatenate( [ last[None,:], out[:-1] ] )
+        last   = out[-1]
+
+      else:
+
+        # Main loop, keep everything in local variables
+
+        actual = []
+        for row in vectors.inputs[start:stop].tolist():
+          for p, v in zip( in_ports, row ):
+            p @= v
+          eval_()
+          for p in out_ports:
+            actual.append( int(p) )
+          tick()
+
+        actual = np.array( actual, dtype=np.uint64 ).reshape( -1, nout )
+      wrong  = ( actual != expected[start:stop] ) & mask[start:stop]
+
+      if wrong.any():
+        k    = int( np.flatnonzero( wrong )[0] )
+        r, c = divmod( k, nout )
+        raise RunTestVectorSimError(
+          "\nrun_test_vectors received an incorrect value!\n"
+          f"- row number     : {start+r+1}\n"
+          f"- port name      : {vectors.out_names[c]}\n"
+          f"- expected value : {int(expected[start+r,c])}\n"
+          f"- actual value   : {int(actual[r,c])}\n" )
+
+    # Extra ticks to make VCD easier to read
+
+    tick()
+    tick()
+    tick()
+
+  finally:
+    finalize_verilator( model )
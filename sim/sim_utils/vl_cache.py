@@ -0,0 +1,251 @@
+#=========================================================================
+# vl_cache
+#=========================================================================
+# A persistent, content-addressed cache for Verilator-imported models.
+#
+# The PyMTL Verilator import pass already skips re-verilating a model if
+# the verilated artifacts are sitting in the current working directory,
+# but every fresh build directory (or every shard of run-tests) starts
+# from scratch. VlCache keeps the verilated artifacts in a shared
+# directory instead, keyed by a hash of the translated Verilog, the
+# model parameters (e.g., nbits, p_nstages), the import configuration,
+# and the versions of the tools. CachedVerilogVerilatorImportPass looks
+# in this cache before verilating a model and copies the artifacts into
+# the working directory on a hit, or adds the artifacts to the cache
+# after building them on a miss. The cache is evicted in least recently
+# used order once its total size exceeds max_size bytes.
+#
+# Use enable_vl_cache to make config_model_with_cmdline_opts (and hence
+# run_sim, run_test_vector_sim, sort-sim, and gcd-sim) use the cache.
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from pymtl3.passes.backends.verilog import (
+  VerilogTranslationImportPass,
+  VerilogVerilatorImportPass,
+)
+
+#-------------------------------------------------------------------------
+# Defaults
+#-------------------------------------------------------------------------
+# The cache directory and size can be set with the PYMTL_VL_CACHE_DIR
+# and PYMTL_VL_CACHE_SIZE (in MB) environment variables.
+
+default_cache_dir = os.path.join( os.path.expanduser("~"), ".cache", "pymtl-vl-cache" )
+default_max_size  = 2 * 1024**3
+
+#-------------------------------------------------------------------------
+# get_tool_versions
+#-------------------------------------------------------------------------
+# Returns a dict with the versions of the tools involved in building a
+# verilated model. We only query the tools once per process.
+
+_tool_versions = None
+
+def pymtl3_version():
+  try:
+    from importlib.metadata import version
+    return version( "pymtl3" )
+  except Exception:
+    return None
+
+def get_tool_versions():
+  global _tool_versions
+
+  if _tool_versions is None:
+    def version( cmd ):
+      try:
+        return subprocess.check_output( cmd, stderr=subprocess.STDOUT,
+                                        universal_newlines=True ).strip()
+      except ( OSError, subprocess.CalledProcessError ):
+        return None
+
+    _tool_versions = {
+      'pymtl3'    : pymtl3_version(),
+      'python'    : sys.version,
+      'verilator' : version([ 'verilator', '--version' ]),
+      'cxx'       : version([ os.environ.get( 'CXX', 'g++' ), '--version' ]),
+    }
+
+  return _tool_versions
+
+#-------------------------------------------------------------------------
+# VlCache
+#-------------------------------------------------------------------------
+
+class VlCache:
+
+  def __init__( s, cache_dir=None, max_size=None ):
+    s.cache_dir = cache_dir or default_cache_dir
+    s.max_size  = max_size  or default_max_size
+    os.makedirs( s.cache_dir, exist_ok=True )
+
+  # Returns the key for a dict of everything that affects the artifacts
+
+  @staticmethod
+  def mk_key( key_dict ):
+    string = json.dumps( key_dict, sort_keys=True, default=str )
+    return hashlib.blake2b( string.encode('utf-8'), digest_size=20 ).hexdigest()
+
+  def entry_path( s, key ):
+    return os.path.join( s.cache_dir, key )
+
+  def contains( s, key ):
+    return os.path.isdir( s.entry_path( key ) )
+
+  # Copies the cached files for key into dest_dir and marks the entry as
+  # recently used. Returns False if the key is not in the cache.
+
+  def restore( s, key, dest_dir="." ):
+    entry = s.entry_path( key )
+    if not os.path.isdir( entry ):
+      return False
+
+    for name in os.listdir( entry ):
+      src  = os.path.join( entry,    name )
+      dest = os.path.join( dest_dir, name )
+      if os.path.isdir( src ):
+        shutil.rmtree( dest, ignore_errors=True )
+        shutil.copytree( src, dest )
+      else:
+        shutil.copy2( src, dest )
+
+    os.utime( entry )
+    return True
+
+  # Copies the given files/directories (relative to src_dir) into the
+  # cache under key. We first copy everything into a temporary directory
+  # and then rename it so that concurrent processes never see a partial
+  # entry.
+
+  def store( s, key, names, src_dir="." ):
+    entry = s.entry_path( key )
+    if os.path.isdir( entry ):
+      return
+
+    tmp = f"{entry}.tmp-{os.getpid()}"
+    shutil.rmtree( tmp, ignore_errors=True )
+    os.makedirs( tmp )
+
+    for name in names:
+      src = os.path.join( src_dir, name )
+      if os.path.isdir( src ):
+        shutil.copytree( src, os.path.join( tmp, name ) )
+      elif os.path.exists( src ):
+        shutil.copy2( src, os.path.join( tmp, name ) )
+
+    try:
+      os.rename( tmp, entry )
+    except OSError:
+      # Another process stored the same entry first
+      shutil.rmtree( tmp, ignore_errors=True )
+
+    s.evict()
+
+  # Returns a list of ( last_used, size, key ) for every entry
+
+  def entries( s ):
+    ret = []
+    for key in os.listdir( s.cache_dir ):
+      entry = s.entry_path( key )
+      if ".tmp-" in key or not os.path.isdir( entry ):
+        continue
+      size = 0
+      for dirpath, _, filenames in os.walk( entry ):
+        size += sum( os.path.getsize( os.path.join( dirpath, f ) )
+                     for f in filenames )
+      ret.append( ( os.path.getmtime( entry ), size, key ) )
+    return ret
+
+  def size( s ):
+    return sum( size for _, size, _ in s.entries() )
+
+  # Removes the least recently used entries until the total size of the
+  # cache is at most max_size
+
+  def evict( s ):
+    entries = sorted( s.entries() )
+    total   = sum( size for _, size, _ in entries )
+    for _, size, key in entries:
+      if total <= s.max_size:
+        break
+      shutil.rmtree( s.entry_path( key ), ignore_errors=True )
+      total -= size
+
+#-------------------------------------------------------------------------
+# CachedVerilogVerilatorImportPass
+#-------------------------------------------------------------------------
+
+class CachedVerilogVerilatorImportPass( VerilogVerilatorImportPass ):
+
+  # Set by enable_vl_cache
+
+  cache = None
+
+  def get_cache_key( s, m, ip_cfg, cfg ):
+    return VlCache.mk_key({
+      'top_module'   : ip_cfg.translated_top_module,
+      'verilog_hash' : ip_cfg.verilog_hash,
+      'params'       : sorted( ( str(k), str(v) ) for k, v in ip_cfg.params.items() ),
+      'config'       : cfg,
+      'tools'        : get_tool_versions(),
+    })
+
+  def get_artifacts( s, ip_cfg ):
+    return [ ip_cfg.vl_mk_dir, ip_cfg.get_c_wrapper_path(),
+             ip_cfg.get_py_wrapper_path(), ip_cfg.get_shared_lib_path() ]
+
+  def is_cached( s, m, ip_cfg ):
+    cached, config_file, cfg = super().is_cached( m, ip_cfg )
+
+    cache   = s.__class__.cache
+    m._vl_cache_key = key = s.get_cache_key( m, ip_cfg, cfg )
+
+    if not cached and cache is not None and cache.restore( key ):
+      ip_cfg.vprint(f"Restored {ip_cfg.translated_top_module} from {cache.cache_dir}", 2)
+      cached = True
+
+    return cached, config_file, cfg
+
+  def get_imported_object( s, m ):
+    imp = super().get_imported_object( m )
+
+    cache = s.__class__.cache
+    if cache is not None and not cache.contains( m._vl_cache_key ):
+      cache.store( m._vl_cache_key, s.get_artifacts( imp._ip_cfg ) )
+
+    return imp
+
+#-------------------------------------------------------------------------
+# CachedVerilogTranslationImportPass
+#-------------------------------------------------------------------------
+
+class CachedVerilogTranslationImportPass( VerilogTranslationImportPass ):
+
+  @staticmethod
+  def get_import_pass():
+    return CachedVerilogVerilatorImportPass
+
+#-------------------------------------------------------------------------
+# enable_vl_cache
+#-------------------------------------------------------------------------
+# Makes config_model_with_cmdline_opts translate and import models
+# through the cache. Returns the VlCache.
+
+def enable_vl_cache( cache_dir=None, max_size=None ):
+  from pymtl3.stdlib.test_utils import test_helpers
+
+  if cache_dir is None:
+    cache_dir = os.environ.get( "PYMTL_VL_CACHE_DIR" )
+  if max_size is None and "PYMTL_VL_CACHE_SIZE" in os.environ:
+    max_size = int( os.environ["PYMTL_VL_CACHE_SIZE"] ) * 1024**2
+
+  cache = VlCache( cache_dir, max_size )
+  CachedVerilogVerilatorImportPass.cache = cache
+  test_helpers.VerilogTranslationImportPass = CachedVerilogTranslationImportPass
+  return cache
@@ -7,14 +7,22 @@ from pymtl3.stdlib import stream
 
 from .GcdUnitMsg import GcdUnitMsgs
 
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
 #-------------------------------------------------------------------------
-# gcd
+# gcd_cl_step
 #-------------------------------------------------------------------------
 # Helper function that uses Euclid's algorithm to calculate the greatest
 # common denomiator, but also to estimate the number of cycles a simple
-# FSM-based GCD unit might take.
+# FSM-based GCD unit might take. This version steps through the swap and
+# subtract iterations one at a time exactly like the FSM, so it is slow
+# for operands with a large ratio (e.g., 0xffff and 1). It serves as the
+# reference for the faster gcd_cl below.
 
-def gcd_cl( a, b ):
+def gcd_cl_step( a, b ):
   ncycles = 0
   while True:
     ncycles += 1
@@ -25,6 +33,116 @@ def gcd_cl( a, b ):
     else:
       return (a,ncycles)
 
+#-------------------------------------------------------------------------
+# gcd_cl
+#-------------------------------------------------------------------------
+# Returns the same (result, ncycles) pair as gcd_cl_step without stepping
+# through each subtraction. Once a >= b the FSM subtracts b exactly a//b
+# times before a becomes less than b and the next cycle does a swap, so
+# we can use divmod to account for a whole run of subtractions plus the
+# following swap at once. This takes a number of iterations proportional
+# to the number of digits in the operands instead of their magnitude. If
+# a table from mk_gcd_cl_table is given and both operands fit in the
+# table, we simply look up the answer.
+
+def gcd_cl( a, b, table=None ):
+  a, b = int(a), int(b)
+
+  if table is not None and a < len(table) and b < len(table):
+    return table[a][b]
+
+  ncycles = 1
+  if a < b:
+    a, b = b, a
+    ncycles += 1
+
+  while b != 0:
+    q, r = divmod( a, b )
+    a, b = b, r
+    ncycles += q + 1
+
+  return (a,ncycles)
+
+#-------------------------------------------------------------------------
+# mk_gcd_cl_table
+#-------------------------------------------------------------------------
+# Precomputes gcd_cl for every pair of nbits-wide operands. The result is
+# a list of lists such that table[a][b] == gcd_cl(a,b). An 8-bit table
+# has 64K entries and takes a fraction of a second to build.
+
+def mk_gcd_cl_table( nbits=8 ):
+  n = 1 << nbits
+  return [ [ gcd_cl( a, b ) for b in range(n) ] for a in range(n) ]
+
+#-------------------------------------------------------------------------
+# gcd_cl_batch
+#-------------------------------------------------------------------------
+# Computes gcd_cl for a whole array of requests in a single call. The
+# requests can be an (N,2) array, a list of (a,b) pairs, or a list of
+# GcdUnitReqMsg. With NumPy we run the same quotient-based algorithm as
+# gcd_cl on all of the requests at once, masking off the requests which
+# have already finished, and return an (N,2) array where each row is the
+# (result, ncycles) pair. Without NumPy (or if use_numpy is False) we
+# call gcd_cl on each request and return a list of tuples, optionally
+# using a table from mk_gcd_cl_table.
+
+def gcd_cl_batch( reqs, table=None, use_numpy=True ):
+
+  reqs = [ (int(req.a),int(req.b)) if hasattr( req, 'a' ) else req
+           for req in reqs ]
+
+  if np is None or not use_numpy:
+    return [ gcd_cl( a, b, table ) for a, b in reqs ]
+
+  ops = np.array( reqs, dtype=np.int64 ).reshape( -1, 2 )
+  a   = np.maximum( ops[:,0], ops[:,1] )
+  b   = np.minimum( ops[:,0], ops[:,1] )
+
+  ncycles = 1 + ( ops[:,0] < ops[:,1] ).astype( np.int64 )
+
+  m = b != 0
+  while m.any():
+    q, r = np.divmod( a[m], b[m] )
+    ncycles[m] += q + 1
+    a[m], b[m] = b[m], r
+    m = b != 0
+
+  return np.stack( [ a, ncycles ], axis=1 )
+
+#-------------------------------------------------------------------------
+# gcd_stein_cl
+#-------------------------------------------------------------------------
+# Uses Stein's binary GCD algorithm to calculate the greatest common
+# denominator and to estimate the number of cycles the GcdUnitRTL takes
+# with algo="stein". Every cycle either shifts out a factor of two or
+# replaces the larger of two odd operands with half of their difference,
+# and the last cycle notices that one of the operands is zero.
+
+def gcd_stein_cl( a, b ):
+  a, b = int(a), int(b)
+
+  ncycles = 1
+  k = 0
+  while a != 0 and b != 0:
+    ncycles += 1
+    if not a & 1 and not b & 1:
+      a, b, k = a >> 1, b >> 1, k + 1
+    elif not a & 1:
+      a = a >> 1
+    elif not b & 1:
+      b = b >> 1
+    elif a < b:
+      b = ( b - a ) >> 1
+    else:
+      a = ( a - b ) >> 1
+
+  return ((a|b) << k,ncycles)
+
+gcd_cl_algos = {
+  'euclid' : gcd_cl,
+  'stein'  : gcd_stein_cl,
+}
+
 #-------------------------------------------------------------------------
 # GcdUnitCL
 #-------------------------------------------------------------------------
@@ -33,7 +151,13 @@ class GcdUnitCL( Component ):
 
   # Constructor
 
-  def construct( s ):
+  def construct( s, algo="euclid" ):
+
+    if algo not in gcd_cl_algos:
+      raise ValueError( f"unknown GCD algorithm {algo!r}, expected one of "
+                        f"{sorted(gcd_cl_algos)}" )
+
+    gcd_algo_cl = gcd_cl_algos[ algo ]
 
     # Interface
 
@@ -68,7 +192,7 @@ class GcdUnitCL( Component ):
 
       elif s.req_q.deq.rdy():
         msg = s.req_q.deq()
-        s.result, s.counter = gcd_cl(msg.a, msg.b)
+        s.result, s.counter = gcd_algo_cl(msg.a, msg.b)
 
   # Line tracing
 
@@ -0,0 +1,65 @@
+#=========================================================================
+# GcdUnitInputs
+#=========================================================================
+# Lazily generates the input datasets used by gcd-sim. Each request and
+# its expected response are only created when the simulator asks for
+# them, so the memory usage does not depend on the number of inputs. We
+# use a private random number generator with a fixed seed so a given
+# pattern, ninputs, and seed always produce the same sequence of
+# requests.
+
+import random
+
+from math import gcd
+
+from pymtl3 import *
+
+from .GcdUnitMsg import GcdUnitMsgs
+
+patterns = [ 'random', 'small', 'zeros' ]
+
+#-------------------------------------------------------------------------
+# gen_gcd_inputs
+#-------------------------------------------------------------------------
+# Returns an iterator over ninputs (request, response) pairs. The
+# expected response is computed by golden(a,b) as each request is
+# generated, so a different reference model can be plugged in.
+
+def gen_gcd_inputs( pattern, ninputs, seed=0xdeadbeef, golden=gcd ):
+
+  if pattern not in patterns:
+    raise ValueError( f"unknown input pattern {pattern}" )
+
+  def gen():
+    rng = random.Random( seed )
+
+    for i in range(ninputs):
+
+      if pattern == 'random':
+        a = b16( rng.randint(0,0xffff) )
+        b = b16( rng.randint(0,0xffff) )
+
+      elif pattern == 'small':
+        a = b16( rng.randint(0,0xff)    )
+        b = b16( a * rng.randint(0,0xf) )
+
+      elif pattern == 'zeros':
+        a = b16(0)
+        b = b16(0)
+
+      yield GcdUnitMsgs.req( a, b ), GcdUnitMsgs.resp( golden( a, b ) )
+
+  return gen()
+
+#-------------------------------------------------------------------------
+# gen_gcd_reqs/gen_gcd_resps
+#-------------------------------------------------------------------------
+# Return just the requests or just the expected responses. Calling both
+# with the same arguments gives two independent iterators which stay in
+# lock step, which is what we need for the source and sink.
+
+def gen_gcd_reqs( pattern, ninputs, seed=0xdeadbeef ):
+  return ( req for req, _ in gen_gcd_inputs( pattern, ninputs, seed ) )
+
+def gen_gcd_resps( pattern, ninputs, seed=0xdeadbeef, golden=gcd ):
+  return ( resp for _, resp in gen_gcd_inputs( pattern, ninputs, seed, golden ) )
@@ -0,0 +1,85 @@
+#=========================================================================
+# GCD Unit Multi CL Model
+#=========================================================================
+# Models the cycle-approximate timing behavior of GcdUnitMultiRTL. Each
+# of the nunits units takes as many cycles as gcd_cl estimates for its
+# request, and responses leave through an nunits-entry reorder buffer in
+# request order.
+
+from pymtl3      import *
+from pymtl3.stdlib import stream
+
+from .GcdUnitCL  import gcd_cl
+from .GcdUnitMsg import GcdUnitMsgs
+
+class GcdUnitMultiCL( Component ):
+
+  # Constructor
+
+  def construct( s, nunits=2, table=None ):
+
+    # Interface
+
+    s.recv = stream.ifcs.RecvIfcRTL(GcdUnitMsgs.req)
+    s.send = stream.ifcs.SendIfcRTL(GcdUnitMsgs.resp)
+
+    # Queues
+
+    s.req_q  = stream.RecvQueueAdapter(GcdUnitMsgs.req) # gives a deq method to call
+    s.resp_q = stream.SendQueueAdapter(GcdUnitMsgs.resp) # gives a send method to call
+
+    s.recv //= s.req_q.recv
+    s.send //= s.resp_q.send
+
+    # Member variables. Each unit is a [ result, counter, tag ] list
+    # where result is None if the unit is idle, and each reorder buffer
+    # entry is the result or None if it has not arrived yet.
+
+    s.units     = [ [ None, 0, 0 ] for _ in range(nunits) ]
+    s.rob       = [ None ] * nunits
+    s.rob_busy  = [ False ] * nunits
+    s.alloc_ptr = 0
+    s.head_ptr  = 0
+
+    # CL block
+
+    @update_once
+    def block():
+
+      # Send the response at the head of the reorder buffer
+
+      if s.rob[s.head_ptr] is not None and s.resp_q.enq.rdy():
+        s.resp_q.enq( s.rob[s.head_ptr] )
+        s.rob[s.head_ptr]      = None
+        s.rob_busy[s.head_ptr] = False
+        s.head_ptr = ( s.head_ptr + 1 ) % nunits
+
+      # Handle delay to model the latency of each unit
+
+      for unit in s.units:
+        if unit[0] is not None:
+          if unit[1] > 0:
+            unit[1] -= 1
+          else:
+            s.rob[unit[2]] = unit[0]
+            unit[0] = None
+
+      # Dispatch a new request to an idle unit
+
+      if not s.rob_busy[s.alloc_ptr] and s.req_q.deq.rdy():
+        for unit in s.units:
+          if unit[0] is None:
+            msg = s.req_q.deq()
+            unit[0], unit[1] = gcd_cl( msg.a, msg.b, table )
+            unit[2] = s.alloc_ptr
+            s.rob_busy[s.alloc_ptr] = True
+            s.alloc_ptr = ( s.alloc_ptr + 1 ) % nunits
+            break
+
+  # Line tracing
+
+  def line_trace( s ):
+    units_str = "".join( "." if unit[0] is None else "C" for unit in s.units )
+    rob_str   = "".join( "v" if s.rob[i] is not None else ( "*" if s.rob_busy[i] else "." )
+                         for i in range(len(s.rob)) )
+    return f"{s.recv}({units_str}|{rob_str}){s.send}"
@@ -0,0 +1,148 @@
+#=========================================================================
+# GCD Unit Multi RTL Model
+#=========================================================================
+# A GCD engine with nunits replicated GcdUnitRTL units (each a
+# GcdUnitDpathRTL/GcdUnitCtrlRTL pair) so that up to nunits requests can
+# be in flight at once. The dispatcher sends each request to an idle
+# unit and allocates the next entry of an nunits-entry reorder buffer
+# for it. When a unit finishes, its result is written into the reorder
+# buffer entry allocated for the request, and responses are sent from
+# the head of the reorder buffer in request order, so the engine has the
+# same in-order stream interface as GcdUnitRTL.
+
+from pymtl3 import *
+from pymtl3.stdlib import stream
+
+from .GcdUnitMsg import GcdUnitMsgs
+from .GcdUnitRTL import GcdUnitRTL
+
+class GcdUnitMultiRTL( Component ):
+
+  # Constructor
+
+  def construct( s, nunits=2 ):
+
+    #---------------------------------------------------------------------
+    # Interface
+    #---------------------------------------------------------------------
+
+    s.recv = stream.ifcs.RecvIfcRTL( GcdUnitMsgs.req )
+    s.send = stream.ifcs.SendIfcRTL( GcdUnitMsgs.resp )
+
+    nbits = max( 1, clog2(nunits) )
+    last  = nunits - 1
+
+    #---------------------------------------------------------------------
+    # GCD units
+    #---------------------------------------------------------------------
+
+    s.units = [ GcdUnitRTL() for _ in range(nunits) ]
+
+    for unit in s.units:
+      unit.recv.msg //= s.recv.msg
+
+    #---------------------------------------------------------------------
+    # Reorder buffer
+    #---------------------------------------------------------------------
+    # rob_busy is set when an entry is allocated and cleared when its
+    # response is sent, rob_val is set once the result has arrived. Each
+    # unit remembers which entry its current request was allocated.
+
+    s.rob_busy = [ Wire()           for _ in range(nunits) ]
+    s.rob_val  = [ Wire()           for _ in range(nunits) ]
+    s.rob_data = [ Wire(16)         for _ in range(nunits) ]
+    s.unit_tag = [ Wire(nbits)      for _ in range(nunits) ]
+
+    s.alloc_ptr = Wire(nbits)
+    s.head_ptr  = Wire(nbits)
+
+    #---------------------------------------------------------------------
+    # Dispatch logic
+    #---------------------------------------------------------------------
+
+    s.disp_sel = Wire(nbits)
+    s.any_idle = Wire()
+
+    @update
+    def dispatch_comb():
+
+      # Pick an idle unit
+
+      s.any_idle @= 0
+      s.disp_sel @= 0
+      for u in range(nunits):
+        if s.units[u].recv.rdy:
+          s.any_idle @= 1
+          s.disp_sel @= u
+
+      s.recv.rdy @= s.any_idle & ~s.rob_busy[s.alloc_ptr]
+
+      for u in range(nunits):
+        s.units[u].recv.val @= s.recv.val & s.recv.rdy & ( s.disp_sel == u )
+
+        # The reorder buffer always has room for a finished result
+
+        s.units[u].send.rdy @= 1
+
+    #---------------------------------------------------------------------
+    # Response logic
+    #---------------------------------------------------------------------
+
+    @update
+    def response_comb():
+      s.send.val @= s.rob_val [s.head_ptr]
+      s.send.msg @= s.rob_data[s.head_ptr]
+
+    #---------------------------------------------------------------------
+    # Reorder buffer update
+    #---------------------------------------------------------------------
+
+    @update_ff
+    def rob_seq():
+
+      if s.reset:
+        s.alloc_ptr <<= 0
+        s.head_ptr  <<= 0
+        for i in range(nunits):
+          s.rob_busy[i] <<= 0
+          s.rob_val[i]  <<= 0
+
+      else:
+
+        # Allocate an entry for a dispatched request
+
+        if s.recv.val & s.recv.rdy:
+          s.unit_tag[s.disp_sel]  <<= s.alloc_ptr
+          s.rob_busy[s.alloc_ptr] <<= 1
+          s.alloc_ptr <<= 0 if s.alloc_ptr == last else s.alloc_ptr + 1
+
+        # Write back finished results
+
+        for u in range(nunits):
+          if s.units[u].send.val:
+            s.rob_val [s.unit_tag[u]] <<= 1
+            s.rob_data[s.unit_tag[u]] <<= s.units[u].send.msg
+
+        # Free the head entry once its response is sent
+
+        if s.send.val & s.send.rdy:
+          s.rob_busy[s.head_ptr] <<= 0
+          s.rob_val [s.head_ptr] <<= 0
+          s.head_ptr <<= 0 if s.head_ptr == last else s.head_ptr + 1
+
+  # Line tracing
+
+  def line_trace( s ):
+
+    def unit_str( unit ):
+      state = unit.ctrl.state
+      if state == unit.ctrl.STATE_IDLE: return "I"
+      if state == unit.ctrl.STATE_CALC: return "C"
+      if state == unit.ctrl.STATE_DONE: return "D"
+      return "?"
+
+    units_str = "".join( unit_str( unit ) for unit in s.units )
+    rob_str   = "".join( "v" if s.rob_val[i] else ( "*" if s.rob_busy[i] else "." )
+                         for i in range(len(s.rob_val)) )
+
+    return f"{s.recv}({units_str}|{rob_str}){s.send}"
@@ -1,10 +1,15 @@
 #=========================================================================
 # GCD Unit RTL Model
 #=========================================================================
+# GcdUnitRTL uses Euclid's algorithm by default, which does one swap or
+# one subtraction per cycle. With algo="stein" it instead uses Stein's
+# binary GCD algorithm, which removes at least one bit from one of the
+# operands every cycle, so a 16-bit GCD takes at most a few dozen cycles
+# instead of up to tens of thousands.
 
 from pymtl3 import *
 from pymtl3.stdlib import stream
-from pymtl3.stdlib.basic_rtl  import Mux, RegEn, RegRst
+from pymtl3.stdlib.basic_rtl  import Mux, RegEn, RegRst, Incrementer
 from pymtl3.stdlib.basic_rtl  import LTComparator, ZeroComparator, Subtractor
 
 from .GcdUnitMsg  import GcdUnitMsgs
@@ -24,6 +29,16 @@ B_MUX_SEL_A     = 0
 B_MUX_SEL_IN    = 1
 B_MUX_SEL_X     = 0
 
+STEIN_MUX_SEL_NBITS = 2
+STEIN_MUX_SEL_IN    = 0
+STEIN_MUX_SEL_SHR   = 1
+STEIN_MUX_SEL_SUB   = 2
+STEIN_MUX_SEL_X     = 0
+
+K_MUX_SEL_ZERO  = 0
+K_MUX_SEL_INC   = 1
+K_MUX_SEL_X     = 0
+
 #=========================================================================
 # GCD Unit RTL Datapath
 #=========================================================================
@@ -231,6 +246,306 @@ class GcdUnitCtrlRTL(Component):
         s.b_mux_sel @= B_MUX_SEL_X
         s.b_reg_en  @= 0
 
+#=========================================================================
+# GCD Unit Stein RTL Datapath
+#=========================================================================
+# Registers for the two operands and for k, the number of factors of two
+# the operands have in common. Each operand can be loaded from the
+# request, shifted right by one, or replaced by the difference of the
+# operands shifted right by one (the difference of two odd numbers is
+# even). Once one of the operands is zero the other one shifted left by
+# k is the GCD.
+
+class GcdUnitSteinDpathRTL(Component):
+
+  # Constructor
+
+  def construct( s ):
+
+    #---------------------------------------------------------------------
+    # Interface
+    #---------------------------------------------------------------------
+
+    s.req_msg_a = InPort (16)
+    s.req_msg_b = InPort (16)
+    s.resp_msg  = OutPort(16)
+
+    # Control signals (ctrl -> dpath)
+
+    s.a_mux_sel = InPort( STEIN_MUX_SEL_NBITS )
+    s.a_reg_en  = InPort()
+    s.b_mux_sel = InPort( STEIN_MUX_SEL_NBITS )
+    s.b_reg_en  = InPort()
+    s.k_mux_sel = InPort()
+    s.k_reg_en  = InPort()
+
+    # Status signals (dpath -> ctrl)
+
+    s.is_a_zero = OutPort()
+    s.is_b_zero = OutPort()
+    s.is_a_odd  = OutPort()
+    s.is_b_odd  = OutPort()
+    s.is_a_lt_b = OutPort()
+
+    #---------------------------------------------------------------------
+    # Structural composition
+    #---------------------------------------------------------------------
+
+    s.a_shr     = Wire(16)
+    s.b_shr     = Wire(16)
+    s.a_sub_shr = Wire(16)
+    s.b_sub_shr = Wire(16)
+
+    # A mux
+
+    s.a_mux = m = Mux( Bits16, 3 )
+    m.sel //= s.a_mux_sel
+    m.in_[STEIN_MUX_SEL_IN ] //= s.req_msg_a
+    m.in_[STEIN_MUX_SEL_SHR] //= s.a_shr
+    m.in_[STEIN_MUX_SEL_SUB] //= s.a_sub_shr
+
+    # A register
+
+    s.a_reg = m = RegEn(Bits16)
+    m.en  //= s.a_reg_en
+    m.in_ //= s.a_mux.out
+
+    # B mux
+
+    s.b_mux = m = Mux( Bits16, 3 )
+    m.sel //= s.b_mux_sel
+    m.in_[STEIN_MUX_SEL_IN ] //= s.req_msg_b
+    m.in_[STEIN_MUX_SEL_SHR] //= s.b_shr
+    m.in_[STEIN_MUX_SEL_SUB] //= s.b_sub_shr
+
+    # B register
+
+    s.b_reg = m = RegEn(Bits16)
+    m.en  //= s.b_reg_en
+    m.in_ //= s.b_mux.out
+
+    # K incrementer
+
+    s.k_inc = m = Incrementer(Bits4)
+
+    # K mux
+
+    s.k_mux = m = Mux( Bits4, 2 )
+    m.sel //= s.k_mux_sel
+    m.in_[K_MUX_SEL_ZERO] //= 0
+    m.in_[K_MUX_SEL_INC ] //= s.k_inc.out
+
+    # K register
+
+    s.k_reg = m = RegEn(Bits4)
+    m.en  //= s.k_reg_en
+    m.in_ //= s.k_mux.out
+    m.out //= s.k_inc.in_
+
+    # Subtractors, only the one which does not underflow is used
+
+    s.a_sub = m = Subtractor(Bits16)
+    m.in0 //= s.a_reg.out
+    m.in1 //= s.b_reg.out
+
+    s.b_sub = m = Subtractor(Bits16)
+    m.in0 //= s.b_reg.out
+    m.in1 //= s.a_reg.out
+
+    # Shift right by one is just wiring
+
+    s.a_shr[0:15]     //= s.a_reg.out[1:16]
+    s.a_shr[15]       //= 0
+    s.b_shr[0:15]     //= s.b_reg.out[1:16]
+    s.b_shr[15]       //= 0
+    s.a_sub_shr[0:15] //= s.a_sub.out[1:16]
+    s.a_sub_shr[15]   //= 0
+    s.b_sub_shr[0:15] //= s.b_sub.out[1:16]
+    s.b_sub_shr[15]   //= 0
+
+    # Zero compares
+
+    s.a_zero = m = ZeroComparator(Bits16)
+    m.in_ //= s.a_reg.out
+    m.out //= s.is_a_zero
+
+    s.b_zero = m = ZeroComparator(Bits16)
+    m.in_ //= s.b_reg.out
+    m.out //= s.is_b_zero
+
+    # Less-than comparator
+
+    s.a_lt_b = m = LTComparator(Bits16)
+    m.in0 //= s.a_reg.out
+    m.in1 //= s.b_reg.out
+    m.out //= s.is_a_lt_b
+
+    # Odd bits
+
+    s.is_a_odd //= s.a_reg.out[0]
+    s.is_b_odd //= s.b_reg.out[0]
+
+    # One of the operands is zero when we are done, so or-ing them
+    # together selects the other one
+
+    @update
+    def up_resp_msg():
+      s.resp_msg @= ( s.a_reg.out | s.b_reg.out ) << zext( s.k_reg.out, 16 )
+
+#=========================================================================
+# GCD Unit Stein RTL Control
+#=========================================================================
+
+class GcdUnitSteinCtrlRTL(Component):
+
+  def construct( s ):
+
+    #---------------------------------------------------------------------
+    # Interface
+    #---------------------------------------------------------------------
+
+    s.req_val   = InPort ()
+    s.req_rdy   = OutPort()
+
+    s.resp_val  = OutPort()
+    s.resp_rdy  = InPort ()
+
+    # Control signals (ctrl -> dpath)
+
+    s.a_mux_sel = OutPort( STEIN_MUX_SEL_NBITS )
+    s.a_reg_en  = OutPort()
+    s.b_mux_sel = OutPort( STEIN_MUX_SEL_NBITS )
+    s.b_reg_en  = OutPort()
+    s.k_mux_sel = OutPort()
+    s.k_reg_en  = OutPort()
+
+    # Status signals (dpath -> ctrl)
+
+    s.is_a_zero = InPort()
+    s.is_b_zero = InPort()
+    s.is_a_odd  = InPort()
+    s.is_b_odd  = InPort()
+    s.is_a_lt_b = InPort()
+
+    # State element
+
+    s.STATE_IDLE = 0
+    s.STATE_CALC = 1
+    s.STATE_DONE = 2
+
+    s.state = Wire(2)
+
+    #---------------------------------------------------------------------
+    # State Transition Logic
+    #---------------------------------------------------------------------
+
+    @update_ff
+    def state_transitions():
+      if s.reset:
+        s.state <<= s.STATE_IDLE
+
+      # Transistions out of IDLE state
+
+      if s.state == s.STATE_IDLE:
+        if s.req_val:
+          s.state <<= s.STATE_CALC
+
+      # Transistions out of CALC state
+
+      if s.state == s.STATE_CALC:
+        if s.is_a_zero | s.is_b_zero:
+          s.state <<= s.STATE_DONE
+
+      # Transistions out of DONE state
+
+      if s.state == s.STATE_DONE:
+        if s.resp_rdy:
+          s.state <<= s.STATE_IDLE
+
+    #---------------------------------------------------------------------
+    # State Output Logic
+    #---------------------------------------------------------------------
+
+    s.do_shift = Wire()
+    s.do_sub   = Wire()
+
+    @update
+    def state_outputs():
+
+      s.do_shift  @= 0
+      s.do_sub    @= 0
+      s.req_rdy   @= 0
+      s.resp_val  @= 0
+      s.a_mux_sel @= 0
+      s.a_reg_en  @= 0
+      s.b_mux_sel @= 0
+      s.b_reg_en  @= 0
+      s.k_mux_sel @= 0
+      s.k_reg_en  @= 0
+
+      # In IDLE state we simply wait for inputs to arrive and latch them
+
+      if s.state == s.STATE_IDLE:
+        s.req_rdy   @= 1
+        s.resp_val  @= 0
+        s.a_mux_sel @= STEIN_MUX_SEL_IN
+        s.a_reg_en  @= 1
+        s.b_mux_sel @= STEIN_MUX_SEL_IN
+        s.b_reg_en  @= 1
+        s.k_mux_sel @= K_MUX_SEL_ZERO
+        s.k_reg_en  @= 1
+
+      # In CALC state we shift out even factors and subtract odd operands
+
+      elif s.state == s.STATE_CALC:
+
+        if ~s.is_a_zero & ~s.is_b_zero:
+
+          s.do_shift @= ~s.is_a_odd | ~s.is_b_odd
+          s.do_sub   @= s.is_a_odd & s.is_b_odd
+
+          # Both even: shift both and count a common factor of two
+
+          if ~s.is_a_odd & ~s.is_b_odd:
+            s.a_mux_sel @= STEIN_MUX_SEL_SHR
+            s.a_reg_en  @= 1
+            s.b_mux_sel @= STEIN_MUX_SEL_SHR
+            s.b_reg_en  @= 1
+            s.k_mux_sel @= K_MUX_SEL_INC
+            s.k_reg_en  @= 1
+
+          # One even: shift out a factor of two which is not common
+
+          elif ~s.is_a_odd:
+            s.a_mux_sel @= STEIN_MUX_SEL_SHR
+            s.a_reg_en  @= 1
+
+          elif ~s.is_b_odd:
+            s.b_mux_sel @= STEIN_MUX_SEL_SHR
+            s.b_reg_en  @= 1
+
+          # Both odd: replace the larger operand with the difference
+
+          elif s.is_a_lt_b:
+            s.b_mux_sel @= STEIN_MUX_SEL_SUB
+            s.b_reg_en  @= 1
+
+          else:
+            s.a_mux_sel @= STEIN_MUX_SEL_SUB
+            s.a_reg_en  @= 1
+
+      # In DONE state we simply wait for output transaction to occur
+
+      elif s.state == s.STATE_DONE:
+        s.req_rdy   @= 0
+        s.resp_val  @= 1
+        s.a_mux_sel @= STEIN_MUX_SEL_X
+        s.a_reg_en  @= 0
+        s.b_mux_sel @= STEIN_MUX_SEL_X
+        s.b_reg_en  @= 0
+        s.k_mux_sel @= K_MUX_SEL_X
+        s.k_reg_en  @= 0
+
 #=========================================================================
 # GCD Unit RTL Model
 #=========================================================================
@@ -239,7 +554,13 @@ class GcdUnitRTL( Component ):
 
   # Constructor
 
-  def construct( s ):
+  def construct( s, algo="euclid" ):
+
+    if algo not in [ "euclid", "stein" ]:
+      raise ValueError( f"unknown GCD algorithm {algo!r}, expected one of "
+                        f"['euclid', 'stein']" )
+
+    s.algo = algo
 
     # Interface
 
@@ -248,8 +569,12 @@ class GcdUnitRTL( Component ):
 
     # Instantiate datapath and control
 
-    s.dpath = GcdUnitDpathRTL()
-    s.ctrl  = GcdUnitCtrlRTL()
+    if algo == "stein":
+      s.dpath = GcdUnitSteinDpathRTL()
+      s.ctrl  = GcdUnitSteinCtrlRTL()
+    else:
+      s.dpath = GcdUnitDpathRTL()
+      s.ctrl  = GcdUnitCtrlRTL()
 
     s.dpath.req_msg_a //= s.recv.msg.a
     s.dpath.req_msg_b //= s.recv.msg.b
@@ -265,10 +590,21 @@ class GcdUnitRTL( Component ):
     s.ctrl.b_mux_sel //= s.dpath.b_mux_sel
     s.ctrl.b_reg_en  //= s.dpath.b_reg_en
 
+    if algo == "stein":
+      s.ctrl.k_mux_sel //= s.dpath.k_mux_sel
+      s.ctrl.k_reg_en  //= s.dpath.k_reg_en
+
     # Status signals (dpath -> ctrl)
 
-    s.ctrl.is_b_zero //= s.dpath.is_b_zero
-    s.ctrl.is_a_lt_b //= s.dpath.is_a_lt_b
+    if algo == "stein":
+      s.ctrl.is_a_zero //= s.dpath.is_a_zero
+      s.ctrl.is_b_zero //= s.dpath.is_b_zero
+      s.ctrl.is_a_odd  //= s.dpath.is_a_odd
+      s.ctrl.is_b_odd  //= s.dpath.is_b_odd
+      s.ctrl.is_a_lt_b //= s.dpath.is_a_lt_b
+    else:
+      s.ctrl.is_b_zero //= s.dpath.is_b_zero
+      s.ctrl.is_a_lt_b //= s.dpath.is_a_lt_b
 
   # Line tracing
 
@@ -278,7 +614,9 @@ class GcdUnitRTL( Component ):
     if s.ctrl.state == s.ctrl.STATE_IDLE:
       state_str = "I "
     if s.ctrl.state == s.ctrl.STATE_CALC:
-      if s.ctrl.do_swap:
+      if s.algo == "stein" and s.ctrl.do_shift:
+        state_str = "C>"
+      elif s.algo == "euclid" and s.ctrl.do_swap:
         state_str = "Cs"
       elif s.ctrl.do_sub:
         state_str = "C-"
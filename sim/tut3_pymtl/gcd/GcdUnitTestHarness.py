@@ -0,0 +1,112 @@
+#=========================================================================
+# GcdUnitTestHarness
+#=========================================================================
+# Connects a GCD unit to a test source and sink. The block tests and the
+# simulators share this harness, so it lives outside of the test code
+# and the simulators do not need to import pytest. A StreamMonitor on the
+# GCD unit's interfaces records the latency of every request and why the
+# unit stalls (see th.monitor.stats() after run_sim, run_soak, or
+# gcd-sim --stats).
+
+from math import gcd
+
+from pymtl3 import *
+from pymtl3.stdlib import stream
+from pymtl3.stdlib.test_utils import config_model_with_cmdline_opts
+from pymtl3.stdlib.test_utils.test_helpers import finalize_verilator
+
+from sim_utils.GenSourceRTL  import GenSourceRTL
+from sim_utils.GenSinkRTL    import GenSinkRTL
+from sim_utils.StreamMonitor import StreamMonitor
+
+from .GcdUnitMsg    import GcdUnitMsgs
+from .GcdUnitInputs import gen_gcd_reqs, gen_gcd_resps
+
+#-------------------------------------------------------------------------
+# TestHarness
+#-------------------------------------------------------------------------
+
+class TestHarness( Component ):
+
+  def construct( s, gcd, Source=stream.SourceRTL, Sink=stream.SinkRTL ):
+
+    # Instantiate models
+
+    s.src  = Source( GcdUnitMsgs.req )
+    s.sink = Sink( GcdUnitMsgs.resp )
+    s.gcd = gcd
+
+    s.monitor = StreamMonitor()
+
+    # Connect
+
+    s.src.send //= s.gcd.recv
+    s.gcd.send //= s.sink.recv
+
+    # The monitor taps each handshake signal where it is driven
+
+    s.monitor.recv_val //= s.src.send.val
+    s.monitor.recv_rdy //= s.gcd.recv.rdy
+    s.monitor.send_val //= s.gcd.send.val
+    s.monitor.send_rdy //= s.sink.recv.rdy
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+  def line_trace( s ):
+    return s.src.line_trace() + " > " + s.gcd.line_trace() + " > " + s.sink.line_trace()
+
+#-------------------------------------------------------------------------
+# mk_soak_harness
+#-------------------------------------------------------------------------
+# Returns a test harness which streams ninputs requests of the given
+# input pattern through the GCD unit. The source generates each request
+# when it is about to send it, and the sink checks each response against
+# golden(a,b) as it arrives, so nothing is stored and even a soak test
+# with millions of requests runs in constant memory. Every request is
+# followed by a random delay of up to max_src_delay cycles in the source
+# and up to max_sink_delay cycles in the sink. The requests and the
+# delays only depend on seed.
+
+def mk_soak_harness( gcd_unit, pattern, ninputs, max_src_delay=0,
+                     max_sink_delay=0, seed=0xdeadbeef, golden=gcd ):
+
+  th = TestHarness( gcd_unit, GenSourceRTL, GenSinkRTL )
+
+  th.set_param( "top.src.construct",
+    msgs=lambda: gen_gcd_reqs( pattern, ninputs, seed ),
+    max_random_delay=max_src_delay, seed=seed+1 )
+
+  th.set_param( "top.sink.construct",
+    msgs=lambda: gen_gcd_resps( pattern, ninputs, seed, golden ),
+    max_random_delay=max_sink_delay, seed=seed+2 )
+
+  return th
+
+#-------------------------------------------------------------------------
+# run_soak
+#-------------------------------------------------------------------------
+# Like run_sim, but without line tracing and without a cycle limit, so
+# it can run the long soak tests. If given, progress(th) is called every
+# interval cycles. Returns the number of cycles.
+
+def run_soak( th, cmdline_opts=None, duts=None, progress=None, interval=10000 ):
+
+  th = config_model_with_cmdline_opts( th, cmdline_opts or {}, duts )
+
+  try:
+    th.apply( DefaultPassGroup() )
+    th.sim_reset()
+
+    while not th.done():
+      for _ in range( interval ):
+        th.sim_tick()
+        if th.done():
+          break
+      if progress:
+        progress( th )
+
+  finally:
+    finalize_verilator( th )
+
+  return th.sim_cycle_count()
@@ -6,11 +6,15 @@ import pytest
 
 from pymtl3 import *
 from pymtl3.stdlib.test_utils import run_sim
-from ..GcdUnitCL import gcd_cl, GcdUnitCL
+from ..GcdUnitMsg import GcdUnitMsgs
+from ..GcdUnitCL import gcd_cl, gcd_cl_step, gcd_cl_batch, mk_gcd_cl_table, \
+                       gcd_stein_cl, GcdUnitCL
 
 # Reuse cases from FL tests
 
-from .GcdUnitFL_test import TestHarness, test_case_table
+from .GcdUnitFL_test import TestHarness, test_case_table, random_cases, \
+                           soak_case_table, mk_soak_harness, run_soak, \
+                           check_checkpoint
 
 #-------------------------------------------------------------------------
 # test_gcd_cl
@@ -28,14 +32,84 @@ def test_gcd_cl_calc():
   assert gcd_cl( 75, 45 ) == ( 15,    8       )
   assert gcd_cl( 36, 96 ) == ( 12,    10      )
 
+def test_gcd_cl_step_calc():
+  #                   a   b         result ncycles
+  assert gcd_cl_step( 0,  0  ) == ( 0,     1       )
+  assert gcd_cl_step( 1,  0  ) == ( 1,     1       )
+  assert gcd_cl_step( 0,  1  ) == ( 1,     2       )
+  assert gcd_cl_step( 5,  5  ) == ( 5,     3       )
+  assert gcd_cl_step( 15, 5  ) == ( 5,     5       )
+  assert gcd_cl_step( 5,  15 ) == ( 5,     6       )
+  assert gcd_cl_step( 7,  13 ) == ( 1,     13      )
+  assert gcd_cl_step( 75, 45 ) == ( 15,    8       )
+  assert gcd_cl_step( 36, 96 ) == ( 12,    10      )
+
+def test_gcd_cl_large_ratio():
+  assert gcd_cl( 0xffff, 1      ) == gcd_cl_step( 0xffff, 1      )
+  assert gcd_cl( 1,      0xffff ) == gcd_cl_step( 1,      0xffff )
+  assert gcd_cl( 0xffff, 0xfffe ) == gcd_cl_step( 0xffff, 0xfffe )
+
+def test_gcd_cl_exhaustive_6bit():
+  for a in range(64):
+    for b in range(64):
+      assert gcd_cl( a, b ) == gcd_cl_step( a, b )
+
+def test_gcd_cl_table():
+  table = mk_gcd_cl_table( 4 )
+  for a in range(16):
+    for b in range(16):
+      assert gcd_cl( a, b, table ) == gcd_cl_step( a, b )
+
+  # Operands which do not fit in the table fall back to the calculation
+
+  assert gcd_cl( 75, 45, table ) == ( 15, 8 )
+
+#-------------------------------------------------------------------------
+# test_gcd_stein_cl
+#-------------------------------------------------------------------------
+
+def test_gcd_stein_cl_calc():
+  #                    a       b         result ncycles
+  assert gcd_stein_cl( 0,      0      ) == ( 0,     1       )
+  assert gcd_stein_cl( 1,      0      ) == ( 1,     1       )
+  assert gcd_stein_cl( 0,      1      ) == ( 1,     1       )
+  assert gcd_stein_cl( 5,      5      ) == ( 5,     2       )
+  assert gcd_stein_cl( 15,     5      ) == ( 5,     3       )
+  assert gcd_stein_cl( 5,      15     ) == ( 5,     3       )
+  assert gcd_stein_cl( 7,      13     ) == ( 1,     6       )
+  assert gcd_stein_cl( 75,     45     ) == ( 15,    4       )
+  assert gcd_stein_cl( 36,     96     ) == ( 12,    8       )
+  assert gcd_stein_cl( 0xffff, 1      ) == ( 1,     17      )
+
+def test_gcd_stein_cl_exhaustive_6bit():
+  for a in range(64):
+    for b in range(64):
+      assert gcd_stein_cl( a, b )[0] == gcd_cl( a, b )[0]
+
+#-------------------------------------------------------------------------
+# test_gcd_cl_batch
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "use_numpy", [ True, False ] )
+def test_gcd_cl_batch( use_numpy ):
+  reqs = [ (a,b) for a, b, _ in random_cases ] + [ (0,0), (0xffff,1) ]
+  ref  = [ gcd_cl_step( a, b ) for a, b in reqs ]
+  assert [ tuple(x) for x in gcd_cl_batch( reqs, use_numpy=use_numpy ) ] == ref
+
+def test_gcd_cl_batch_msgs():
+  msgs = [ GcdUnitMsgs.req( a, b ) for a, b, _ in random_cases ]
+  ref  = [ gcd_cl_step( a, b ) for a, b, _ in random_cases ]
+  assert [ tuple(x) for x in gcd_cl_batch( msgs ) ] == ref
+
 #-------------------------------------------------------------------------
 # Test cases
 #-------------------------------------------------------------------------
 
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
 @pytest.mark.parametrize( **test_case_table )
-def test_gcd_cl( test_params ):
+def test_gcd_cl( test_params, algo ):
 
-  th = TestHarness( GcdUnitCL() )
+  th = TestHarness( GcdUnitCL( algo ) )
 
   th.set_param("top.src.construct",
     msgs=test_params.msgs[::2],
@@ -48,3 +122,17 @@ def test_gcd_cl( test_params ):
     interval_delay=test_params.sink_delay )
 
   run_sim( th )
+
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
+@pytest.mark.parametrize( **soak_case_table )
+def test_gcd_cl_soak( test_params, algo ):
+
+  th = mk_soak_harness( GcdUnitCL( algo ), test_params.pattern, test_params.ninputs,
+                        test_params.src_delay, test_params.sink_delay )
+
+  run_soak( th )
+  assert th.sink.nmsgs == test_params.ninputs
+
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
+def test_gcd_cl_checkpoint( algo, tmp_path ):
+  check_checkpoint( lambda: GcdUnitCL( algo ), str( tmp_path / "gcd.ckpt" ) )
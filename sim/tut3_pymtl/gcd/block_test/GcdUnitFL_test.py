@@ -3,45 +3,25 @@
 #=========================================================================
 
 import pytest
-import random
 
 from math  import gcd
 
 from pymtl3  import *
 from pymtl3.stdlib.test_utils import mk_test_case_table, run_sim
 
-from pymtl3.stdlib import stream
+from pymtl3.stdlib.stream.SinkRTL import PyMTLTestSinkError
 from tut3_pymtl.gcd.GcdUnitFL  import GcdUnitFL
 from tut3_pymtl.gcd.GcdUnitMsg import GcdUnitMsgs
 
-# To ensure reproducible testing
-
-random.seed(0xdeadbeef)
-
-#-------------------------------------------------------------------------
-# TestHarness
-#-------------------------------------------------------------------------
-
-class TestHarness( Component ):
+from tut3_pymtl.gcd.GcdUnitTestHarness import TestHarness, mk_soak_harness, \
+                                              run_soak
 
-  def construct( s, gcd ):
+from sim_utils.randseed   import mk_rng
+from sim_utils.checkpoint import save_checkpoint, load_checkpoint
 
-    # Instantiate models
-
-    s.src  = stream.SourceRTL( GcdUnitMsgs.req )
-    s.sink = stream.SinkRTL( GcdUnitMsgs.resp )
-    s.gcd = gcd
-
-    # Connect
-
-    s.src.send //= s.gcd.recv
-    s.gcd.send //= s.sink.recv
-
-  def done( s ):
-    return s.src.done() and s.sink.done()
+# To ensure reproducible testing
 
-  def line_trace( s ):
-    return s.src.line_trace() + " > " + s.gcd.line_trace() + " > " + s.sink.line_trace()
+rng = mk_rng( __name__ )
 
 #-------------------------------------------------------------------------
 # Test Case: basic
@@ -71,8 +51,8 @@ for a, b, result in basic_cases:
 
 random_cases = []
 for i in range(30):
-  a = random.randint(0,0xffff)
-  b = random.randint(0,0xffff)
+  a = rng.randint(0,0xffff)
+  b = rng.randint(0,0xffff)
   c = gcd( a, b )
   random_cases.append( ( a, b, c ) )
 
@@ -112,3 +92,73 @@ def test_gcd_fl( test_params ):
     interval_delay=test_params.sink_delay )
 
   run_sim( th )
+
+#-------------------------------------------------------------------------
+# Soak test
+#-------------------------------------------------------------------------
+# Streams many more random requests than the test case table through the
+# model with random source and sink delays. Run much longer soak tests
+# with gcd-soak.
+
+soak_case_table = mk_test_case_table([
+  (                 "pattern  ninputs  src_delay  sink_delay"),
+  [ "random_0x0",   "random", 200,     0,         0,        ],
+  [ "random_4x4",   "random", 200,     4,         4,        ],
+  [ "small_2x7",    "small",  500,     2,         7,        ],
+])
+
+@pytest.mark.parametrize( **soak_case_table )
+def test_gcd_fl_soak( test_params ):
+
+  th = mk_soak_harness( GcdUnitFL(), test_params.pattern, test_params.ninputs,
+                        test_params.src_delay, test_params.sink_delay )
+
+  run_soak( th )
+  assert th.sink.nmsgs == test_params.ninputs
+
+def test_gcd_fl_soak_golden():
+
+  # The sink checks every response against the golden function
+
+  th = mk_soak_harness( GcdUnitFL(), "small", 100, golden=lambda a, b : gcd( a, b ) | 1 )
+  with pytest.raises( PyMTLTestSinkError ):
+    run_soak( th )
+
+#-------------------------------------------------------------------------
+# Checkpointing
+#-------------------------------------------------------------------------
+# Runs a soak harness for ncycles, checkpoints it, and finishes the run.
+# Restoring the checkpoint into a new harness has to finish the run in
+# exactly the same way.
+
+def finish_soak( th ):
+  line_traces = []
+  while not th.done():
+    th.sim_tick()
+    line_traces.append( th.line_trace() )
+  return th.sim_cycle_count(), line_traces
+
+def check_checkpoint( mk_gcd_unit, path, ncycles=100 ):
+
+  def mk_harness():
+    th = mk_soak_harness( mk_gcd_unit(), "random", 50, 3, 3 )
+    th.elaborate()
+    th.apply( DefaultPassGroup( linetrace=False ) )
+    return th
+
+  th = mk_harness()
+  th.sim_reset()
+  for _ in range( ncycles ):
+    th.sim_tick()
+
+  assert 0 < th.sink.nmsgs < 50
+  save_checkpoint( th, path )
+  ref = finish_soak( th )
+
+  th = mk_harness()
+  load_checkpoint( th, path )
+  assert finish_soak( th ) == ref
+  assert th.sink.nmsgs == 50
+
+def test_gcd_fl_checkpoint( tmp_path ):
+  check_checkpoint( GcdUnitFL, str( tmp_path / "gcd.ckpt" ) )
@@ -0,0 +1,57 @@
+#=========================================================================
+# GcdUnitInputs_test
+#=========================================================================
+
+import pytest
+
+from math import gcd
+
+from ..GcdUnitInputs import patterns, gen_gcd_inputs, gen_gcd_reqs, gen_gcd_resps
+
+#-------------------------------------------------------------------------
+# test_patterns
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "pattern", patterns )
+def test_patterns( pattern ):
+
+  inputs = list( gen_gcd_inputs( pattern, 50 ) )
+  assert len(inputs) == 50
+
+  for req, resp in inputs:
+    assert resp == gcd( req.a, req.b )
+    if pattern == 'small':
+      assert req.a <= 0xff
+    elif pattern == 'zeros':
+      assert req.a == 0 and req.b == 0
+
+#-------------------------------------------------------------------------
+# test_reqs_resps
+#-------------------------------------------------------------------------
+
+def test_reqs_resps():
+  inputs = list( gen_gcd_inputs( 'random', 20 ) )
+  assert list( gen_gcd_reqs ( 'random', 20 ) ) == [ req  for req, _  in inputs ]
+  assert list( gen_gcd_resps( 'random', 20 ) ) == [ resp for _, resp in inputs ]
+
+#-------------------------------------------------------------------------
+# test_lazy
+#-------------------------------------------------------------------------
+
+def test_lazy():
+  reqs = gen_gcd_reqs( 'random', 10**12 )
+  assert len( [ next(reqs) for _ in range(10) ] ) == 10
+
+def test_bad_pattern():
+  with pytest.raises( ValueError ):
+    gen_gcd_inputs( 'bogus', 10 )
+
+#-------------------------------------------------------------------------
+# test_golden
+#-------------------------------------------------------------------------
+
+def test_golden():
+  golden = lambda a, b : a ^ b
+  resps  = gen_gcd_resps( 'random', 20, golden=golden )
+  for req, resp in zip( gen_gcd_reqs( 'random', 20 ), resps ):
+    assert resp == req.a ^ req.b
@@ -0,0 +1,35 @@
+#=========================================================================
+# GcdUnitMultiCL_test
+#=========================================================================
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib.test_utils import run_sim
+from ..GcdUnitMultiCL import GcdUnitMultiCL
+
+# Reuse cases from FL tests
+
+from .GcdUnitFL_test import TestHarness, test_case_table
+
+#-------------------------------------------------------------------------
+# Test cases
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "nunits", [ 1, 2, 3, 4 ] )
+@pytest.mark.parametrize( **test_case_table )
+def test_gcd_multi_cl( test_params, nunits ):
+
+  th = TestHarness( GcdUnitMultiCL( nunits ) )
+
+  th.set_param("top.src.construct",
+    msgs=test_params.msgs[::2],
+    initial_delay=test_params.src_delay,
+    interval_delay=test_params.src_delay )
+
+  th.set_param("top.sink.construct",
+    msgs=test_params.msgs[1::2],
+    initial_delay=test_params.sink_delay,
+    interval_delay=test_params.sink_delay )
+
+  run_sim( th )
@@ -0,0 +1,34 @@
+#=========================================================================
+# GcdUnitMultiRTL_test
+#=========================================================================
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib.test_utils import run_sim
+from ..GcdUnitMultiRTL import GcdUnitMultiRTL
+
+# Reuse tests from FL model
+
+from .GcdUnitCL_test import TestHarness, test_case_table
+
+#-------------------------------------------------------------------------
+# Test cases
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "nunits", [ 1, 2, 3, 4 ] )
+@pytest.mark.parametrize( **test_case_table )
+def test_gcd_multi_rtl( test_params, nunits, cmdline_opts ):
+  th = TestHarness( GcdUnitMultiRTL( nunits ) )
+
+  th.set_param("top.src.construct",
+    msgs=test_params.msgs[::2],
+    initial_delay=test_params.src_delay,
+    interval_delay=test_params.src_delay )
+
+  th.set_param("top.sink.construct",
+    msgs=test_params.msgs[1::2],
+    initial_delay=test_params.sink_delay,
+    interval_delay=test_params.sink_delay )
+
+  run_sim( th, cmdline_opts, duts=['gcd'] )
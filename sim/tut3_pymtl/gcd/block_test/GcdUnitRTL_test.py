@@ -7,18 +7,24 @@ import pytest
 from pymtl3 import *
 from pymtl3.stdlib.test_utils import run_sim
 from ..GcdUnitRTL import GcdUnitRTL
+from ..GcdUnitCL import gcd_cl_algos
+from sim_utils.latency import LatencyHistogram
 
 # Reuse tests from FL model
 
-from .GcdUnitCL_test import TestHarness, test_case_table
+from .GcdUnitCL_test import TestHarness, test_case_table, random_cases, \
+                           soak_case_table, mk_soak_harness, run_soak, \
+                           check_checkpoint
+from .GcdUnitFL_test import random_msgs
 
 #-------------------------------------------------------------------------
 # Test cases
 #-------------------------------------------------------------------------
 
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
 @pytest.mark.parametrize( **test_case_table )
-def test_gcd_rtl( test_params, cmdline_opts ):
-  th = TestHarness( GcdUnitRTL() )
+def test_gcd_rtl( test_params, algo, cmdline_opts ):
+  th = TestHarness( GcdUnitRTL( algo ) )
 
   th.set_param("top.src.construct",
     msgs=test_params.msgs[::2],
@@ -31,3 +37,83 @@ def test_gcd_rtl( test_params, cmdline_opts ):
     interval_delay=test_params.sink_delay )
 
   run_sim( th, cmdline_opts, duts=['gcd'] )
+
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
+@pytest.mark.parametrize( **soak_case_table )
+def test_gcd_rtl_soak( test_params, algo, cmdline_opts ):
+
+  th = mk_soak_harness( GcdUnitRTL( algo ), test_params.pattern, test_params.ninputs,
+                        test_params.src_delay, test_params.sink_delay )
+
+  run_soak( th, cmdline_opts, duts=['gcd'] )
+  assert th.sink.nmsgs == test_params.ninputs
+
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
+def test_gcd_rtl_checkpoint( algo, tmp_path ):
+  check_checkpoint( lambda: GcdUnitRTL( algo ), str( tmp_path / "gcd.ckpt" ) )
+
+#-------------------------------------------------------------------------
+# test_gcd_rtl_latency
+#-------------------------------------------------------------------------
+# Checks that the CL model estimates the number of cycles each request
+# spends in the CALC state exactly.
+
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
+def test_gcd_rtl_latency( algo ):
+
+  model = GcdUnitRTL( algo )
+  model.elaborate()
+  model.apply( DefaultPassGroup() )
+  model.sim_reset()
+
+  model.send.rdy @= 1
+
+  # With euclid, b = 1 takes one subtraction per unit of a, so we use a
+  # smaller a there, which still swaps and subtracts the same way
+
+  big   = 0xffff if algo == "stein" else 0x1ff
+  cases = [ (0,0), (0,5), (5,0), (big,1), (1,big) ] \
+        + [ (a,b) for a, b, _ in random_cases ]
+
+  for a, b in cases:
+
+    model.recv.val   @= 1
+    model.recv.msg.a @= a
+    model.recv.msg.b @= b
+    model.sim_tick()
+    model.recv.val   @= 0
+
+    ncycles = 0
+    while not model.send.val:
+      model.sim_tick()
+      ncycles += 1
+
+    assert ( model.send.msg, ncycles ) == gcd_cl_algos[ algo ]( a, b )
+    model.sim_tick()
+
+#-------------------------------------------------------------------------
+# test_gcd_rtl_monitor
+#-------------------------------------------------------------------------
+# Checks the statistics of the monitor in the test harness. Each request
+# spends one cycle being accepted and then as many cycles as the CL model
+# estimates before the response is sent, and the unit is busy for
+# exactly those cycles.
+
+@pytest.mark.parametrize( "algo", [ "euclid", "stein" ] )
+def test_gcd_rtl_monitor( algo, cmdline_opts ):
+  th = TestHarness( GcdUnitRTL( algo ) )
+
+  th.set_param("top.src.construct",  msgs=random_msgs[::2]  )
+  th.set_param("top.sink.construct", msgs=random_msgs[1::2] )
+
+  run_sim( th, cmdline_opts, duts=['gcd'] )
+
+  ref = LatencyHistogram()
+  for a, b, _ in random_cases:
+    ref.add( gcd_cl_algos[ algo ]( a, b )[1] + 1 )
+
+  stats = th.monitor.stats()
+  assert stats['latency'] == ref.summary()
+  assert stats['cycles']['busy'] == ref.total
+  assert stats['cycles']['send'] == len( random_cases )
+  assert stats['cycles']['sink'] == 0
@@ -0,0 +1,128 @@
+#=========================================================================
+# SortNetwork
+#=========================================================================
+# Generators for sorting networks with any power-of-two number of
+# elements. A network is a list of stages and each stage is a list of
+# compare-and-swap pairs (i,j) with i < j which leave the smaller value
+# in element i and the larger value in element j. The pairs in a stage
+# never share an element, so each stage maps onto one column of
+# MinMaxUnits (and one pipeline stage) in SortUnitNetRTL. We support
+# two kinds of networks:
+#
+#  - bitonic: Batcher's bitonic sorter, drawn so that every comparator
+#    sorts into ascending order (the first stage of each merge compares
+#    mirrored elements instead of using descending comparators)
+#
+#  - odd-even: Batcher's odd-even merge sorter, which has the same
+#    number of stages but fewer comparators. For four elements this is
+#    exactly the network used in SortUnitStructRTL.
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+from .SortUnitFL import _mk_dtype
+
+#-------------------------------------------------------------------------
+# mk_bitonic_network
+#-------------------------------------------------------------------------
+
+def mk_bitonic_network( nelems ):
+  stages = []
+
+  k = 2
+  while k <= nelems:
+
+    # Compare mirrored elements within each block of size k
+
+    stages.append( [ ( b + i, b + k - 1 - i )
+                     for b in range( 0, nelems, k ) for i in range( k//2 ) ] )
+
+    # Half cleaners
+
+    j = k // 4
+    while j >= 1:
+      stages.append( [ ( i, i + j ) for i in range( nelems ) if not i & j ] )
+      j //= 2
+
+    k *= 2
+
+  return stages
+
+#-------------------------------------------------------------------------
+# mk_odd_even_network
+#-------------------------------------------------------------------------
+
+def mk_odd_even_network( nelems ):
+  stages = []
+
+  p = 1
+  while p < nelems:
+    k = p
+    while k >= 1:
+      stage = []
+      for j in range( k % p, nelems - k, 2*k ):
+        for i in range( min( k, nelems - j - k ) ):
+          if ( i + j ) // ( 2*p ) == ( i + j + k ) // ( 2*p ):
+            stage.append( ( i + j, i + j + k ) )
+      stages.append( stage )
+      k //= 2
+    p *= 2
+
+  return stages
+
+#-------------------------------------------------------------------------
+# mk_sort_network
+#-------------------------------------------------------------------------
+
+network_generators = {
+  'bitonic'  : mk_bitonic_network,
+  'odd-even' : mk_odd_even_network,
+}
+
+def mk_sort_network( nelems, kind="odd-even" ):
+
+  if nelems < 2 or nelems & ( nelems - 1 ):
+    raise ValueError( f"nelems must be a power of two >= 2, not {nelems}" )
+
+  if kind not in network_generators:
+    raise ValueError( f"unknown sorting network {kind!r}, expected one of "
+                      f"{sorted(network_generators)}" )
+
+  return network_generators[ kind ]( nelems )
+
+#-------------------------------------------------------------------------
+# sort_net_fl
+#-------------------------------------------------------------------------
+# Sorts a single list of elements by applying the network to a copy.
+
+def sort_net_fl( arr, network ):
+  ret = list( arr )
+  for stage in network:
+    for i, j in stage:
+      if ret[j] < ret[i]:
+        ret[i], ret[j] = ret[j], ret[i]
+  return ret
+
+#-------------------------------------------------------------------------
+# sort_net_fl_batch
+#-------------------------------------------------------------------------
+# Like sort_fl_batch but for any network. The input is an (N,nelems)
+# array (or a list of N lists) and each compare-and-swap is a vectorized
+# minimum/maximum over one pair of columns. Falls back to plain Python
+# if NumPy is not installed (or use_numpy is False).
+
+def sort_net_fl_batch( arr, network, nbits=8, use_numpy=True ):
+
+  if np is None or not use_numpy:
+    return [ sort_net_fl( row, network ) for row in arr ]
+
+  nelems = max( j for stage in network for _, j in stage ) + 1
+  cols = np.array( arr, dtype=_mk_dtype(nbits) ).reshape( -1, nelems ).T.copy()
+  for stage in network:
+    for i, j in stage:
+      lo = np.minimum( cols[i], cols[j] )
+      hi = np.maximum( cols[i], cols[j] )
+      cols[i], cols[j] = lo, hi
+  return cols.T.copy()
@@ -0,0 +1,43 @@
+#=========================================================================
+# SortUnitInputs
+#=========================================================================
+# Lazily generates the input datasets used by sort-sim. Each input is
+# only created when the simulator asks for it, so the memory usage does
+# not depend on the number of inputs. We use a private random number
+# generator with a fixed seed so a given pattern, ninputs, and seed
+# always produce the same sequence of inputs.
+
+import random
+
+patterns = [ 'random', 'sorted-fwd', 'sorted-rev', 'zeros' ]
+
+#-------------------------------------------------------------------------
+# gen_sort_inputs
+#-------------------------------------------------------------------------
+# Returns an iterator over ninputs lists of four nbits-wide values.
+
+def gen_sort_inputs( pattern, ninputs, nbits=8, seed=0xdeadbeef ):
+
+  if pattern not in patterns:
+    raise ValueError( f"unknown input pattern {pattern}" )
+
+  def gen():
+    rng    = random.Random( seed )
+    maxval = 2**nbits - 1
+
+    for i in range(ninputs):
+
+      if pattern == 'zeros':
+        yield [0]*4
+        continue
+
+      input_ = [ rng.randint(0,maxval) for _ in range(4) ]
+
+      if pattern == 'sorted-fwd':
+        input_.sort()
+      elif pattern == 'sorted-rev':
+        input_.sort( reverse=True )
+
+      yield input_
+
+  return gen()
@@ -0,0 +1,63 @@
+#=========================================================================
+# SortUnitNetCL
+#=========================================================================
+# Models the cycle-approximate timing behavior of the multi-lane sort
+# unit family. By default the latency is the number of stages in the
+# sorting network, which is the latency of SortUnitNetRTL.
+
+from pymtl3 import *
+
+from .SortNetwork   import mk_sort_network, sort_net_fl
+from .SortUnitNetFL import SortUnitNetFL
+
+class SortUnitNetCL( Component ):
+
+  # Constructor
+
+  def construct( s, nbits=8, nelems=4, nlanes=1, network="odd-even",
+                 nstages=None ):
+
+    s.in_val  = [ InPort ()      for _ in range(nlanes)        ]
+    s.in_     = [ InPort (nbits) for _ in range(nlanes*nelems) ]
+
+    s.out_val = [ OutPort()      for _ in range(nlanes)        ]
+    s.out     = [ OutPort(nbits) for _ in range(nlanes*nelems) ]
+
+    s.nelems  = nelems
+    s.network = mk_sort_network( nelems, network )
+
+    if nstages is None:
+      nstages = len( s.network )
+
+    # As in SortUnitCL we model the pipeline with a ring buffer of
+    # nstages preallocated slots, except that each slot holds one valid
+    # bit and one sorted vector per lane.
+
+    s.pipe = [ [ [0]*(nelems+1) for _ in range(nlanes) ] for _ in range(nstages) ]
+    s.head = 0
+
+    @update_ff
+    def block():
+
+      slot = s.pipe[s.head]
+      for l in range(nlanes):
+        if s.in_val[l]:
+          slot[l][0] = 1
+          elms = sort_net_fl( s.in_[l*nelems:(l+1)*nelems], s.network )
+          for i, v in enumerate( elms ):
+            slot[l][i+1] = int(v)
+        else:
+          slot[l][0] = 0
+
+      s.head = s.head + 1 if s.head < nstages-1 else 0
+
+      data = s.pipe[s.head]
+      for l in range(nlanes):
+        s.out_val[l] <<= data[l][0]
+        for i in range(nelems):
+          s.out[l*nelems+i] <<= data[l][i+1] if data[l][0] else 0
+
+  # Line tracing
+
+  def line_trace( s ):
+    return SortUnitNetFL.line_trace( s )
@@ -0,0 +1,49 @@
+#=========================================================================
+# SortUnitNetFL
+#=========================================================================
+# Models the functional behavior of the multi-lane sort unit family. The
+# unit has nlanes independent lanes, each of which sorts one vector of
+# nelems nbit elements per cycle. The ports are flattened across lanes,
+# so element i of lane l is in_[l*nelems+i] and out[l*nelems+i], and
+# in_val[l] and out_val[l] are the valid bits of lane l.
+
+from pymtl3 import *
+
+from .SortNetwork import mk_sort_network, sort_net_fl
+
+class SortUnitNetFL( Component ):
+
+  # Constructor
+
+  def construct( s, nbits=8, nelems=4, nlanes=1, network="odd-even" ):
+
+    s.in_val  = [ InPort ()      for _ in range(nlanes)        ]
+    s.in_     = [ InPort (nbits) for _ in range(nlanes*nelems) ]
+
+    s.out_val = [ OutPort()      for _ in range(nlanes)        ]
+    s.out     = [ OutPort(nbits) for _ in range(nlanes*nelems) ]
+
+    s.nelems  = nelems
+    s.network = mk_sort_network( nelems, network )
+
+    @update_ff
+    def block():
+      for l in range(nlanes):
+        s.out_val[l] <<= s.in_val[l]
+        elms = sort_net_fl( s.in_[l*nelems:(l+1)*nelems], s.network )
+        for i, v in enumerate( elms ):
+          s.out[l*nelems+i] <<= v
+
+  # Line tracing
+
+  def line_trace( s ):
+
+    def trace_lanes( vals, elms ):
+      strs = []
+      for l, val in enumerate( vals ):
+        str_ = '{' + ','.join( map( str, elms[l*s.nelems:(l+1)*s.nelems] ) ) + '}'
+        strs.append( str_ if val else ' '*len(str_) )
+      return ' '.join( strs )
+
+    return "{}|{}".format( trace_lanes( s.in_val,  s.in_ ),
+                           trace_lanes( s.out_val, s.out ) )
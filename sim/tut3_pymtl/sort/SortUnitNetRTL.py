@@ -0,0 +1,146 @@
+#=========================================================================
+# SortUnitNetRTL
+#=========================================================================
+# A family of sort units generated from a sorting network. Each lane is
+# a SortUnitNetPipeRTL which sorts nelems nbit elements into ascending
+# order with one pipeline stage per stage of the network (see
+# SortNetwork), using a MinMaxUnit for every compare-and-swap. With
+# nelems=4 and the odd-even network a lane has exactly the structure of
+# SortUnitStructRTL. SortUnitNetRTL puts nlanes lanes side by side so it
+# can accept nlanes vectors per cycle; the ports are flattened across
+# lanes as in SortUnitNetFL.
+
+from pymtl3 import *
+from pymtl3.stdlib.basic_rtl import Reg, RegRst
+
+from .MinMaxUnit  import MinMaxUnit
+from .SortNetwork import mk_sort_network
+
+#=========================================================================
+# SortUnitNetPipeRTL
+#=========================================================================
+
+class SortUnitNetPipeRTL( Component ):
+
+  #=======================================================================
+  # Constructor
+  #=======================================================================
+
+  def construct( s, nbits=8, nelems=4, network="odd-even" ):
+
+    #---------------------------------------------------------------------
+    # Interface
+    #---------------------------------------------------------------------
+
+    s.in_val  = InPort ()
+    s.in_     = [ InPort (nbits) for _ in range(nelems) ]
+
+    s.out_val = OutPort()
+    s.out     = [ OutPort(nbits) for _ in range(nelems) ]
+
+    #---------------------------------------------------------------------
+    # Pipeline
+    #---------------------------------------------------------------------
+    # Stage k registers the outputs of stage k-1 (or the inputs for
+    # k=0) and then applies the compare-and-swaps of stage k of the
+    # network. Elements which are not compared in a stage pass straight
+    # through to the next pipeline register.
+
+    stages  = mk_sort_network( nelems, network )
+    nstages = len( stages )
+
+    s.val_regs = [ RegRst(Bits1) for _ in range(nstages) ]
+    s.elm_regs = [ [ Reg(mk_bits(nbits)) for _ in range(nelems) ]
+                   for _ in range(nstages) ]
+    s.minmax   = [ [ MinMaxUnit(nbits) for _ in stage ] for stage in stages ]
+
+    s.val_regs[0].in_ //= s.in_val
+    elms = s.in_
+
+    for k, stage in enumerate( stages ):
+
+      if k > 0:
+        s.val_regs[k].in_ //= s.val_regs[k-1].out
+
+      for i in range(nelems):
+        s.elm_regs[k][i].in_ //= elms[i]
+
+      elms = [ reg.out for reg in s.elm_regs[k] ]
+
+      for m, ( i, j ) in zip( s.minmax[k], stage ):
+        m.in0 //= elms[i]
+        m.in1 //= elms[j]
+        elms[i], elms[j] = m.out_min, m.out_max
+
+    #---------------------------------------------------------------------
+    # Output
+    #---------------------------------------------------------------------
+
+    s.out_val //= s.val_regs[-1].out
+
+    s.elm_last = [ Wire(nbits) for _ in range(nelems) ]
+    for i in range(nelems):
+      s.elm_last[i] //= elms[i]
+
+    @update
+    def comb_logic():
+      for i in range(nelems):
+        s.out[i] @= s.elm_last[i] & (sext(s.out_val, nbits))
+
+  #=======================================================================
+  # Line tracing
+  #=======================================================================
+
+  def line_trace( s ):
+
+    def trace_val_elm( val, elm ):
+      str_ = '{' + ','.join( map( str, elm ) ) + '}'
+      if not val:
+        str_ = ' '*len(str_)
+      return str_
+
+    return "{}|{}".format( trace_val_elm( s.in_val,  s.in_ ),
+                           trace_val_elm( s.out_val, s.out ) )
+
+#=========================================================================
+# SortUnitNetRTL
+#=========================================================================
+
+class SortUnitNetRTL( Component ):
+
+  #=======================================================================
+  # Constructor
+  #=======================================================================
+
+  def construct( s, nbits=8, nelems=4, nlanes=1, network="odd-even" ):
+
+    #---------------------------------------------------------------------
+    # Interface
+    #---------------------------------------------------------------------
+
+    s.in_val  = [ InPort ()      for _ in range(nlanes)        ]
+    s.in_     = [ InPort (nbits) for _ in range(nlanes*nelems) ]
+
+    s.out_val = [ OutPort()      for _ in range(nlanes)        ]
+    s.out     = [ OutPort(nbits) for _ in range(nlanes*nelems) ]
+
+    #---------------------------------------------------------------------
+    # Lanes
+    #---------------------------------------------------------------------
+
+    s.lanes = [ SortUnitNetPipeRTL( nbits, nelems, network )
+                for _ in range(nlanes) ]
+
+    for l, lane in enumerate( s.lanes ):
+      lane.in_val  //= s.in_val[l]
+      lane.out_val //= s.out_val[l]
+      for i in range(nelems):
+        lane.in_[i] //= s.in_[l*nelems+i]
+        lane.out[i] //= s.out[l*nelems+i]
+
+  #=======================================================================
+  # Line tracing
+  #=======================================================================
+
+  def line_trace( s ):
+    return ' '.join( lane.line_trace() for lane in s.lanes )
@@ -1,8 +1,14 @@
 #=========================================================================
 # sort
 #=========================================================================
+# The models are imported the first time they are used, so importing one
+# module of the package (e.g., SortUnitInputs) does not import every
+# model along with NumPy.
 
-from .SortUnitCL        import SortUnitCL
-from .SortUnitFlatRTL   import SortUnitFlatRTL
-from .SortUnitStructRTL import SortUnitStructRTL
+from sim_utils.lazy import lazy_exports
 
+lazy_exports( __name__, {
+  'SortUnitCL'        : '.SortUnitCL',
+  'SortUnitFlatRTL'   : '.SortUnitFlatRTL',
+  'SortUnitStructRTL' : '.SortUnitStructRTL',
+})
@@ -0,0 +1,72 @@
+#=========================================================================
+# SortNetwork_test
+#=========================================================================
+
+import pytest
+
+from random import randint
+
+from ..SortUnitFL  import sort_network
+from ..SortNetwork import mk_sort_network, sort_net_fl, sort_net_fl_batch
+
+#-------------------------------------------------------------------------
+# test_structure
+#-------------------------------------------------------------------------
+# Every stage must only use each element once so it can be implemented
+# as a single column of MinMaxUnits.
+
+@pytest.mark.parametrize( "kind",   [ "bitonic", "odd-even" ] )
+@pytest.mark.parametrize( "nelems", [ 2, 4, 8, 16, 32 ] )
+def test_structure( kind, nelems ):
+  network = mk_sort_network( nelems, kind )
+
+  nstages = nelems.bit_length()-1
+  assert len( network ) == nstages*(nstages+1)//2
+
+  for stage in network:
+    elms = [ e for pair in stage for e in pair ]
+    assert len( elms ) == len( set( elms ) )
+    assert all( 0 <= i < j < nelems for i, j in stage )
+
+def test_odd_even_4():
+  network = mk_sort_network( 4, "odd-even" )
+  assert [ pair for stage in network for pair in stage ] == sort_network
+
+#-------------------------------------------------------------------------
+# test_zero_one
+#-------------------------------------------------------------------------
+# By the zero-one principle a network sorts every input if it sorts
+# every input of zeros and ones.
+
+@pytest.mark.parametrize( "kind",   [ "bitonic", "odd-even" ] )
+@pytest.mark.parametrize( "nelems", [ 2, 4, 8, 16 ] )
+def test_zero_one( kind, nelems ):
+  network = mk_sort_network( nelems, kind )
+  for bits in range( 2**nelems ):
+    v = [ ( bits >> i ) & 1 for i in range(nelems) ]
+    assert sort_net_fl( v, network ) == sorted( v )
+
+#-------------------------------------------------------------------------
+# test_batch
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "use_numpy", [ True, False ] )
+@pytest.mark.parametrize( "kind",      [ "bitonic", "odd-even" ] )
+@pytest.mark.parametrize( "nelems",    [ 4, 8, 16 ] )
+def test_batch( nelems, kind, use_numpy ):
+  network = mk_sort_network( nelems, kind )
+  tvec    = [ [ randint(0,0xff) for _ in range(nelems) ] for _ in range(50) ]
+  ret     = sort_net_fl_batch( tvec, network, use_numpy=use_numpy )
+  assert [ list(v) for v in ret ] == [ sorted(v) for v in tvec ]
+
+#-------------------------------------------------------------------------
+# test_errors
+#-------------------------------------------------------------------------
+
+def test_errors():
+  with pytest.raises( ValueError ):
+    mk_sort_network( 6 )
+  with pytest.raises( ValueError ):
+    mk_sort_network( 1 )
+  with pytest.raises( ValueError ):
+    mk_sort_network( 4, "bubble" )
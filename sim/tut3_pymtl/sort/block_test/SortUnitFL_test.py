@@ -4,15 +4,19 @@
 
 import pytest
 from copy       import deepcopy
-from random     import randint, seed
-
-# To ensure reproducible testing
-
-seed(0xdeadbeef)
+from random     import randint
 
 from pymtl3 import *
 from pymtl3.stdlib.test_utils import run_test_vector_sim, mk_test_case_table
-from ..SortUnitFL  import sort_fl, SortUnitFL
+from ..SortUnitFL  import sort_fl, sort_fl_batch, SortUnitFL
+
+from sim_utils.vectors    import CompiledVectors, run_test_vectors, np
+from sim_utils.randseed   import mk_rng, derive_seed
+from sim_utils.checkpoint import save_state, restore_state
+
+# To ensure reproducible testing
+
+rng = mk_rng( __name__ )
 
 #-------------------------------------------------------------------------
 # test sort function
@@ -21,7 +25,7 @@ from ..SortUnitFL  import sort_fl, SortUnitFL
 tvec_stream = [ [ 4, 3, 2, 1 ], [ 9, 6, 7, 1 ], [ 4, 8, 0, 9 ] ]
 tvec_dups   = [ [ 2, 8, 9, 9 ], [ 2, 8, 2, 8 ], [ 1, 1, 1, 1 ] ]
 tvec_sorted = [ [ 1, 2, 3, 4 ], [ 1, 3, 5, 7 ], [ 4, 3, 2, 1 ] ]
-tvec_random = [ [ randint(0,0xff) for _ in range(4) ] for _ in range(20) ]
+tvec_random = [ [ rng.randint(0,0xff) for _ in range(4) ] for _ in range(20) ]
 
 def test_sort_fl_tvec_stream():
   print()
@@ -47,6 +51,22 @@ def test_sort_fl_tvec_random():
     print("input:", v, "| sort_fl:", sort_fl(v), "ref:",sorted(v))
     assert sort_fl( v ) == sorted( v )
 
+#-------------------------------------------------------------------------
+# test batch sort function
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "use_numpy", [ True, False ] )
+def test_sort_fl_batch_tvec( use_numpy ):
+  for tvec in [ tvec_stream, tvec_dups, tvec_sorted, tvec_random ]:
+    ret = sort_fl_batch( tvec, use_numpy=use_numpy )
+    assert [ list(v) for v in ret ] == [ sort_fl(v) for v in tvec ]
+
+@pytest.mark.parametrize( "nbits", [ 4, 8, 16, 32, 64, 128 ] )
+def test_sort_fl_batch_nbits( nbits ):
+  tvec = [ [ randint(0,2**nbits-1) for _ in range(4) ] for _ in range(100) ]
+  ret  = sort_fl_batch( tvec, nbits )
+  assert [ list(v) for v in ret ] == [ sort_fl(v) for v in tvec ]
+
 #-------------------------------------------------------------------------
 # Syntax helpers
 #-------------------------------------------------------------------------
@@ -92,6 +112,44 @@ def mk_test_vector_table( nstages, inputs ):
 
   return test_vector_table
 
+#-------------------------------------------------------------------------
+# mk_test_vectors
+#-------------------------------------------------------------------------
+# Same test vectors as mk_test_vector_table, but built directly as
+# compiled test vectors for run_test_vectors from an (N,4) array of
+# inputs, so we can test with millions of input vectors.
+
+def mk_test_vectors( nstages, inputs, nbits=8 ):
+
+  inputs = np.asarray( inputs ).reshape( -1, 4 )
+  n      = len( inputs )
+
+  # Inputs are followed by nstages invalid inputs, outputs are preceded
+  # by nstages invalid (don't care) outputs
+
+  in_rows = np.zeros( ( n+nstages, 5 ), dtype=inputs.dtype )
+  in_rows[:n,0] = 1
+  in_rows[:n,1:] = inputs
+
+  out_rows = np.zeros( ( n+nstages, 5 ), dtype=inputs.dtype )
+  out_rows[nstages:,0] = 1
+  out_rows[nstages:,1:] = sort_fl_batch( inputs, nbits )
+
+  mask = np.ones( ( n+nstages, 5 ), dtype=bool )
+  mask[:nstages,1:] = False
+
+  return CompiledVectors( header_str[:5], [ name[:-1] for name in header_str[5:] ],
+                          in_rows, out_rows, mask )
+
+# The large tests need NumPy, so they are skipped without it
+
+needs_numpy = pytest.mark.skipif( np is None, reason="needs NumPy" )
+
+tvec_random_large = None
+if np is not None:
+  tvec_random_large = np.random.default_rng( derive_seed( __name__ + ".large" ) ).integers(
+                        0, 0x100, size=(5000,4), dtype=np.uint8 )
+
 #-------------------------------------------------------------------------
 # test_basic
 #-------------------------------------------------------------------------
@@ -140,3 +198,53 @@ def test_sort_fl( test_params ):
 @pytest.mark.parametrize( "n", [ 1, 2, 3, 4, 5, 6 ] )
 def test_sort_fl_random( n ):
   run_test_vector_sim( SortUnitFL(), mk_test_vector_table( 1, tvec_random ) )
+
+#-------------------------------------------------------------------------
+# Large random test with compiled test vectors
+#-------------------------------------------------------------------------
+# The outputs are registered, so we can drive the model in bulk
+
+@needs_numpy
+def test_sort_fl_random_large():
+  run_test_vectors( SortUnitFL(), mk_test_vectors( 1, tvec_random_large ), bulk=True )
+
+#-------------------------------------------------------------------------
+# Checkpointing
+#-------------------------------------------------------------------------
+# Streams random inputs (with bubbles) through a sort unit, saves its
+# state after ncycles, and streams the rest of the inputs. A new sort
+# unit restored from the saved state has to produce exactly the same
+# outputs for the rest of the inputs.
+
+def stream_inputs( model, inputs ):
+  outputs = []
+  for i, input_ in enumerate( inputs ):
+    model.in_val @= ( i % 3 != 2 )
+    for j, v in enumerate( input_ ):
+      model.in_[j] @= v
+    model.sim_eval_combinational()
+    outputs.append( [ int(model.out_val) ] + [ int(v) for v in model.out ] )
+    model.sim_tick()
+  return outputs
+
+def check_checkpoint( mk_model, ncycles=10 ):
+
+  inputs = [ [ randint(0,0xff) for _ in range(4) ] for _ in range(40) ]
+
+  def mk_sim():
+    model = mk_model()
+    model.elaborate()
+    model.apply( DefaultPassGroup( linetrace=False ) )
+    return model
+
+  model = mk_sim()
+  model.sim_reset()
+  stream_inputs( model, inputs[:ncycles] )
+
+  state = save_state( model )
+  ref   = stream_inputs( model, inputs[ncycles:] )
+
+  model = mk_sim()
+  restore_state( model, state )
+  assert model.sim_cycle_count() == state['cycle']
+  assert stream_inputs( model, inputs[ncycles:] ) == ref
@@ -11,7 +11,9 @@ from pymtl3 import *
 from pymtl3.stdlib.test_utils import run_test_vector_sim
 
 from .SortUnitFL_test import header_str, mk_test_vector_table, x, \
-                             tvec_stream, tvec_dups, tvec_sorted, tvec_random
+                             tvec_stream, tvec_dups, tvec_sorted, tvec_random, \
+                             mk_test_vectors, tvec_random_large, run_test_vectors, \
+                             needs_numpy, check_checkpoint
 
 from ..SortUnitFlatRTL   import SortUnitFlatRTL
 
@@ -64,3 +66,21 @@ def test_random( nbits, cmdline_opts ):
   tvec_random = [ [ randint(0,2**nbits-1) for _ in range(4) ] for _ in range(20) ]
   run_test_vector_sim( SortUnitFlatRTL(nbits),
     mk_test_vector_table( 3, tvec_random ), cmdline_opts )
+
+#-------------------------------------------------------------------------
+# test_random_large
+#-------------------------------------------------------------------------
+# Thousands of random inputs with compiled test vectors. The outputs come
+# from the last pipeline registers, so we can drive the model in bulk.
+
+@needs_numpy
+def test_random_large( cmdline_opts ):
+  run_test_vectors( SortUnitFlatRTL(), mk_test_vectors( 3, tvec_random_large ),
+                    cmdline_opts, bulk=True )
+
+#-------------------------------------------------------------------------
+# test_checkpoint
+#-------------------------------------------------------------------------
+
+def test_checkpoint():
+  check_checkpoint( SortUnitFlatRTL )
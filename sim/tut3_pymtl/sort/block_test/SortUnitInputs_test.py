@@ -0,0 +1,55 @@
+#=========================================================================
+# SortUnitInputs_test
+#=========================================================================
+
+import pytest
+
+from ..SortUnitInputs import patterns, gen_sort_inputs
+
+#-------------------------------------------------------------------------
+# test_patterns
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "pattern", patterns )
+@pytest.mark.parametrize( "nbits",   [ 4, 8, 16 ] )
+def test_patterns( pattern, nbits ):
+
+  inputs = list( gen_sort_inputs( pattern, 50, nbits ) )
+  assert len(inputs) == 50
+
+  for input_ in inputs:
+    assert len(input_) == 4
+    assert all( 0 <= v < 2**nbits for v in input_ )
+
+    if pattern == 'sorted-fwd':
+      assert input_ == sorted( input_ )
+    elif pattern == 'sorted-rev':
+      assert input_ == sorted( input_, reverse=True )
+    elif pattern == 'zeros':
+      assert input_ == [0]*4
+
+#-------------------------------------------------------------------------
+# test_seed
+#-------------------------------------------------------------------------
+
+def test_seed():
+  assert list( gen_sort_inputs( 'random', 20 ) ) == \
+         list( gen_sort_inputs( 'random', 20 ) )
+  assert list( gen_sort_inputs( 'random', 20, seed=1 ) ) != \
+         list( gen_sort_inputs( 'random', 20, seed=2 ) )
+
+#-------------------------------------------------------------------------
+# test_lazy
+#-------------------------------------------------------------------------
+
+def test_lazy():
+
+  # We should be able to pull a few inputs out of a huge dataset without
+  # generating the whole dataset
+
+  inputs = gen_sort_inputs( 'random', 10**12 )
+  assert len( [ next(inputs) for _ in range(10) ] ) == 10
+
+def test_bad_pattern():
+  with pytest.raises( ValueError ):
+    gen_sort_inputs( 'bogus', 10 )
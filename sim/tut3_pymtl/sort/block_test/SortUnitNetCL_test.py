@@ -0,0 +1,53 @@
+#=========================================================================
+# SortUnitNetCL_test
+#=========================================================================
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib.test_utils import run_test_vector_sim
+
+from .SortUnitNetFL_test import test_case_table, mk_net_header, \
+                                mk_net_test_vector_table, mk_tvec_random
+
+from ..SortNetwork   import mk_sort_network
+from ..SortUnitNetCL import SortUnitNetCL
+
+#-------------------------------------------------------------------------
+# test_basic
+#-------------------------------------------------------------------------
+# The latency of a 4-element network is three cycles, and the outputs
+# are zero whenever out_val is low.
+
+def test_basic():
+  run_test_vector_sim( SortUnitNetCL( nelems=4, nlanes=2 ), [
+    mk_net_header( 4, 2 ),
+    # in  in  in  in  in  in  in  in  in  in  out out out out out out out out out out
+    # v0  v1  [0] [1] [2] [3] [4] [5] [6] [7] v0  v1  [0] [1] [2] [3] [4] [5] [6] [7]
+    [ 1,  0,  4,  2,  3,  1,  5,  8,  7,  6,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0 ],
+    [ 0,  1,  0,  0,  0,  0,  9,  9,  0,  1,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0 ],
+    [ 0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0 ],
+    [ 0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  1,  0,  1,  2,  3,  4,  0,  0,  0,  0 ],
+    [ 0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  1,  0,  0,  0,  0,  0,  1,  9,  9 ],
+    [ 0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0 ],
+  ] )
+
+#-------------------------------------------------------------------------
+# Parameterized Testing with Test Case Table
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( **test_case_table )
+def test_sort_net_cl( test_params ):
+  nelems  = test_params.nelems
+  nlanes  = test_params.nlanes
+  nstages = len( mk_sort_network( nelems, test_params.network ) )
+  run_test_vector_sim(
+    SortUnitNetCL( 8, nelems, nlanes, test_params.network ),
+    mk_net_test_vector_table( nelems, nlanes, nstages,
+                              mk_tvec_random( nelems, 20 ), test_params.gap ) )
+
+@pytest.mark.parametrize( "nstages", [ 1, 2, 5 ] )
+def test_nstages( nstages ):
+  run_test_vector_sim(
+    SortUnitNetCL( 8, 8, 2, nstages=nstages ),
+    mk_net_test_vector_table( 8, 2, nstages, mk_tvec_random( 8, 10 ) ) )
@@ -0,0 +1,105 @@
+#=========================================================================
+# SortUnitNetFL_test
+#=========================================================================
+
+import pytest
+
+from random import randint
+
+from pymtl3 import *
+from pymtl3.stdlib.test_utils import run_test_vector_sim, mk_test_case_table
+
+from .SortUnitFL_test import x
+from ..SortUnitNetFL  import SortUnitNetFL
+
+#-------------------------------------------------------------------------
+# mk_net_header
+#-------------------------------------------------------------------------
+# The ports of the sort unit family are flattened across lanes, so the
+# header has one in_val/out_val per lane and nlanes*nelems in_/out.
+
+def mk_net_header( nelems, nlanes ):
+  return \
+    [ f"in_val[{l}]"   for l in range(nlanes)        ] + \
+    [ f"in_[{i}]"      for i in range(nlanes*nelems) ] + \
+    [ f"out_val[{l}]*" for l in range(nlanes)        ] + \
+    [ f"out[{i}]*"     for i in range(nlanes*nelems) ]
+
+#-------------------------------------------------------------------------
+# mk_net_test_vector_table
+#-------------------------------------------------------------------------
+# Sends the input vectors nlanes at a time (lane 0 first) and expects
+# each vector sorted on the same lane nstages cycles later. If gap is
+# true we leave an idle cycle between groups of input vectors.
+
+def mk_net_test_vector_table( nelems, nlanes, nstages, inputs, gap=False ):
+
+  # Group the input vectors into cycles, None is an idle lane
+
+  cycles = []
+  for c in range( 0, len(inputs), nlanes ):
+    group = inputs[c:c+nlanes]
+    cycles.append( group + [ None ]*( nlanes - len(group) ) )
+    if gap:
+      cycles.append( [ None ]*nlanes )
+
+  cycles.extend( [ [ None ]*nlanes ]*nstages )
+
+  def mk_row( lanes, sort ):
+    vals = [ int( v is not None ) for v in lanes ]
+    elms = []
+    for v in lanes:
+      if v is None:
+        elms.extend( [ 0 if not sort else x ]*nelems )
+      else:
+        elms.extend( sorted(v) if sort else v )
+    return vals + elms
+
+  outputs = [ [ None ]*nlanes ]*nstages + cycles
+
+  test_vector_table = [ mk_net_header( nelems, nlanes ) ]
+  for in_lanes, out_lanes in zip( cycles, outputs ):
+    test_vector_table.append( mk_row( in_lanes, False ) + mk_row( out_lanes, True ) )
+
+  return test_vector_table
+
+def mk_tvec_random( nelems, n, nbits=8 ):
+  return [ [ randint(0,2**nbits-1) for _ in range(nelems) ] for _ in range(n) ]
+
+#-------------------------------------------------------------------------
+# test_basic
+#-------------------------------------------------------------------------
+
+def test_basic():
+  run_test_vector_sim( SortUnitNetFL( nelems=4, nlanes=2 ), [
+    mk_net_header( 4, 2 ),
+    # in  in  in  in  in  in  in  in  in  in  out out out out out out out out out out
+    # v0  v1  [0] [1] [2] [3] [4] [5] [6] [7] v0  v1  [0] [1] [2] [3] [4] [5] [6] [7]
+    [ 1,  1,  4,  2,  3,  1,  5,  8,  7,  6,  0,  0,  x,  x,  x,  x,  x,  x,  x,  x ],
+    [ 0,  1,  0,  0,  0,  0,  9,  9,  0,  1,  1,  1,  1,  2,  3,  4,  5,  6,  7,  8 ],
+    [ 0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  1,  x,  x,  x,  x,  0,  1,  9,  9 ],
+  ] )
+
+#-------------------------------------------------------------------------
+# Parameterized Testing with Test Case Table
+#-------------------------------------------------------------------------
+# Note: FL is always 1-stage!
+
+test_case_table = mk_test_case_table([
+  (                        "nelems nlanes network    gap  "),
+  [ "4elm_1lane_oddeven",   4,     1,     "odd-even", False ],
+  [ "4elm_2lane_bitonic",   4,     2,     "bitonic",  True  ],
+  [ "8elm_1lane_bitonic",   8,     1,     "bitonic",  False ],
+  [ "8elm_4lane_oddeven",   8,     4,     "odd-even", False ],
+  [ "16elm_2lane_oddeven",  16,    2,     "odd-even", True  ],
+  [ "16elm_3lane_bitonic",  16,    3,     "bitonic",  False ],
+])
+
+@pytest.mark.parametrize( **test_case_table )
+def test_sort_net_fl( test_params ):
+  nelems = test_params.nelems
+  nlanes = test_params.nlanes
+  run_test_vector_sim(
+    SortUnitNetFL( 8, nelems, nlanes, test_params.network ),
+    mk_net_test_vector_table( nelems, nlanes, 1,
+                              mk_tvec_random( nelems, 20 ), test_params.gap ) )
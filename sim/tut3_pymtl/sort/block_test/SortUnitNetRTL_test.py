@@ -0,0 +1,49 @@
+#=========================================================================
+# SortUnitNetRTL_test
+#=========================================================================
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib.test_utils import run_test_vector_sim
+
+from .SortUnitFL_test    import mk_test_vector_table, \
+                                tvec_stream, tvec_dups, tvec_sorted
+from .SortUnitNetFL_test import test_case_table, mk_net_test_vector_table, \
+                                mk_tvec_random
+
+from ..SortNetwork    import mk_sort_network
+from ..SortUnitNetRTL import SortUnitNetPipeRTL, SortUnitNetRTL
+
+#-------------------------------------------------------------------------
+# test_pipe
+#-------------------------------------------------------------------------
+# A 4-element odd-even lane is a drop-in replacement for
+# SortUnitStructRTL, so we can reuse its test vectors.
+
+@pytest.mark.parametrize( "tvec", [ tvec_stream, tvec_dups, tvec_sorted ] )
+def test_pipe( tvec, cmdline_opts ):
+  run_test_vector_sim( SortUnitNetPipeRTL(), mk_test_vector_table( 3, tvec ),
+                       cmdline_opts )
+
+#-------------------------------------------------------------------------
+# Parameterized Testing with Test Case Table
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( **test_case_table )
+def test_sort_net_rtl( test_params, cmdline_opts ):
+  nelems  = test_params.nelems
+  nlanes  = test_params.nlanes
+  nstages = len( mk_sort_network( nelems, test_params.network ) )
+  run_test_vector_sim(
+    SortUnitNetRTL( 8, nelems, nlanes, test_params.network ),
+    mk_net_test_vector_table( nelems, nlanes, nstages,
+                              mk_tvec_random( nelems, 20 ), test_params.gap ),
+    cmdline_opts )
+
+@pytest.mark.parametrize( "nbits", [ 4, 16, 32 ] )
+def test_nbits( nbits, cmdline_opts ):
+  run_test_vector_sim(
+    SortUnitNetRTL( nbits, 8, 2, "bitonic" ),
+    mk_net_test_vector_table( 8, 2, 6, mk_tvec_random( 8, 10, nbits ) ),
+    cmdline_opts )
@@ -0,0 +1,38 @@
+#=========================================================================
+# sort_sim_test
+#=========================================================================
+# Runs the sort-sim script, so every case starts a new interpreter.
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+sort_sim = os.path.join( os.path.dirname( os.path.dirname(
+             os.path.abspath( __file__ ) ) ), "sort-sim" )
+
+def run_sort_sim( *args ):
+  env    = dict( os.environ )
+  env.pop( "PYMTL_SIM_SERVER", None )
+  result = subprocess.run( [ sys.executable, sort_sim, *args ], env=env,
+                           stdout=subprocess.PIPE, universal_newlines=True,
+                           check=True )
+
+  # Returns the number of cycles, without the confidence interval
+
+  for line in result.stdout.splitlines():
+    if line.startswith( "num_cycles " ):
+      return line.split( "=" )[1].split()[0]
+
+#-------------------------------------------------------------------------
+# test_sample
+#-------------------------------------------------------------------------
+# The pipeline sorts one input per cycle, so sampling finds the exact
+# number of cycles of a full run, with and without warm-up.
+
+@pytest.mark.parametrize( "warmup", [ "0", "3" ] )
+def test_sample( warmup ):
+  args = [ "--impl", "rtl-flat", "--ninputs", "200" ]
+  assert run_sort_sim( *args, "--sample", "4", "--window", "20", "--warmup", warmup ) \
+      == run_sort_sim( *args, "--stats" )
@@ -1,8 +1,14 @@
 #=========================================================================
 # gcd
 #=========================================================================
+# The models are imported the first time they are used, so importing one
+# module of the package (e.g., GcdUnitInputs) does not import every
+# model along with NumPy.
 
-# from .GcdUnitFL  import GcdUnitFL
-from .GcdUnitCL  import GcdUnitCL
-from .GcdUnitRTL import GcdUnitRTL
+from sim_utils.lazy import lazy_exports
 
+lazy_exports( __name__, {
+  # 'GcdUnitFL'  : '.GcdUnitFL',
+  'GcdUnitCL'  : '.GcdUnitCL',
+  'GcdUnitRTL' : '.GcdUnitRTL',
+})
@@ -6,11 +6,13 @@ import pytest
 
 from pymtl3 import *
 from pymtl3.stdlib.test_utils import run_sim
-from ..GcdUnitCL import gcd_cl, GcdUnitCL
+from ..GcdUnitMsg import GcdUnitMsgs
+from ..GcdUnitCL import gcd_cl, gcd_cl_step, gcd_cl_batch, mk_gcd_cl_table, \
+                       GcdUnitCL
 
 # Reuse cases from FL tests
 
-from .GcdUnitFL_test import TestHarness, test_case_table
+from .GcdUnitFL_test import TestHarness, test_case_table, random_cases
 
 #-------------------------------------------------------------------------
 # test_gcd_cl
@@ -28,6 +30,53 @@ def test_gcd_cl_calc():
   assert gcd_cl( 75, 45 ) == ( 15,    8       )
   assert gcd_cl( 36, 96 ) == ( 12,    10      )
 
+def test_gcd_cl_step_calc():
+  #                   a   b         result ncycles
+  assert gcd_cl_step( 0,  0  ) == ( 0,     1       )
+  assert gcd_cl_step( 1,  0  ) == ( 1,     1       )
+  assert gcd_cl_step( 0,  1  ) == ( 1,     2       )
+  assert gcd_cl_step( 5,  5  ) == ( 5,     3       )
+  assert gcd_cl_step( 15, 5  ) == ( 5,     5       )
+  assert gcd_cl_step( 5,  15 ) == ( 5,     6       )
+  assert gcd_cl_step( 7,  13 ) == ( 1,     13      )
+  assert gcd_cl_step( 75, 45 ) == ( 15,    8       )
+  assert gcd_cl_step( 36, 96 ) == ( 12,    10      )
+
+def test_gcd_cl_large_ratio():
+  assert gcd_cl( 0xffff, 1      ) == gcd_cl_step( 0xffff, 1      )
+  assert gcd_cl( 1,      0xffff ) == gcd_cl_step( 1,      0xffff )
+  assert gcd_cl( 0xffff, 0xfffe ) == gcd_cl_step( 0xffff, 0xfffe )
+
+def test_gcd_cl_exhaustive_6bit():
+  for a in range(64):
+    for b in range(64):
+      assert gcd_cl( a, b ) == gcd_cl_step( a, b )
+
+def test_gcd_cl_table():
+  table = mk_gcd_cl_table( 4 )
+  for a in range(16):
+    for b in range(16):
+      assert gcd_cl( a, b, table ) == gcd_cl_step( a, b )
+
+  # Operands which do not fit in the table fall back to the calculation
+
+  assert gcd_cl( 75, 45, table ) == ( 15, 8 )
+
+#-------------------------------------------------------------------------
+# test_gcd_cl_batch
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "use_numpy", [ True, False ] )
+def test_gcd_cl_batch( use_numpy ):
+  reqs = [ (a,b) for a, b, _ in random_cases ] + [ (0,0), (0xffff,1) ]
+  ref  = [ gcd_cl_step( a, b ) for a, b in reqs ]
+  assert [ tuple(x) for x in gcd_cl_batch( reqs, use_numpy=use_numpy ) ] == ref
+
+def test_gcd_cl_batch_msgs():
+  msgs = [ GcdUnitMsgs.req( a, b ) for a, b, _ in random_cases ]
+  ref  = [ gcd_cl_step( a, b ) for a, b, _ in random_cases ]
+  assert [ tuple(x) for x in gcd_cl_batch( msgs ) ] == ref
+
 #-------------------------------------------------------------------------
 # Test cases
 #-------------------------------------------------------------------------
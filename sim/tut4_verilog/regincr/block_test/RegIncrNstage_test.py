@@ -5,15 +5,19 @@
 import collections
 import pytest
 
-from random import sample, seed
+from random import sample
 
 from pymtl3 import *
 from pymtl3.stdlib.test_utils import run_test_vector_sim, mk_test_case_table
 from ..RegIncrNstage import RegIncrNstage
 
+from sim_utils.vectors  import CompiledVectors, compile_test_vectors, \
+                               run_test_vectors, np
+from sim_utils.randseed import mk_rng, derive_seed
+
 # To ensure reproducible testing
 
-seed(0xdeadbeef)
+rng = mk_rng( __name__ )
 
 #-------------------------------------------------------------------------
 # mk_test_vector_table
@@ -21,7 +25,7 @@ seed(0xdeadbeef)
 
 def mk_test_vector_table( nstages, inputs ):
 
-  inputs.extend( [0]*nstages )
+  inputs = list( inputs ) + [0]*nstages
 
   test_vector_table = [ ('in_ out*') ]
   last_results = collections.deque( ['?']*nstages )
@@ -40,11 +44,11 @@ test_case_table = mk_test_case_table([
   [ "2stage_small",    2,       [ 0x00, 0x03, 0x06 ]   ],
   [ "2stage_large",    2,       [ 0xa0, 0xb3, 0xc6 ]   ],
   [ "2stage_overflow", 2,       [ 0x00, 0xfe, 0xff ]   ],
-  [ "2stage_random",   2,       sample(range(0xff),20) ],
+  [ "2stage_random",   2,       rng.sample(range(0xff),20) ],
   [ "3stage_small",    3,       [ 0x00, 0x03, 0x06 ]   ],
   [ "3stage_large",    3,       [ 0xa0, 0xb3, 0xc6 ]   ],
   [ "3stage_overflow", 3,       [ 0x00, 0xfe, 0xff ]   ],
-  [ "3stage_random",   3,       sample(range(0xff),20) ],
+  [ "3stage_random",   3,       rng.sample(range(0xff),20) ],
 ])
 
 @pytest.mark.parametrize( **test_case_table )
@@ -63,3 +67,36 @@ def test_random( n, cmdline_opts ):
   run_test_vector_sim( RegIncrNstage( nstages=n ),
     mk_test_vector_table( n, sample(range(0xff),20) ), cmdline_opts )
 
+
+#-------------------------------------------------------------------------
+# Compiled test vectors
+#-------------------------------------------------------------------------
+# The same tables compiled once into NumPy arrays. The output comes from
+# the last register, so we can drive the model in bulk.
+
+needs_numpy = pytest.mark.skipif( np is None, reason="needs NumPy" )
+
+@needs_numpy
+@pytest.mark.parametrize( **test_case_table )
+def test_compiled( test_params, cmdline_opts ):
+  nstages = test_params.nstages
+  vectors = compile_test_vectors( mk_test_vector_table( nstages, test_params.inputs ) )
+  run_test_vectors( RegIncrNstage( nstages ), vectors, cmdline_opts, bulk=True )
+
+# Thousands of random inputs, building the arrays directly
+
+@needs_numpy
+@pytest.mark.parametrize( "n", [ 1, 3, 6 ] )
+def test_random_large( n, cmdline_opts ):
+  nprng  = np.random.default_rng( derive_seed( f"{__name__}.large{n}" ) )
+  inputs = np.concatenate( [ nprng.integers( 0, 0x100, size=20000, dtype=np.uint8 ),
+                             np.zeros( n, dtype=np.uint8 ) ] )
+
+  # The output lags the input by n cycles and wraps around at 8 bits
+
+  expected     = np.zeros_like( inputs )
+  expected[n:] = inputs[:-n] + np.uint8( n )
+  mask         = np.arange( len( inputs ) ) >= n
+
+  vectors = CompiledVectors( [ "in_" ], [ "out" ], inputs, expected, mask )
+  run_test_vectors( RegIncrNstage( nstages=n ), vectors, cmdline_opts, bulk=True )
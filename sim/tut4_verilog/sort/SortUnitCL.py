@@ -3,9 +3,6 @@
 #=========================================================================
 # Models the cycle-approximate timing behavior of the target hardware.
 
-from collections import deque
-from copy import deepcopy
-
 from pymtl3 import *
 
 from .SortUnitFL import sort_fl
@@ -22,15 +19,37 @@ class SortUnitCL( Component ):
     s.out_val = OutPort()
     s.out     = [ OutPort(nbits) for _ in range(4) ]
 
-    s.pipe    = deque( [ [0] + [0 for _ in range(4)] ] * (nstages-1) )
+    # We model the pipeline with a ring buffer of nstages preallocated
+    # slots. Each slot holds the valid bit followed by the four sorted
+    # elements as plain ints. Every cycle we write the incoming vector
+    # into the slot at head, advance head, and read the slot written
+    # nstages-1 cycles ago. When the input is invalid we only need to
+    # clear the valid bit in the slot, so we skip sorting altogether.
+
+    s.pipe = [ [0]*5 for _ in range(nstages) ]
+    s.head = 0
 
     @update_ff
     def block():
-      s.pipe.append( deepcopy( [s.in_val] + sort_fl(s.in_) ) )
-      data = s.pipe.popleft()
+
+      slot = s.pipe[s.head]
+      if s.in_val:
+        slot[0] = 1
+        for i, v in enumerate( sort_fl( s.in_ ) ):
+          slot[i+1] = int(v)
+      else:
+        slot[0] = 0
+
+      s.head = s.head + 1 if s.head < nstages-1 else 0
+
+      data = s.pipe[s.head]
       s.out_val <<= data[0]
-      for i, v in enumerate( data[1:] ):
-        s.out[i] <<= v
+      if data[0]:
+        for i in range(4):
+          s.out[i] <<= data[i+1]
+      else:
+        for i in range(4):
+          s.out[i] <<= 0
 
   # Line tracing
 
@@ -7,6 +7,16 @@
 from copy import deepcopy
 from pymtl3 import *
 
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+#-------------------------------------------------------------------------
+# sort_fl
+#-------------------------------------------------------------------------
+# Sorts a single list of elements using quicksort.
+
 def sort_fl( arr ):
   def sort( a, l, r ):
     i, j = l, r;
@@ -25,6 +35,45 @@ def sort_fl( arr ):
   sort( ret, 0, len(ret)-1 )
   return ret
 
+#-------------------------------------------------------------------------
+# sort_fl_batch
+#-------------------------------------------------------------------------
+# Sorts many four-element vectors in a single call. The input is an
+# (N,4) array (or a list of N four-element lists) of nbits-wide unsigned
+# values and the result is a new (N,4) array with each row sorted into
+# ascending order, so row i of the result is equal to sort_fl(arr[i]).
+# We apply the four-element sorting network used in SortUnitStructRTL
+# (Batcher's odd-even merge network, see tut3_pymtl/sort/SortNetwork.py)
+# one column at a time, which means each compare-and-swap stage is a
+# single vectorized NumPy minimum/maximum over all N rows. If NumPy is not
+# installed (or use_numpy is False) we fall back to applying the sorting
+# network to each row in plain Python and return a list of lists.
+
+sort_network = [ (0,1), (2,3), (0,2), (1,3), (1,2) ]
+
+def _mk_dtype( nbits ):
+  for dtype in [ np.uint8, np.uint16, np.uint32, np.uint64 ]:
+    if nbits <= np.iinfo(dtype).bits:
+      return dtype
+  return object
+
+def sort_fl_batch( arr, nbits=8, use_numpy=True ):
+
+  if np is None or not use_numpy:
+    ret = [ list(row) for row in arr ]
+    for row in ret:
+      for i, j in sort_network:
+        if row[j] < row[i]:
+          row[i], row[j] = row[j], row[i]
+    return ret
+
+  cols = np.array( arr, dtype=_mk_dtype(nbits) ).reshape( -1, 4 ).T.copy()
+  for i, j in sort_network:
+    lo = np.minimum( cols[i], cols[j] )
+    hi = np.maximum( cols[i], cols[j] )
+    cols[i], cols[j] = lo, hi
+  return cols.T.copy()
+
 class SortUnitFL( Component ):
 
   # Constructor
@@ -8,7 +8,9 @@ from pymtl3      import *
 from pymtl3.stdlib.test_utils import run_test_vector_sim, mk_test_case_table
 
 from .SortUnitFL_test import header_str, mk_test_vector_table, x, \
-                             tvec_stream, tvec_dups, tvec_sorted, tvec_random
+                             tvec_stream, tvec_dups, tvec_sorted, tvec_random, \
+                             mk_test_vectors, tvec_random_large, run_test_vectors, \
+                             needs_numpy, check_checkpoint
 
 from ..SortUnitCL import SortUnitCL
 
@@ -28,6 +30,25 @@ def test_basic():
     [ 0,  0,  0,  0,  0,  0,  x,  x,  x,  x ],
   ] )
 
+#-------------------------------------------------------------------------
+# test_idle
+#-------------------------------------------------------------------------
+# Like the RTL models, the outputs are zero whenever out_val is low.
+
+def test_idle():
+  run_test_vector_sim( SortUnitCL(), [ header_str,
+    # in  in  in  in  in  out out out out out
+    # val [0] [1] [2] [3] val [0] [1] [2] [3]
+    [ 0,  9,  8,  7,  6,  0,  0,  0,  0,  0 ],
+    [ 1,  4,  2,  3,  1,  0,  0,  0,  0,  0 ],
+    [ 0,  5,  6,  7,  8,  0,  0,  0,  0,  0 ],
+    [ 1,  8,  7,  6,  5,  0,  0,  0,  0,  0 ],
+    [ 0,  1,  1,  1,  1,  1,  1,  2,  3,  4 ],
+    [ 0,  1,  1,  1,  1,  0,  0,  0,  0,  0 ],
+    [ 0,  1,  1,  1,  1,  1,  5,  6,  7,  8 ],
+    [ 0,  1,  1,  1,  1,  0,  0,  0,  0,  0 ],
+  ] )
+
 #-------------------------------------------------------------------------
 # Parameterized Testing with Test Case Table
 #-------------------------------------------------------------------------
@@ -63,3 +84,20 @@ def test_sort_cl_random( n ):
   run_test_vector_sim( SortUnitCL( nstages=n ),
     mk_test_vector_table( n, tvec_random ) )
 
+
+#-------------------------------------------------------------------------
+# Large random test with compiled test vectors
+#-------------------------------------------------------------------------
+# The outputs are registered, so we can drive the model in bulk
+
+@needs_numpy
+def test_sort_cl_random_large():
+  run_test_vectors( SortUnitCL(), mk_test_vectors( 3, tvec_random_large ), bulk=True )
+
+#-------------------------------------------------------------------------
+# Checkpointing
+#-------------------------------------------------------------------------
+
+@pytest.mark.parametrize( "n", [ 1, 3, 5 ] )
+def test_sort_cl_checkpoint( n ):
+  check_checkpoint( lambda: SortUnitCL( nstages=n ) )